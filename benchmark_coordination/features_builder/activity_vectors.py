@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp  # type: ignore
+from datetime import datetime
+from typing import Optional, Tuple, Union
+
+from benchmark_coordination.utils.id_registry import IdRegistry
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+# a Monday, so that folding on weeks starts the bins on Monday at midnight
+_WEEK_ORIGIN = pd.Timestamp("1970-01-05")
+
+
+def build_activity_matrix(
+    df: pd.DataFrame,
+    bin_size: int = 30,
+    fold_period: Optional[int] = None,
+    origin: Optional[Union[datetime, str]] = None,
+    author_column: str = "author_id",
+    timestamp_column: str = "timestamp",
+    registry: Optional[IdRegistry] = None,
+) -> Tuple[sp.csr_matrix, pd.Index]:
+    """
+    Build the activity vector of each author, i.e. the number of their activities
+    in each time bin, as the rows of a sparse matrix.
+    The rows can be compared all at once, e.g. with the cosine similarity of the
+    rows normalized with normalize_rows.
+    :param df: pd.DataFrame, the activities, with columns author_column and timestamp_column.
+    :param bin_size: int, the size of the time bins in minutes. Default is 30.
+    :param fold_period: int, the period in minutes on which the time is folded,
+        e.g. MINUTES_PER_WEEK to count the activities per bin of the week (circular
+        hour-of-week profile), or MINUTES_PER_DAY per bin of the day.
+        Weeks start on Monday at midnight. It should be a multiple of bin_size.
+        Default is None (no folding, the bins follow each other from the origin).
+    :param origin: datetime, the start of the first bin, without folding.
+        Default is None, the earliest activity rounded down to the day.
+    :param author_column: str, the name of the column with the authors.
+        Default is 'author_id'.
+    :param timestamp_column: str, the name of the column with the timestamps.
+        Default is 'timestamp'.
+    :param registry: IdRegistry, the registry of the authors. If provided, the matrix
+        has one row per registered author, in the order of the registry.
+        Default is None (one row per author of df, in sorted order).
+    :return: tuple, the (n_authors, n_bins) matrix of counts, and the authors of its rows.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({
+    ...     "author_id": [1, 1, 2],
+    ...     "timestamp": pd.to_datetime(["2022-09-01 00:10", "2022-09-01 01:10", "2022-09-02 00:20"]),
+    ... })
+    >>> matrix, authors = build_activity_matrix(df, bin_size=60, fold_period=MINUTES_PER_DAY)
+    >>> matrix.toarray()[:, :3]
+    array([[1, 1, 0],
+           [1, 0, 0]])
+    """
+    assert bin_size > 0, "Bin size should be positive"
+    timestamps = pd.to_datetime(df[timestamp_column])
+    if fold_period is not None:
+        assert (
+            fold_period % bin_size == 0
+        ), "Fold period should be a multiple of the bin size"
+        minutes = (timestamps - _WEEK_ORIGIN) // pd.Timedelta(minutes=1)
+        bins = np.asarray((minutes.to_numpy() % fold_period) // bin_size)
+        n_bins = fold_period // bin_size
+    else:
+        start = timestamps.min().normalize() if origin is None else pd.Timestamp(origin)
+        bins = np.asarray((timestamps - start) // pd.Timedelta(minutes=bin_size))
+        assert (
+            len(bins) == 0 or bins.min() >= 0
+        ), "Activities should not precede the origin"
+        n_bins = int(bins.max()) + 1 if len(bins) else 0
+    if registry is not None:
+        authors = registry.labels
+        rows = registry.encode(df[author_column])
+    else:
+        authors = pd.Index(np.sort(df[author_column].unique()))
+        rows = authors.get_indexer(df[author_column])
+    matrix = sp.csr_matrix(
+        (np.ones(len(df), dtype=np.int64), (rows, bins)),
+        shape=(len(authors), n_bins),
+    )
+    matrix.sum_duplicates()
+    return matrix, authors
+
+
+def normalize_rows(matrix: sp.spmatrix) -> sp.csr_matrix:
+    """
+    Scale the rows of a sparse matrix to unit Euclidean norm, so that the product of
+    the matrix with its transpose gives the cosine similarity of each pair of rows.
+    Rows of zeros are left as they are.
+    :param matrix: sp.spmatrix, the matrix.
+    :return: sp.csr_matrix, the normalized matrix, of float64.
+    ----------------
+    Example:
+    ----------------
+    >>> normalize_rows(sp.csr_matrix([[3, 4], [0, 0]])).toarray()
+    array([[0.6, 0.8],
+           [0. , 0. ]])
+    """
+    matrix = sp.csr_matrix(matrix, dtype=np.float64)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    scale = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    return sp.csr_matrix(sp.diags(scale) @ matrix)
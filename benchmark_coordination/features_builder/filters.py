@@ -0,0 +1,242 @@
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional
+
+from benchmark_coordination.utils.step_markers import row_local
+from benchmark_coordination.utils.sketches import CountMinSketch, HyperLogLog
+
+
+def _in_range(
+    values: np.ndarray, minimum: Optional[float], maximum: Optional[float]
+) -> np.ndarray:
+    """
+    Returns whether each value is between minimum and maximum (inclusive)
+    :param values: np.ndarray, the values.
+    :param minimum: float, the minimum, or None.
+    :param maximum: float, the maximum, or None.
+    :return: np.ndarray of bool.
+    """
+    mask = np.ones(len(values), dtype=bool)
+    if minimum is not None:
+        mask &= values >= minimum
+    if maximum is not None:
+        mask &= values <= maximum
+    return mask
+
+
+@row_local
+def drop_self_actions(
+    df: pd.DataFrame, target_column: str, source_column: str = "author_id"
+) -> pd.DataFrame:
+    """
+    Drop the rows where a user acts on themselves, e.g. self-retweets.
+    :param df: pd.DataFrame, the dataframe to be filtered.
+    :param target_column: str, the name of the column with the target user,
+        e.g. the author of the retweeted tweet.
+    :param source_column: str, the name of the column with the acting user.
+        Default is 'author_id'.
+    :return: pd.DataFrame, the rows where the two users differ.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({"author_id": [1, 2, 3], "retweeted": [2, 2, 1]})
+    >>> drop_self_actions(df, "retweeted")
+       author_id  retweeted
+    0          1          2
+    2          3          1
+    """
+    return df[df[source_column].to_numpy() != df[target_column].to_numpy()]
+
+
+def filter_by_count(
+    df: pd.DataFrame,
+    column: str,
+    min_count: Optional[int] = None,
+    max_count: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Keep the rows whose value in a column occurs between min_count and max_count times,
+    e.g. the retweets of the users retweeted more than 5000 times (min_count=5001),
+    or the posts of the users with at least 5 posts.
+    The counts are over the whole dataframe; for data given in chunks,
+    see filter_by_count_sketch.
+    :param df: pd.DataFrame, the dataframe to be filtered.
+    :param column: str, the name of the column with the values to count.
+    :param min_count: int, the minimum number of occurrences (inclusive). Default is None.
+    :param max_count: int, the maximum number of occurrences (inclusive). Default is None.
+    :return: pd.DataFrame, the filtered dataframe.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({"author_id": [1, 1, 2, 1, 3, 3]})
+    >>> filter_by_count(df, "author_id", min_count=2)
+       author_id
+    0          1
+    1          1
+    3          1
+    4          3
+    5          3
+    """
+    counts = df.groupby(column, sort=False, dropna=False)[column].transform("size")
+    return df[_in_range(counts.to_numpy(), min_count, max_count)]
+
+
+def filter_by_distinct(
+    df: pd.DataFrame,
+    column: str,
+    distinct_column: str,
+    min_distinct: Optional[int] = None,
+    max_distinct: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Keep the rows whose value in a column co-occurs with between min_distinct and
+    max_distinct distinct values of another column, e.g. the handles used by at
+    least 2 users, or the users with at least 5 unique hashtags.
+    Missing values are not counted. The counts are over the whole dataframe;
+    for data given in chunks, see filter_by_distinct_sketch.
+    :param df: pd.DataFrame, the dataframe to be filtered.
+    :param column: str, the name of the column with the values to filter on.
+    :param distinct_column: str, the name of the column with the values to count.
+    :param min_distinct: int, the minimum number of distinct values (inclusive).
+        Default is None.
+    :param max_distinct: int, the maximum number of distinct values (inclusive).
+        Default is None.
+    :return: pd.DataFrame, the filtered dataframe.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({"handle": ["a", "a", "b", "b"], "author_id": [1, 2, 3, 3]})
+    >>> filter_by_distinct(df, "handle", "author_id", min_distinct=2)
+      handle  author_id
+    0      a          1
+    1      a          2
+    """
+    counts = df.groupby(column, sort=False, dropna=False)[distinct_column].transform(
+        "nunique"
+    )
+    return df[_in_range(counts.to_numpy(), min_distinct, max_distinct)]
+
+
+def count_sketch(
+    chunks: Iterable[pd.DataFrame],
+    column: str,
+    width: int = 2**16,
+    depth: int = 4,
+) -> CountMinSketch:
+    """
+    Count the occurrences of the values of a column with a count-min sketch,
+    in one pass over the chunks of the data, for filter_by_count_sketch.
+    :param chunks: iterable of pd.DataFrame, the chunks of the data,
+        e.g. from utils.io_utils.iter_parquet_batches.
+    :param column: str, the name of the column with the values to count.
+    :param width: int, the number of counters per row, see CountMinSketch.
+        Default is 2**16.
+    :param depth: int, the number of rows, see CountMinSketch. Default is 4.
+    :return: CountMinSketch, the sketch of the column.
+    """
+    sketch = CountMinSketch(width=width, depth=depth)
+    for chunk in chunks:
+        sketch.update(chunk[column].to_numpy())
+    return sketch
+
+
+def distinct_sketch(
+    chunks: Iterable[pd.DataFrame],
+    column: str,
+    distinct_column: str,
+    p: int = 8,
+    exact_limit: Optional[int] = None,
+) -> HyperLogLog:
+    """
+    Count the distinct values of a column for each value of another column
+    with a HyperLogLog sketch, in one pass over the chunks of the data,
+    for filter_by_distinct_sketch. Missing values are not counted.
+    :param chunks: iterable of pd.DataFrame, the chunks of the data,
+        e.g. from utils.io_utils.iter_parquet_batches.
+    :param column: str, the name of the column with the keys.
+    :param distinct_column: str, the name of the column with the values to count.
+    :param p: int, the precision of the counts, see HyperLogLog. Default is 8.
+    :param exact_limit: int, the number of distinct values of a key counted exactly,
+        see HyperLogLog. Default is None (2**p // 16).
+    :return: HyperLogLog, the sketch of the distinct values per key.
+    """
+    sketch = HyperLogLog(p=p, exact_limit=exact_limit)
+    for chunk in chunks:
+        chunk = chunk[chunk[distinct_column].notna()]
+        sketch.update(chunk[distinct_column].to_numpy(), keys=chunk[column].to_numpy())
+    return sketch
+
+
+@row_local
+def filter_by_count_sketch(
+    df: pd.DataFrame,
+    column: str,
+    sketch: CountMinSketch,
+    min_count: Optional[int] = None,
+    max_count: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Keep the rows whose value in a column occurs between min_count and max_count times,
+    as filter_by_count, with the counts estimated over the whole data by a sketch
+    (see count_sketch), so that the filter is row-local and can be applied chunk by chunk
+    before the expensive steps of a pipeline (see Pipeline.fit_chunks).
+    The estimated counts are never below the true ones: with min_count only, no row
+    kept by filter_by_count is dropped, while a few more rows may be kept.
+    :param df: pd.DataFrame, the dataframe to be filtered.
+    :param column: str, the name of the column with the values to count.
+    :param sketch: CountMinSketch, the counts of the column.
+    :param min_count: int, the minimum number of occurrences (inclusive). Default is None.
+    :param max_count: int, the maximum number of occurrences (inclusive). Default is None.
+    :return: pd.DataFrame, the filtered dataframe.
+    ----------------
+    Example:
+    ----------------
+    >>> chunks = [pd.DataFrame({"author_id": [1, 1, 2]}), pd.DataFrame({"author_id": [1, 3, 3]})]
+    >>> sketch = count_sketch(chunks, "author_id")
+    >>> filter_by_count_sketch(chunks[1], "author_id", sketch, min_count=3)
+       author_id
+    0          1
+    """
+    counts = sketch.query(df[column].to_numpy())
+    return df[_in_range(counts, min_count, max_count)]
+
+
+@row_local
+def filter_by_distinct_sketch(
+    df: pd.DataFrame,
+    column: str,
+    sketch: HyperLogLog,
+    min_distinct: Optional[float] = None,
+    max_distinct: Optional[float] = None,
+) -> pd.DataFrame:
+    """
+    Keep the rows whose value in a column co-occurs with between min_distinct and
+    max_distinct distinct values of another column, as filter_by_distinct, with the
+    numbers of distinct values estimated over the whole data by a sketch
+    (see distinct_sketch), so that the filter is row-local and can be applied
+    chunk by chunk before the expensive steps of a pipeline (see Pipeline.fit_chunks).
+    The counts are exact up to the exact limit of the sketch, and approximate above it
+    (a few percents, see HyperLogLog): the thresholds are compared with the estimates
+    rounded to the nearest integer.
+    :param df: pd.DataFrame, the dataframe to be filtered.
+    :param column: str, the name of the column with the values to filter on.
+    :param sketch: HyperLogLog, the distinct values per value of the column.
+    :param min_distinct: float, the minimum number of distinct values (inclusive).
+        Default is None.
+    :param max_distinct: float, the maximum number of distinct values (inclusive).
+        Default is None.
+    :return: pd.DataFrame, the filtered dataframe.
+    ----------------
+    Example:
+    ----------------
+    >>> chunks = [
+    ...     pd.DataFrame({"handle": ["a", "b"], "author_id": [1, 3]}),
+    ...     pd.DataFrame({"handle": ["a", "b"], "author_id": [2, 3]}),
+    ... ]
+    >>> sketch = distinct_sketch(chunks, "handle", "author_id")
+    >>> filter_by_distinct_sketch(chunks[1], "handle", sketch, min_distinct=2)
+      handle  author_id
+    0      a          2
+    """
+    counts = np.rint(sketch.estimate_keys(df[column].to_numpy()))
+    return df[_in_range(counts, min_distinct, max_distinct)]
@@ -4,11 +4,14 @@ from nltk.util import ngrams  # type: ignore
 from nltk.tokenize import word_tokenize  # type: ignore
 from nltk.stem import WordNetLemmatizer  # type: ignore
 
+from benchmark_coordination.utils.step_markers import row_local
+
 
 nltk.download("punkt_tab")
 nltk.download("wordnet")
 
 
+@row_local
 def lower_case_column_content(df: pd.DataFrame, column: str) -> pd.DataFrame:
     """
     Convert the content of a column to lower case.
@@ -34,6 +37,7 @@ def lower_case_column_content(df: pd.DataFrame, column: str) -> pd.DataFrame:
     return df
 
 
+@row_local
 def remove_leading_symbol(df: pd.DataFrame, column: str, symbol: str) -> pd.DataFrame:
     """
     Remove leading symbol from the content of a column.
@@ -60,6 +64,7 @@ def remove_leading_symbol(df: pd.DataFrame, column: str, symbol: str) -> pd.Data
     return df
 
 
+@row_local
 def clean_text_column(df: pd.DataFrame, column: str) -> pd.DataFrame:
     """
     Clean the text content of a column by removing special characters
@@ -86,6 +91,7 @@ def clean_text_column(df: pd.DataFrame, column: str) -> pd.DataFrame:
     return df
 
 
+@row_local
 def split_text_column_into_ngrams(
     df: pd.DataFrame, column: str, n: int
 ) -> pd.DataFrame:
@@ -122,6 +128,7 @@ def split_text_column_into_ngrams(
     return df
 
 
+@row_local
 def remove_stopwords(df: pd.DataFrame, column: str, stopwords: list) -> pd.DataFrame:
     """
     Remove stopwords from the text content of a column.
@@ -149,6 +156,7 @@ def remove_stopwords(df: pd.DataFrame, column: str, stopwords: list) -> pd.DataF
     return df
 
 
+@row_local
 def text_lemmatize_and_tokenize(df: pd.DataFrame, column: str) -> pd.DataFrame:
     """
     Lemmatize and tokenize the text content of a column.
@@ -176,6 +184,7 @@ def text_lemmatize_and_tokenize(df: pd.DataFrame, column: str) -> pd.DataFrame:
     return df
 
 
+@row_local
 def text_stemming(df: pd.DataFrame, column: str) -> pd.DataFrame:
     """
     Stem the text content of a column.
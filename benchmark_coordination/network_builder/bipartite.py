@@ -1,5 +1,6 @@
 import networkx as nx
 import pandas as pd
+import scipy.sparse as sp  # type: ignore
 from typing import Optional
 
 
@@ -106,3 +107,41 @@ def project_on_nodes(
                 P.add_edge(u, v, weight=w)
 
     return P
+
+
+def project_incidence_matrix(
+    incidence: sp.spmatrix, weighted: bool = False
+) -> sp.csr_matrix:
+    """
+    Project a bipartite graph, given as a sparse incidence matrix, on its source nodes.
+    This is the array-based counterpart of project_on_nodes: only the pairs of
+    source nodes sharing at least one target are computed.
+    :param incidence: sp.spmatrix, the (n_sources, n_targets) incidence matrix,
+        e.g. from sparse_graph.build_incidence_matrix.
+    :param weighted: bool, whether to weight the edges by the sum of the weights
+        of the edges to the common neighbors (as project_on_nodes with weight="weight").
+        Default is False, in which case the weight is the number of common neighbors.
+    :return: sp.csr_matrix, the (n_sources, n_sources) symmetric adjacency matrix
+        of the projected graph, without self-loops.
+    ----------------
+    Example:
+    ----------------
+    >>> import scipy.sparse as sp
+    >>> B = sp.csr_matrix([[1, 1, 0, 0], [0, 1, 1, 0], [0, 0, 1, 1]])
+    >>> project_incidence_matrix(B).toarray()
+    array([[0, 1, 0],
+           [1, 0, 1],
+           [0, 1, 0]])
+    """
+    incidence = sp.csr_matrix(incidence)
+    binary = incidence.copy()
+    binary.data = (binary.data != 0).astype(incidence.dtype)
+    if weighted:
+        projected = incidence @ binary.T
+        projected = projected + projected.T
+    else:
+        projected = binary @ binary.T
+    projected = sp.csr_matrix(projected)
+    projected.setdiag(0)
+    projected.eliminate_zeros()
+    return projected
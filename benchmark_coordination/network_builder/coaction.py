@@ -0,0 +1,291 @@
+from typing import Iterable, List, Literal, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from benchmark_coordination.utils.id_registry import IdRegistry
+from benchmark_coordination.utils.io_utils import iter_parquet_batches
+from benchmark_coordination.utils.logging import logger
+
+# the sort keys of the sweep, (target, time), must fit in an int64
+_MAX_KEY = 2**62
+
+
+def _coaction_triples(
+    authors: np.ndarray,
+    targets: np.ndarray,
+    timestamps: np.ndarray,
+    delta_t: int,
+    is_new: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the pairs of events on the same target within delta_t of each other.
+    The events are sorted by (target, timestamp) once, then for each event the last
+    event on the same target within delta_t after it is found with a binary search
+    (the vectorized form of a sweep with two pointers), and the events in between
+    are paired with it.
+    :param authors: np.ndarray, the author code of each event.
+    :param targets: np.ndarray, the target code of each event.
+    :param timestamps: np.ndarray, the timestamp of each event, as int64.
+    :param delta_t: int, the maximum time between the two events, in the unit of timestamps.
+    :param is_new: np.ndarray, whether each event is new. If provided, only the pairs
+        with at least one new event are returned. Default is None.
+    :return: tuple of np.ndarray, the authors of the first and second event
+        of each pair, and their target.
+    """
+    order = np.lexsort((timestamps, targets))
+    authors, targets = authors[order], targets[order]
+    timestamps = timestamps[order] - timestamps.min() if len(order) else timestamps
+    if is_new is not None:
+        is_new = is_new[order]
+    group_span = int(timestamps.max()) + delta_t + 1 if len(order) else 1
+    groups_per_batch = max(1, _MAX_KEY // group_span)
+    first, second = [], []
+    # targets are swept in batches, so that target * group_span + time fits in an int64
+    for low in range(0, int(targets.max()) + 1 if len(order) else 0, groups_per_batch):
+        start, end = np.searchsorted(targets, [low, low + groups_per_batch])
+        keys = (targets[start:end] - low) * group_span + timestamps[start:end]
+        last = np.searchsorted(keys, keys + delta_t, side="right")
+        n_pairs = last - np.arange(len(keys)) - 1
+        i = np.repeat(np.arange(len(keys)), n_pairs)
+        offsets = np.arange(n_pairs.sum()) - np.repeat(
+            np.cumsum(n_pairs) - n_pairs, n_pairs
+        )
+        j = i + 1 + offsets
+        first.append(i + start)
+        second.append(j + start)
+    i = np.concatenate(first) if first else np.empty(0, dtype=np.int64)
+    j = np.concatenate(second) if second else np.empty(0, dtype=np.int64)
+    keep = authors[i] != authors[j]
+    if is_new is not None:
+        keep &= is_new[i] | is_new[j]
+    i, j = i[keep], j[keep]
+    return authors[i], authors[j], targets[i]
+
+
+def _coaction_keys(
+    first: np.ndarray,
+    second: np.ndarray,
+    targets: np.ndarray,
+    count: Literal["targets", "events"],
+) -> np.ndarray:
+    """
+    Returns the key of each co-action: the (unordered) pair of author codes,
+    and the target if the distinct targets are counted
+    :param first: np.ndarray, the author codes of the first events.
+    :param second: np.ndarray, the author codes of the second events.
+    :param targets: np.ndarray, the target of each co-action (codes or hashes).
+    :param count: str, whether to count the distinct targets or the pairs of events.
+    :return: np.ndarray, the (n, 2) or (n, 3) int64 keys.
+    """
+    columns = [np.minimum(first, second), np.maximum(first, second)]
+    if count == "targets":
+        columns.append(targets)
+    return np.column_stack(columns).astype(np.int64).reshape(-1, len(columns))
+
+
+def _reduce_coactions(
+    keys: np.ndarray, weights: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregate the co-actions with the same key, summing their weights
+    :param keys: np.ndarray, the (n, k) keys, as returned by _coaction_keys.
+    :param weights: np.ndarray, the weight of each key.
+    :return: tuple of np.ndarray, the distinct keys and their total weights.
+    """
+    unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    totals = np.bincount(inverse.ravel(), weights=weights, minlength=len(unique_keys))
+    return unique_keys.reshape(-1, keys.shape[1]), totals.astype(np.int64)
+
+
+def _pair_table(
+    registry: IdRegistry,
+    keys: np.ndarray,
+    weights: np.ndarray,
+    count: Literal["targets", "events"],
+    symmetric: bool,
+) -> pd.DataFrame:
+    """
+    Turn the aggregated co-actions into counts per pair of authors.
+    :param registry: IdRegistry, the registry of the author codes.
+    :param keys: np.ndarray, the distinct keys, as returned by _reduce_coactions.
+    :param weights: np.ndarray, the number of pairs of events of each key.
+    :param count: str, whether to count the distinct targets or the pairs of events.
+    :param symmetric: bool, whether each pair is listed once, with source < target.
+    :return: pd.DataFrame, the edge list with columns 'source', 'target' and 'count'.
+    """
+    if count == "targets":
+        # each key is a distinct (pair, target) triple
+        keys, weights = _reduce_coactions(keys[:, :2], np.ones(len(keys)))
+    # order the authors by label, so that source < target as in build_similarity_network
+    rank = np.empty(len(registry), dtype=np.int64)
+    rank[np.argsort(registry.labels.to_numpy(), kind="stable")] = np.arange(
+        len(registry)
+    )
+    labels_by_rank = registry.labels.to_numpy()[np.argsort(rank)]
+    a, b = rank[keys[:, 0]], rank[keys[:, 1]]
+    source, target = np.minimum(a, b), np.maximum(a, b)
+    order = np.lexsort((target, source))
+    source, target, counts = source[order], target[order], weights[order]
+    if not symmetric:
+        source, target = np.r_[source, target], np.r_[target, source]
+        counts = np.r_[counts, counts]
+    return pd.DataFrame(
+        {
+            "source": labels_by_rank[source],
+            "target": labels_by_rank[target],
+            "count": counts,
+        }
+    )
+
+
+def coaction_network(
+    df: pd.DataFrame,
+    delta_t: float,
+    count: Literal["targets", "events"] = "targets",
+    symmetric: bool = True,
+    source_column: str = "author_id",
+    target_column: str = "trace",
+    timestamp_column: str = "timestamp",
+) -> pd.DataFrame:
+    """
+    Link the users who acted on the same target (e.g. retweeted the same tweet)
+    within delta_t seconds of each other.
+    The events are sorted by target and time once and swept, so that the cost is
+    proportional to the number of events and of co-actions, and no time window is needed.
+    :param df: pd.DataFrame, the events, with columns source_column, target_column
+        and timestamp_column.
+    :param delta_t: float, the maximum time between the two actions, in seconds.
+    :param count: str, one of 'targets', 'events'. If 'targets', the weight of a pair of users
+        is the number of distinct targets they co-acted on. If 'events', it is the number
+        of pairs of their events within delta_t. Default is 'targets'.
+    :param symmetric: bool, whether each pair is listed once, with source < target,
+        or twice, once in each direction. Default is True.
+    :param source_column: str, the name of the column with the users. Default is 'author_id'.
+    :param target_column: str, the name of the column with the targets. Default is 'trace'.
+    :param timestamp_column: str, the name of the column with the timestamps.
+        Default is 'timestamp'.
+    :return: pd.DataFrame, the edge list with columns 'source', 'target' and 'count'.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({
+    ...     "author_id": ["a", "b", "c", "a", "b"],
+    ...     "trace": [1, 1, 1, 2, 2],
+    ...     "timestamp": pd.to_datetime(["2022-09-01 00:00:00", "2022-09-01 00:00:30",
+    ...         "2022-09-01 00:05:00", "2022-09-01 01:00:00", "2022-09-01 01:00:10"]),
+    ... })
+    >>> coaction_network(df, delta_t=60)
+      source target  count
+    0      a      b      2
+    """
+    assert delta_t >= 0, "Delta t should be non-negative"
+    assert count in ("targets", "events"), f"Invalid count: {count}"
+    registry = IdRegistry(df[source_column])
+    targets = pd.factorize(df[target_column])[0]
+    timestamps = pd.to_datetime(df[timestamp_column]).to_numpy().astype(np.int64)
+    first, second, co_targets = _coaction_triples(
+        registry.encode(df[source_column]),
+        targets,
+        timestamps,
+        int(pd.Timedelta(seconds=delta_t).value),
+    )
+    keys = _coaction_keys(first, second, co_targets, count)
+    keys, weights = _reduce_coactions(keys, np.ones(len(keys)))
+    return _pair_table(registry, keys, weights, count, symmetric)
+
+
+def coaction_network_streaming(
+    chunks: Union[str, List[str], Iterable[pd.DataFrame]],
+    delta_t: float,
+    count: Literal["targets", "events"] = "targets",
+    symmetric: bool = True,
+    source_column: str = "author_id",
+    target_column: str = "trace",
+    timestamp_column: str = "timestamp",
+) -> pd.DataFrame:
+    """
+    Link the users who acted on the same target within delta_t seconds of each other,
+    as coaction_network, reading the events chunk by chunk.
+    The chunks should be in time order (e.g. the files of a dataset partitioned by date,
+    see utils.io_utils.save_to_partitioned_parquet): each chunk is swept together with
+    the events of the previous chunks in the last delta_t seconds, which are carried over.
+    The co-actions of each chunk are aggregated per pair of users (and target, if the
+    distinct targets are counted) and merged into a running table, so that the memory
+    is bounded by the size of the network rather than by the number of co-actions.
+    :param chunks: the events, either as the path(s) to parquet file(s),
+        or as an iterable of pd.DataFrame chunks.
+    :param delta_t: float, the maximum time between the two actions, in seconds.
+    :param count: str, one of 'targets', 'events', see coaction_network. Default is 'targets'.
+    :param symmetric: bool, whether each pair is listed once, with source < target,
+        or twice, once in each direction. Default is True.
+    :param source_column: str, the name of the column with the users. Default is 'author_id'.
+    :param target_column: str, the name of the column with the targets. Default is 'trace'.
+    :param timestamp_column: str, the name of the column with the timestamps.
+        Default is 'timestamp'.
+    :return: pd.DataFrame, the edge list with columns 'source', 'target' and 'count'.
+    """
+    assert delta_t >= 0, "Delta t should be non-negative"
+    assert count in ("targets", "events"), f"Invalid count: {count}"
+    columns = [source_column, target_column, timestamp_column]
+    batches: Iterable[pd.DataFrame]
+    if isinstance(chunks, str) or (
+        isinstance(chunks, list)
+        and len(chunks) > 0
+        and all(isinstance(path, str) for path in chunks)
+    ):
+        batches = iter_parquet_batches(chunks, columns=columns)
+    else:
+        batches = chunks  # type: ignore[assignment]
+    delta = int(pd.Timedelta(seconds=delta_t).value)
+    registry = IdRegistry()
+    carry = pd.DataFrame(
+        {
+            "author": np.empty(0, dtype=np.int32),
+            "target": np.empty(0, dtype=np.uint64),
+            "timestamp": np.empty(0, dtype=np.int64),
+        }
+    )
+    n_keys = 3 if count == "targets" else 2
+    keys = np.empty((0, n_keys), dtype=np.int64)
+    weights = np.empty(0, dtype=np.int64)
+    n_coactions = 0
+    for chunk in batches:
+        if chunk.empty:
+            continue
+        registry.add(chunk[source_column])
+        events = pd.DataFrame(
+            {
+                "author": registry.encode(chunk[source_column]),
+                # targets are hashed, to be comparable across chunks
+                "target": pd.util.hash_array(chunk[target_column].to_numpy()),
+                "timestamp": pd.to_datetime(chunk[timestamp_column])
+                .to_numpy()
+                .astype(np.int64),
+            }
+        )
+        assert (
+            carry.empty or events["timestamp"].min() >= carry["timestamp"].max()
+        ), "The chunks should be in time order"
+        events = pd.concat([carry, events], ignore_index=True)
+        is_new = np.arange(len(events)) >= len(carry)
+        target_codes, target_hashes = pd.factorize(events["target"])
+        a, b, t = _coaction_triples(
+            events["author"].to_numpy(),
+            target_codes,
+            events["timestamp"].to_numpy(),
+            delta,
+            is_new,
+        )
+        n_coactions += len(a)
+        chunk_keys = _coaction_keys(
+            a, b, np.asarray(target_hashes)[t].view(np.int64), count
+        )
+        chunk_keys, chunk_weights = _reduce_coactions(
+            chunk_keys, np.ones(len(chunk_keys))
+        )
+        keys, weights = _reduce_coactions(
+            np.concatenate([keys, chunk_keys]), np.r_[weights, chunk_weights]
+        )
+        carry = events[events["timestamp"] >= events["timestamp"].max() - delta]
+    logger.debug(f"Found {n_coactions} co-actions, aggregated into {len(keys)} rows")
+    return _pair_table(registry, keys, weights, count, symmetric)
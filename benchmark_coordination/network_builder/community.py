@@ -0,0 +1,304 @@
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp  # type: ignore
+from scipy.sparse import csgraph  # type: ignore
+
+from benchmark_coordination.utils.logging import logger
+
+
+def _edgelist_to_adjacency(
+    df: pd.DataFrame,
+    source_column: str,
+    target_column: str,
+    weight_column: Optional[str],
+) -> Tuple[sp.csr_matrix, pd.Index]:
+    """
+    Build the symmetric adjacency matrix of an undirected edge list
+    :param df: pd.DataFrame, the edge list.
+    :param source_column: str, the name of the column with the source nodes.
+    :param target_column: str, the name of the column with the target nodes.
+    :param weight_column: str, the name of the column with the edge weights,
+        or None for unit weights.
+    :return: tuple, the (n, n) adjacency matrix and the nodes of its rows.
+    """
+    codes, nodes = pd.factorize(
+        pd.concat([df[source_column], df[target_column]], ignore_index=True)
+    )
+    rows, cols = codes[: len(df)], codes[len(df) :]
+    weights = (
+        np.ones(len(df), dtype=np.float64)
+        if weight_column is None
+        else df[weight_column].to_numpy(dtype=np.float64)
+    )
+    n = len(nodes)
+    matrix = sp.coo_matrix((weights, (rows, cols)), shape=(n, n)).tocsr()
+    matrix = (matrix + matrix.T).tocsr()
+    matrix.sum_duplicates()
+    return matrix, pd.Index(nodes)
+
+
+def _membership(nodes: pd.Index, labels: np.ndarray) -> pd.DataFrame:
+    """
+    Returns the node -> community dataframe, with communities numbered
+    by decreasing size (ties by first node)
+    """
+    _, first, inverse, sizes = np.unique(
+        labels, return_index=True, return_inverse=True, return_counts=True
+    )
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[np.lexsort((first, -sizes))] = np.arange(len(sizes))
+    return pd.DataFrame({"node": nodes, "community": rank[inverse]})
+
+
+def connected_components(
+    df: pd.DataFrame,
+    source_column: str = "source",
+    target_column: str = "target",
+) -> pd.DataFrame:
+    """
+    Find the connected components of an undirected graph given as an edge list.
+    :param df: pd.DataFrame, the edge list, e.g. the output of build_similarity_network
+        after thresholding.
+    :param source_column: str, the name of the column with the source nodes.
+        Default is 'source'.
+    :param target_column: str, the name of the column with the target nodes.
+        Default is 'target'.
+    :return: pd.DataFrame, with columns 'node' and 'community',
+        the components being numbered by decreasing size.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({"source": ["a", "b", "d"], "target": ["b", "c", "e"]})
+    >>> connected_components(df)
+      node  community
+    0    a          0
+    1    b          0
+    2    d          1
+    3    c          0
+    4    e          1
+    """
+    matrix, nodes = _edgelist_to_adjacency(df, source_column, target_column, None)
+    _, labels = csgraph.connected_components(matrix, directed=False)
+    return _membership(nodes, labels)
+
+
+def modularity(
+    adjacency: sp.spmatrix, labels: np.ndarray, resolution: float = 1.0
+) -> float:
+    """
+    Compute the modularity of a partition of an undirected weighted graph.
+    :param adjacency: sp.spmatrix, the (n, n) symmetric adjacency matrix.
+    :param labels: np.ndarray, the community of each node.
+    :param resolution: float, the resolution parameter. Default is 1.0.
+    :return: float, the modularity.
+    """
+    adjacency = sp.coo_matrix(adjacency)
+    total = adjacency.data.sum()
+    if total == 0:
+        return 0.0
+    labels = np.unique(labels, return_inverse=True)[1]
+    internal = adjacency.data[labels[adjacency.row] == labels[adjacency.col]].sum()
+    degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+    community_degrees = np.bincount(labels, weights=degrees)
+    return float(
+        internal / total - resolution * ((community_degrees / total) ** 2).sum()
+    )
+
+
+def _quality(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    weights: np.ndarray,
+    communities: np.ndarray,
+    community_degrees: np.ndarray,
+    resolution: float,
+) -> float:
+    """
+    Returns the modularity of a partition times 2m, up to the weight of the self-loops
+    :param rows: np.ndarray, the row of each (non-self-loop) entry of the adjacency.
+    :param cols: np.ndarray, the column of each entry.
+    :param weights: np.ndarray, the weight of each entry.
+    :param communities: np.ndarray, the community of each node.
+    :param community_degrees: np.ndarray, the total degree of each community.
+    :param resolution: float, the resolution parameter.
+    :return: float
+    """
+    total = community_degrees.sum()
+    internal = weights[communities[rows] == communities[cols]].sum()
+    return float(internal - resolution * (community_degrees**2).sum() / total)
+
+
+def _local_moving(
+    adjacency: sp.csr_matrix,
+    resolution: float,
+    rng: np.random.Generator,
+    tol: float,
+) -> Tuple[np.ndarray, bool]:
+    """
+    The local moving phase of the Louvain method, vectorized over the nodes:
+    at each round, compute the best neighboring community of every node from the
+    CSR arrays at once, then apply the improving moves in bulk, until no node
+    can improve the modularity.
+    Moves computed independently can conflict (e.g. two neighbors swapping their
+    communities), so the exact modularity of the bulk move is checked, and the moves
+    are halved in random order until it improves. A single move always improves it,
+    so that the modularity increases at every round.
+    :param adjacency: sp.csr_matrix, the (n, n) symmetric adjacency matrix.
+    :param resolution: float, the resolution parameter.
+    :param rng: np.random.Generator, the generator of the order of the moves.
+    :param tol: float, the minimum modularity gain (times 2m) of a move,
+        and of a round of moves.
+    :return: tuple, the community of each node and whether any node moved.
+    """
+    n = adjacency.shape[0]
+    degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+    total = degrees.sum()
+    rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(adjacency.indptr))
+    not_self = rows != adjacency.indices
+    rows = rows[not_self]
+    cols = adjacency.indices[not_self].astype(np.int64)
+    weights = adjacency.data[not_self]
+    communities = np.arange(n, dtype=np.int64)
+    community_degrees = degrees.copy()
+    improved = False
+    while len(rows) > 0:
+        # the weight of the links of each node to each neighboring community
+        pairs, inverse = np.unique(rows * n + communities[cols], return_inverse=True)
+        links = np.bincount(inverse, weights=weights)
+        nodes, candidates = pairs // n, pairs % n
+        current = communities[nodes]
+        # the degree of each community without the node itself
+        others = community_degrees[candidates] - np.where(
+            candidates == current, degrees[nodes], 0.0
+        )
+        gains = links - resolution * degrees[nodes] * others / total
+
+        own_links = np.zeros(n)
+        is_current = candidates == current
+        own_links[nodes[is_current]] = links[is_current]
+        stay = (
+            own_links
+            - resolution * degrees * (community_degrees[communities] - degrees) / total
+        )
+
+        # the best community of each node, the pairs being sorted by node
+        # (ties go to the community with the smallest label)
+        starts = np.flatnonzero(np.diff(nodes, prepend=-1))
+        sizes = np.diff(np.append(starts, len(nodes)))
+        is_best = gains == np.repeat(np.maximum.reduceat(gains, starts), sizes)
+        best = np.flatnonzero(is_best)
+        best = best[np.diff(nodes[best], prepend=-1) != 0]
+        movers, targets = nodes[best], candidates[best]
+        improving = (gains[best] > stay[movers] + tol) & (targets != current[best])
+        movers, targets = movers[improving], targets[improving]
+        if len(movers) == 0:
+            break
+
+        # apply the moves in bulk, halving them by random priority until the exact
+        # modularity gain is positive: a single move always improves the modularity
+        order = rng.permutation(len(movers))
+        movers, targets = movers[order], targets[order]
+        base = _quality(rows, cols, weights, communities, community_degrees, resolution)
+        n_moves = len(movers)
+        while True:
+            trial = communities.copy()
+            trial[movers[:n_moves]] = targets[:n_moves]
+            trial_degrees = np.bincount(trial, weights=degrees, minlength=n)
+            gain = (
+                _quality(rows, cols, weights, trial, trial_degrees, resolution) - base
+            )
+            if gain > tol or n_moves == 1:
+                break
+            n_moves = (n_moves + 1) // 2
+        if gain <= tol:
+            break
+        communities, community_degrees = trial, trial_degrees
+        improved = True
+    return communities, improved
+
+
+def louvain_csr(
+    adjacency: sp.spmatrix,
+    resolution: float = 1.0,
+    seed: Optional[int] = None,
+    max_levels: int = 32,
+    tol: float = 1e-7,
+) -> np.ndarray:
+    """
+    Find communities in an undirected weighted graph with the Louvain method
+    (Blondel et al., "Fast unfolding of communities in large networks", 2008),
+    working on the arrays of a sparse adjacency matrix: each level moves nodes
+    between neighboring communities to increase the modularity, then aggregates
+    the communities into the nodes of the next level (P^T A P).
+    :param adjacency: sp.spmatrix, the (n, n) symmetric adjacency matrix,
+        e.g. from sparse_graph.edgelist_to_csr.
+    :param resolution: float, the resolution parameter. Higher values give
+        smaller communities. Default is 1.0.
+    :param seed: int, the seed of the order in which the nodes are visited.
+        Default is None.
+    :param max_levels: int, the maximum number of aggregation levels. Default is 32.
+    :param tol: float, the minimum modularity gain of a move, and of a round of
+        moves, relative to the total weight. Default is 1e-7.
+    :return: np.ndarray, the community of each node (row of the matrix),
+        numbered from 0.
+    """
+    rng = np.random.default_rng(seed)
+    adjacency = sp.csr_matrix(adjacency, dtype=np.float64)
+    adjacency.sum_duplicates()
+    labels = np.arange(adjacency.shape[0])
+    tol = tol * adjacency.data.sum()
+    for level in range(max_levels):
+        communities, improved = _local_moving(adjacency, resolution, rng, tol)
+        if not improved:
+            break
+        _, communities = np.unique(communities, return_inverse=True)
+        n_communities = communities.max() + 1
+        logger.debug(f"Louvain level {level}: {n_communities} communities")
+        labels = communities[labels]
+        projection = sp.csr_matrix(
+            (np.ones(len(communities)), (np.arange(len(communities)), communities)),
+            shape=(len(communities), n_communities),
+        )
+        adjacency = (projection.T @ adjacency @ projection).tocsr()
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def louvain_communities(
+    df: pd.DataFrame,
+    source_column: str = "source",
+    target_column: str = "target",
+    weight_column: Optional[str] = None,
+    resolution: float = 1.0,
+    seed: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Find communities in an undirected graph given as an edge list,
+    with the Louvain method (see louvain_csr).
+    :param df: pd.DataFrame, the edge list, e.g. the output of build_similarity_network
+        after thresholding.
+    :param source_column: str, the name of the column with the source nodes.
+        Default is 'source'.
+    :param target_column: str, the name of the column with the target nodes.
+        Default is 'target'.
+    :param weight_column: str, the name of the column with the edge weights
+        (e.g. 'similarity'). Default is None, in which case every edge has weight 1.
+    :param resolution: float, the resolution parameter. Default is 1.0.
+    :param seed: int, the seed of the order in which the nodes are visited.
+        Default is None.
+    :return: pd.DataFrame, with columns 'node' and 'community',
+        the communities being numbered by decreasing size.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({
+    ...     "source": ["a", "a", "b", "c", "d", "d", "e"],
+    ...     "target": ["b", "c", "c", "d", "e", "f", "f"],
+    ... })
+    >>> louvain_communities(df, seed=0)["community"].tolist()
+    [0, 0, 0, 1, 1, 1]
+    """
+    matrix, nodes = _edgelist_to_adjacency(
+        df, source_column, target_column, weight_column
+    )
+    return _membership(nodes, louvain_csr(matrix, resolution=resolution, seed=seed))
@@ -0,0 +1,91 @@
+from typing import Literal, Optional
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp  # type: ignore
+
+from benchmark_coordination.utils.logging import logger
+
+
+def cooccurrence_similarity_network(
+    dataframe: pd.DataFrame,
+    score: Literal["cardinality", "jaccard"] = "cardinality",
+    symmetric: bool = True,
+    max_item_degree: Optional[int] = None,
+    block_size: int = 10_000,
+) -> pd.DataFrame:
+    """
+    Build a similarity network from the items shared by the users, with an inverted index.
+    The cardinality (and Jaccard) similarity of two users is 0 unless they share an item,
+    so instead of scoring all the pairs of users, the pairs are enumerated from the
+    item -> users postings: the users x items incidence matrix B is multiplied by its
+    transpose, a block of users at a time, and the product only holds the pairs
+    that co-occur in some item, with the number of items they share.
+    The cost is proportional to the size of the output rather than to the square
+    of the number of users.
+    :param dataframe: pd.DataFrame, the dataframe with columns 'author_id' and 'trace',
+        each row linking a user to an item (e.g. a retweeted tweet, or a handle).
+        Rows with a missing trace are ignored.
+    :param score: str, one of 'cardinality' (number of shared items) or 'jaccard'
+        (number of shared items over the number of items of either user).
+        Default is 'cardinality'.
+    :param symmetric: bool, whether each pair is listed once, with source < target,
+        or twice, once in each direction. Default is True.
+    :param max_item_degree: int, the maximum number of users of an item. Items shared
+        by more users (e.g. viral tweets) are skipped when counting the shared items,
+        but still count in the number of items of each user for the Jaccard similarity.
+        Default is None (no cap).
+    :param block_size: int, the number of users whose pairs are accumulated at a time.
+        Default is 10000.
+    :return: pd.DataFrame, the edge list with columns 'source', 'target' and 'similarity',
+        with the pairs of users sharing no item omitted.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({"author_id": [1, 1, 2, 2, 3], "trace": ["A", "B", "A", "B", "C"]})
+    >>> cooccurrence_similarity_network(df)
+       source  target  similarity
+    0       1       2           2
+    """
+    assert score in ("cardinality", "jaccard"), f"Invalid score: {score}"
+    assert block_size > 0, "Block size should be positive"
+    data = dataframe[["author_id", "trace"]].dropna(subset=["trace"])
+    users = np.sort(dataframe["author_id"].unique())
+    rows = np.searchsorted(users, data["author_id"].to_numpy())
+    cols, items = pd.factorize(data["trace"])
+    incidence = sp.csr_matrix(
+        (np.ones(len(data), dtype=np.int64), (rows, cols)),
+        shape=(len(users), len(items)),
+    )
+    # repeated user-item pairs count once, as for the sets of scores.cardinality_similarity
+    incidence.data[:] = 1
+    n_items = np.asarray(incidence.sum(axis=1)).ravel()
+    if max_item_degree is not None:
+        item_degrees = np.asarray(incidence.sum(axis=0)).ravel()
+        keep = item_degrees <= max_item_degree
+        logger.debug(
+            f"Skipping {(~keep).sum()} items with more than {max_item_degree} users"
+        )
+        incidence = incidence[:, np.flatnonzero(keep)]
+    transposed = incidence.T.tocsr()
+
+    sources, targets, counts = [], [], []
+    for start in range(0, len(users), block_size):
+        block = (incidence[start : start + block_size] @ transposed).tocoo()
+        source = block.row + start
+        keep = block.col > source if symmetric else block.col != source
+        sources.append(source[keep])
+        targets.append(block.col[keep])
+        counts.append(block.data[keep])
+    source = np.concatenate(sources)
+    target = np.concatenate(targets)
+    count = np.concatenate(counts)
+    order = np.lexsort((target, source))
+    source, target, count = source[order], target[order], count[order]
+
+    if score == "jaccard":
+        similarity = count / (n_items[source] + n_items[target] - count)
+    else:
+        similarity = count
+    return pd.DataFrame(
+        {"source": users[source], "target": users[target], "similarity": similarity}
+    )
@@ -0,0 +1,156 @@
+from typing import List, Literal, Optional
+import numpy as np
+import pandas as pd
+
+from benchmark_coordination.utils.sketches import _hash
+
+# two seeds give two independent 64-bit hashes of each sequence, whatever the dtype
+_HASH_SEEDS = [0, 1]
+
+
+def _sequence_groups(
+    dataframe: pd.DataFrame, keys: List[str], trace_column: str
+) -> pd.DataFrame:
+    """
+    Hash the sequence of traces of each group of rows with the same keys
+    (e.g. window and author), in row order.
+    :param dataframe: pd.DataFrame, the dataframe with the keys and trace_column.
+    :param keys: list[str], the columns identifying a sequence.
+    :param trace_column: str, the column with the elements of the sequences.
+    :return: pd.DataFrame, one row per sequence, with the keys and the
+        columns 'length', 'hash_0' and 'hash_1'.
+    """
+    data = dataframe[keys + [trace_column]].reset_index(drop=True)
+    position = data.groupby(keys, sort=False).cumcount().to_numpy()
+    # stable sort by sequence, keeping the row order within each sequence
+    group = data.groupby(keys, sort=True).ngroup().to_numpy()
+    order = np.argsort(group, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(group[order]) != 0])
+    sequences = data.iloc[order[starts]][keys].reset_index(drop=True)
+    sequences["length"] = np.diff(np.r_[starts, len(order)])
+    elements = pd.DataFrame(
+        {"trace": data[trace_column].to_numpy()[order], "position": position[order]}
+    )
+    # the hash of an element depends on its position, and the hash of a sequence
+    # is the (wrapping) sum of the hashes of its elements. The hash_key of
+    # hash_pandas_object only salts strings, so the seeds are mixed in afterwards.
+    elements_hashes = pd.util.hash_pandas_object(elements, index=False).to_numpy()
+    for i, seed in enumerate(_HASH_SEEDS):
+        hashes = _hash(elements_hashes, seed=seed)
+        sequences[f"hash_{i}"] = np.add.reduceat(hashes, starts)
+    return sequences
+
+
+def _clique_edges(members: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """
+    List the pairs (i, j), i < j, of positions in consecutive groups of members
+    :param members: np.ndarray, the members, sorted by group.
+    :param sizes: np.ndarray, the size of each group.
+    :return: np.ndarray, the (n_pairs, 2) positions of the pairs in members.
+    """
+    starts = np.repeat(np.r_[0, np.cumsum(sizes)][:-1], sizes)
+    ends = starts + np.repeat(sizes, sizes)
+    first = np.arange(len(members))
+    # each member pairs with the members after it in its group
+    n_pairs = ends - first - 1
+    source = np.repeat(first, n_pairs)
+    offsets = np.arange(n_pairs.sum()) - np.repeat(
+        np.cumsum(n_pairs) - n_pairs, n_pairs
+    )
+    return np.column_stack([source, source + 1 + offsets])
+
+
+def exact_match_network(
+    dataframe: pd.DataFrame,
+    window_size: Optional[int] = None,
+    window_column: Optional[str] = None,
+    output: Literal["edges", "groups"] = "edges",
+    symmetric: bool = True,
+    timestamp_column: str = "timestamp",
+    trace_column: str = "trace",
+) -> pd.DataFrame:
+    """
+    Link the users with identical sequences of traces (e.g. of hashtags) in the same
+    time window, for all the windows at once. The sequence of each user in each window
+    is hashed (two 64-bit hashes of the traces and their positions, salted with different
+    seeds whatever the dtype of the traces, so that collisions are unlikely but not
+    impossible: the sequences are not compared afterwards), and the users are grouped by window and hash
+    in a single pass, instead of comparing all the pairs of users of each window.
+    This gives the edges of the 'boolean' similarity (similarity 1),
+    without listing the pairs that do not match.
+    :param dataframe: pd.DataFrame, the dataframe with columns 'author_id' and trace_column,
+        the sequence of each user being the traces of their rows, in row order.
+    :param window_size: int, the size of the (non-overlapping) time windows in minutes,
+        e.g. 1440 for days. The windows are aligned on the Unix epoch: they start at
+        multiples of window_size minutes since 1970-01-01 00:00, so that only the sizes
+        dividing a day (e.g. 60 or 1440) start at midnight. Default is None.
+    :param window_column: str, the name of a column identifying the window of each row,
+        used if window_size is None. Default is None, in which case the data is a single window.
+    :param output: str, one of 'edges', 'groups'. If 'edges', the cliques of users with
+        identical sequences are listed as edges. If 'groups', the membership of the users
+        in the groups of identical sequences (of at least 2 users) is returned instead,
+        which is linear in the number of users while the cliques are quadratic.
+        Default is 'edges'.
+    :param symmetric: bool, whether each edge is listed once, with source < target,
+        or twice, once in each direction. Default is True.
+    :param timestamp_column: str, the name of the column with the timestamps,
+        used with window_size. Default is 'timestamp'.
+    :param trace_column: str, the name of the column with the traces. Default is 'trace'.
+    :return: pd.DataFrame, if output is 'edges', the edge list with columns 'window'
+        (unless the data is a single window), 'source', 'target' and 'similarity'.
+        If output is 'groups', the columns 'window' (idem), 'author_id' and 'group'.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({
+    ...     "author_id": [1, 1, 2, 2, 3, 3],
+    ...     "trace": ["#a", "#b", "#a", "#b", "#b", "#a"],
+    ... })
+    >>> exact_match_network(df)
+       source  target  similarity
+    0       1       2         1.0
+    """
+    assert output in ("edges", "groups"), f"Invalid output: {output}"
+    data = dataframe
+    keys = ["author_id"]
+    if window_size is not None:
+        windows = pd.to_datetime(data[timestamp_column]).dt.floor(f"{window_size}min")
+        data = data.assign(window=windows)
+        keys = ["window", "author_id"]
+    elif window_column is not None:
+        data = data.assign(window=data[window_column])
+        keys = ["window", "author_id"]
+
+    if data.empty:
+        columns = (
+            keys + ["group"]
+            if output == "groups"
+            else keys[:-1] + ["source", "target", "similarity"]
+        )
+        return pd.DataFrame(columns=columns)
+    sequences = _sequence_groups(data, keys, trace_column)
+    match_keys = keys[:-1] + ["length", "hash_0", "hash_1"]
+    sequences["group"] = sequences.groupby(match_keys, sort=False).ngroup()
+    group_sizes = sequences["group"].map(sequences["group"].value_counts())
+    sequences = sequences[group_sizes.to_numpy() > 1]
+    sequences = sequences.sort_values(["group", "author_id"], kind="stable")
+    sequences["group"] = pd.factorize(sequences["group"])[0]
+    if output == "groups":
+        return sequences[keys + ["group"]].reset_index(drop=True)
+
+    members = sequences["author_id"].to_numpy()
+    sizes = np.bincount(sequences["group"].to_numpy())
+    pairs = _clique_edges(members, sizes)
+    edges = pd.DataFrame(
+        {"source": members[pairs[:, 0]], "target": members[pairs[:, 1]]}
+    )
+    if not symmetric:
+        edges = pd.concat(
+            [edges, edges.rename(columns={"source": "target", "target": "source"})],
+            ignore_index=True,
+        )
+        pairs = np.concatenate([pairs, pairs])
+    if len(keys) > 1:
+        edges.insert(0, "window", sequences["window"].to_numpy()[pairs[:, 0]])
+    edges["similarity"] = 1.0
+    return edges
@@ -1,11 +1,137 @@
+import numpy as np
 import pandas as pd
+from typing import Any, Dict, List, Literal, Optional
 
+from benchmark_coordination.network_builder.cooccurrence import (
+    cooccurrence_similarity_network,
+)
+from benchmark_coordination.network_builder.exact_match import exact_match_network
 from benchmark_coordination.similarity_calculator.calculator import SimilarityCalculator
+from benchmark_coordination.similarity_calculator.cosine import CosineEngine
+from benchmark_coordination.similarity_calculator.kernels import (
+    bitmap_intersection_sizes,
+    encode_traces,
+    intersection_sizes,
+    pack_bitmaps,
+    set_similarities,
+)
 from benchmark_coordination.types.similarity_types import SimilarityMeasure
+from benchmark_coordination.utils.id_registry import IdRegistry
+from benchmark_coordination.utils.step_markers import requires_columns
 
 
+def _pair_mask(values: np.ndarray, i: int, symmetric: bool) -> np.ndarray:
+    """
+    Select the users paired with user i, in the order of build_similarity_network
+    :param values: np.ndarray, the users.
+    :param i: int, the position of the user.
+    :param symmetric: bool, whether the pairs with a smaller user are skipped.
+    :return: np.ndarray of bool, whether each user is paired with user i.
+    """
+    mask = np.arange(len(values)) != i
+    if symmetric:
+        mask &= ~np.asarray(values[i] > values, dtype=bool)
+    return mask
+
+
+def _set_similarity_network(
+    dataframe: pd.DataFrame, users: List[Any], score: str, symmetric: bool
+) -> pd.DataFrame:
+    """
+    Score all the pairs of users with a set similarity ('cardinality' or 'jaccard'),
+    in the order of build_similarity_network. The traces are encoded once as sorted
+    arrays of int codes, or as bitmaps if they are dense, and each user is compared
+    with all the others at once.
+    :param dataframe: pd.DataFrame, the dataframe with columns 'author_id' and 'trace'.
+    :param users: list, the users, in order.
+    :param score: str, one of 'cardinality', 'jaccard'.
+    :param symmetric: bool, whether the similarity network should be symmetric.
+    :return: pd.DataFrame, the edge list with columns 'source', 'target' and 'similarity'.
+    """
+    labels, indptr, indices = encode_traces(dataframe, users=users)
+    if len(labels) == 0:
+        return pd.DataFrame(columns=["source", "target", "similarity"])
+    sizes = np.diff(indptr)
+    n_items = int(indices.max()) + 1 if len(indices) else 0
+    # a bitmap row is cheaper to intersect than a sorted array when it has fewer words
+    bitmaps = (
+        pack_bitmaps(indptr, indices, n_items)
+        if (n_items + 63) // 64 <= sizes.mean()
+        else None
+    )
+    values = labels.to_numpy()
+    positions = np.arange(len(labels))
+    sources, targets, similarities = [], [], []
+    for i in range(len(values)):
+        mask = _pair_mask(values, i, symmetric)
+        if bitmaps is not None:
+            intersections = bitmap_intersection_sizes(bitmaps[i], bitmaps[mask])
+        else:
+            query = indices[indptr[i] : indptr[i + 1]]
+            intersections = intersection_sizes(query, indptr, indices)[mask]
+        sources.append(np.full(len(intersections), i))
+        targets.append(positions[mask])
+        similarities.append(
+            set_similarities(intersections, sizes[i], sizes[mask], score)  # type: ignore[arg-type]
+        )
+    return pd.DataFrame(
+        {
+            "source": labels.take(np.concatenate(sources)).to_numpy(),
+            "target": labels.take(np.concatenate(targets)).to_numpy(),
+            "similarity": np.concatenate(similarities),
+        }
+    )
+
+
+def _cosine_similarity_network(
+    dataframe: pd.DataFrame, users: List[Any], symmetric: bool
+) -> pd.DataFrame:
+    """
+    Score all the pairs of users with the cosine similarity of their traces,
+    in the order of build_similarity_network. The vectors are normalized once
+    (see similarity_calculator.cosine.CosineEngine) and the pairs are scored
+    by blocks of rows (see CosineEngine.network).
+    :param dataframe: pd.DataFrame, the dataframe with columns 'author_id' and 'trace'.
+    :param users: list, the users, in order.
+    :param symmetric: bool, whether the similarity network should be symmetric.
+    :return: pd.DataFrame, the edge list with columns 'source', 'target' and 'similarity'.
+    """
+    if len(users) < 2:
+        return pd.DataFrame(columns=["source", "target", "similarity"])
+    traces = dataframe.groupby("author_id", sort=False)["trace"]
+    # the engine lists the pairs in the order of its vectors, source before target
+    # if symmetric, which is the order of the labels in build_similarity_network
+    by_label = sorted(range(len(users)), key=lambda i: users[i])
+    engine = CosineEngine(
+        [traces.get_group(users[i]).to_numpy() for i in by_label],
+        authors=[users[i] for i in by_label],
+        coalesce="raise",
+    )
+    assert (engine.norms > 0).all(), "Vectors must be non-zero"
+    network = engine.network(symmetric=symmetric)
+    if by_label != list(range(len(users))):
+        # back to the order of the users (e.g. of a registry)
+        positions = pd.Index(users)
+        order = np.lexsort(
+            (
+                positions.get_indexer(network["target"]),
+                positions.get_indexer(network["source"]),
+            )
+        )
+        network = network.iloc[order].reset_index(drop=True)
+    return network
+
+
+@requires_columns("author_id", "trace")
 def build_similarity_network(
-    dataframe: pd.DataFrame, score: SimilarityMeasure, symmetric: bool = True
+    dataframe: pd.DataFrame,
+    score: SimilarityMeasure,
+    symmetric: bool = True,
+    registry: Optional[IdRegistry] = None,
+    engine: Literal["pairwise", "inverted-index", "exact-match"] = "pairwise",
+    max_item_degree: Optional[int] = None,
+    window_size: Optional[int] = None,
+    window_column: Optional[str] = None,
 ) -> pd.DataFrame:
     """
     Build a similarity network from a dataframe using the specified similarity score.
@@ -15,6 +141,28 @@ def build_similarity_network(
     :param score: str, the similarity score to be used.
         If the similarity score is not one from SimilarityMeasure, a ValueError will be raised.
     :param symmetric: bool, whether the similarity network should be symmetric.
+    :param registry: IdRegistry, the registry of the authors. If provided, the users are
+        compared in the order of their registry index, and the edge list gets the
+        int32 columns 'source_idx' and 'target_idx', consistent across windows.
+        Default is None.
+    :param engine: str, one of 'pairwise', 'inverted-index', 'exact-match'.
+        If 'pairwise', all the pairs
+        of users are scored. If 'inverted-index', only the pairs of users sharing
+        at least one trace are scored and listed, see
+        cooccurrence.cooccurrence_similarity_network; this is only available for
+        the 'cardinality' and 'jaccard' scores, for which the other pairs score 0.
+        If 'exact-match', only the pairs of users with identical sequences of traces are
+        listed, see exact_match.exact_match_network; this is only available for
+        the 'boolean' score. Default is 'pairwise'.
+    :param max_item_degree: int, with the 'inverted-index' engine, the maximum number
+        of users of a trace for it to count as shared. Default is None (no cap).
+    :param window_size: int, with the 'exact-match' engine, the size of the time windows
+        in minutes, from column 'timestamp' (see exact_match.exact_match_network).
+        The users are then matched window by window, and the edge list gets a 'window'
+        column. Default is None.
+    :param window_column: str, with the 'exact-match' engine, the name of a column
+        identifying the window of each row, used if window_size is None.
+        Default is None, in which case the whole dataframe is a single window.
     :return: pd.DataFrame, the edge list for the similarity network.
     ----------------
     Example:
@@ -29,21 +177,61 @@ def build_similarity_network(
         source  target  similarity
     0       1       2    0.333333
     """
+    if engine == "inverted-index":
+        if score not in ("cardinality", "jaccard"):
+            raise ValueError(f"The inverted-index engine does not support {score}")
+        network = cooccurrence_similarity_network(
+            dataframe, score, symmetric=symmetric, max_item_degree=max_item_degree
+        )
+        if registry is not None:
+            registry.encode_columns(network, ["source", "target"])
+        return network
+    if engine == "exact-match":
+        if score != "boolean":
+            raise ValueError(f"The exact-match engine does not support {score}")
+        network = exact_match_network(
+            dataframe,
+            window_size=window_size,
+            window_column=window_column,
+            symmetric=symmetric,
+        )
+        if registry is not None:
+            registry.encode_columns(network, ["source", "target"])
+        return network
+    if engine != "pairwise":
+        raise ValueError(f"Invalid engine: {engine}")
+    if window_size is not None or window_column is not None:
+        raise ValueError("Only the exact-match engine supports time windows")
     sim = SimilarityCalculator(similarity_score=score)
     users = sorted(dataframe["author_id"].unique())
-    similarity_network = []
-    for u1 in users:
-        for u2 in users:
-            if u1 == u2:
-                continue
-            if symmetric and u1 > u2:
-                continue
-            u1_data = dataframe[dataframe["author_id"] == u1]["trace"]
-            u2_data = dataframe[dataframe["author_id"] == u2]["trace"]
-            s = sim.calculate_similarity(
-                vector1=u1_data,
-                vector2=u2_data,
-            )
-            similarity_network.append({"source": u1, "target": u2, "similarity": s})
+    if registry is not None:
+        users = list(registry.decode(sorted(registry.encode(users))))
+    if score in ("cardinality", "jaccard"):
+        network = _set_similarity_network(dataframe, users, score, symmetric)
+    elif score == "cosine":
+        network = _cosine_similarity_network(dataframe, users, symmetric)
+    else:
+        # the traces of each user, grouped once rather than selected for each pair
+        traces: Dict[Any, Any] = dict(
+            tuple(dataframe.groupby("author_id", sort=False)["trace"])
+        )
+        no_traces: Any = dataframe["trace"].iloc[:0]
+        similarity_network = []
+        for u1 in users:
+            for u2 in users:
+                if u1 == u2:
+                    continue
+                if symmetric and u1 > u2:
+                    continue
+                s = sim.calculate_similarity(
+                    vector1=traces.get(u1, no_traces),
+                    vector2=traces.get(u2, no_traces),
+                )
+                similarity_network.append({"source": u1, "target": u2, "similarity": s})
 
-    return pd.DataFrame(similarity_network)
+        network = pd.DataFrame(
+            similarity_network, columns=["source", "target", "similarity"]
+        )
+    if registry is not None:
+        registry.encode_columns(network, ["source", "target"])
+    return network
@@ -0,0 +1,110 @@
+from typing import Optional
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp  # type: ignore
+
+from benchmark_coordination.utils.id_registry import IdRegistry
+
+
+def edgelist_to_csr(
+    df: pd.DataFrame,
+    registry: IdRegistry,
+    source_column: str = "source",
+    target_column: str = "target",
+    weight_column: Optional[str] = None,
+    symmetric: bool = True,
+) -> sp.csr_matrix:
+    """
+    Convert an edge list to a sparse adjacency matrix, with one row and one column
+    for each identifier of the registry, so that the matrices built with the same
+    registry (e.g. one per window) have the same shape and can be stacked.
+    :param df: pd.DataFrame, the edge list, with columns source_column and target_column.
+    :param registry: IdRegistry, the registry of the node identifiers.
+    :param source_column: str, the name of the column with the source nodes.
+        Default is 'source'.
+    :param target_column: str, the name of the column with the target nodes.
+        Default is 'target'.
+    :param weight_column: str, the name of the column with the edge weights.
+        Default is None, in which case every edge has weight 1.
+    :param symmetric: bool, whether each edge is listed once for both directions,
+        in which case the matrix is symmetrized. Default is True.
+    :return: sp.csr_matrix, the (n_ids, n_ids) adjacency matrix.
+        Weights of duplicated edges are summed.
+    ----------------
+    Example:
+    ----------------
+    >>> registry = IdRegistry(["a", "b", "c"])
+    >>> df = pd.DataFrame({"source": ["a", "b"], "target": ["b", "c"], "w": [2, 3]})
+    >>> edgelist_to_csr(df, registry, weight_column="w").toarray()
+    array([[0, 2, 0],
+           [2, 0, 3],
+           [0, 3, 0]])
+    """
+    rows = registry.encode(df[source_column])
+    cols = registry.encode(df[target_column])
+    weights = (
+        np.ones(len(df), dtype=np.int64)
+        if weight_column is None
+        else df[weight_column].to_numpy()
+    )
+    n = len(registry)
+    matrix = sp.coo_matrix((weights, (rows, cols)), shape=(n, n)).tocsr()
+    if symmetric:
+        matrix = (matrix + matrix.T).tocsr()
+    matrix.sum_duplicates()
+    return matrix
+
+
+def csr_to_edgelist(
+    matrix: sp.spmatrix,
+    registry: IdRegistry,
+    weight_column: str = "weight",
+    symmetric: bool = True,
+) -> pd.DataFrame:
+    """
+    Convert a sparse adjacency matrix to an edge list.
+    :param matrix: sp.spmatrix, the (n_ids, n_ids) adjacency matrix.
+    :param registry: IdRegistry, the registry of the node identifiers.
+    :param weight_column: str, the name of the column with the edge weights.
+        Default is 'weight'.
+    :param symmetric: bool, whether the matrix is symmetric, in which case
+        each edge is listed once, with source index < target index. Default is True.
+    :return: pd.DataFrame, the edge list with columns 'source', 'target' and weight_column.
+    """
+    coo = sp.triu(matrix, k=1).tocoo() if symmetric else sp.coo_matrix(matrix)
+    keep = coo.data != 0
+    return pd.DataFrame(
+        {
+            "source": registry.decode(coo.row[keep]),
+            "target": registry.decode(coo.col[keep]),
+            weight_column: coo.data[keep],
+        }
+    )
+
+
+def build_incidence_matrix(
+    data: pd.DataFrame,
+    source_column: str,
+    target_column: str,
+    source_registry: IdRegistry,
+    target_registry: IdRegistry,
+) -> sp.csr_matrix:
+    """
+    Build the sparse incidence matrix of a bipartite graph, e.g. authors x retweeted tweets.
+    This is the array-based counterpart of bipartite.build_bipartite_graph.
+    :param data: pd.DataFrame, the dataframe with columns source_column and target_column.
+    :param source_column: str, the name of the column with the source nodes (e.g. "author_id").
+    :param target_column: str, the name of the column with the target nodes (e.g. "hashtag").
+    :param source_registry: IdRegistry, the registry of the source nodes (rows).
+    :param target_registry: IdRegistry, the registry of the target nodes (columns).
+    :return: sp.csr_matrix, the (n_sources, n_targets) matrix, where each entry
+        counts the rows of data linking the source to the target.
+    """
+    rows = source_registry.encode(data[source_column])
+    cols = target_registry.encode(data[target_column])
+    matrix = sp.coo_matrix(
+        (np.ones(len(data), dtype=np.int64), (rows, cols)),
+        shape=(len(source_registry), len(target_registry)),
+    ).tocsr()
+    matrix.sum_duplicates()
+    return matrix
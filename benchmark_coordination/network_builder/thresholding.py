@@ -1,7 +1,27 @@
+import operator
+import numpy as np
 import pandas as pd
-from typing import Literal
+import pyarrow.dataset as ds  # type: ignore
+import scipy.sparse as sp  # type: ignore
+from typing import Callable, Generator, Iterable, List, Literal, Optional, Union
 
+from benchmark_coordination.utils.step_markers import row_local
+from benchmark_coordination.utils.id_registry import IdRegistry
+from benchmark_coordination.utils.io_utils import iter_parquet_batches
+from benchmark_coordination.utils.sketches import KLLSketch
 
+EdgeChunks = Union[str, List[str], Callable[[], Iterable[pd.DataFrame]]]
+
+COMPARISONS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    ">=": operator.ge,
+    ">": operator.gt,
+}
+
+
+@row_local
 def filter_edgelist(
     df: pd.DataFrame,
     column_name: str,
@@ -32,7 +52,7 @@ def filter_edgelist(
     3       4       9     0.4
     4       5      10     0.5
     """
-    return df.query(f"{column_name} {comparison} {threshold}")
+    return df[COMPARISONS[comparison](df[column_name].to_numpy(), threshold)]
 
 
 def filter_edgelist_by_percentile(
@@ -69,3 +89,686 @@ def filter_edgelist_by_percentile(
     """
     threshold = df[column_name].quantile(percentile / 100)
     return filter_edgelist(df, column_name, threshold, comparison)
+
+
+def _top_positions(values: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+    """
+    Returns the positions of the k largest (or smallest) values, in no particular order,
+    in linear time. Missing values are never selected.
+    :param values: np.ndarray, the values.
+    :param k: int, the number of positions to return.
+    :param largest: bool, whether to select the largest values. Default is True.
+    :return: np.ndarray, the positions.
+    """
+    valid = np.flatnonzero(~np.isnan(values))
+    if k >= len(valid):
+        return valid
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    keys = -values[valid] if largest else values[valid]
+    return valid[np.argpartition(keys, k - 1)[:k]]
+
+
+def select_top_fraction(
+    df: pd.DataFrame, column_name: str, fraction: float, largest: bool = True
+) -> pd.DataFrame:
+    """
+    Select the given fraction of edges with the largest (or smallest) values of a column,
+    e.g. the top 0.5% most similar pairs, in linear time (without sorting the edges).
+    Edges tied with the last selected value may be selected or not.
+    :param df: pd.DataFrame, the dataframe containing the edges to be filtered.
+    :param column_name: str, the name of the column to use for the selection.
+    :param fraction: float, the fraction of edges to keep, between 0 and 1.
+        The number of edges kept is rounded up.
+    :param largest: bool, whether to keep the largest values. Default is True.
+    :return: pd.DataFrame, the selected edges, in their original order.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({"source": [1, 2, 3, 4], "target": [5, 6, 7, 8], "w": [0.4, 0.1, 0.9, 0.3]})
+    >>> select_top_fraction(df, "w", 0.5)
+       source  target    w
+    0       1       5  0.4
+    2       3       7  0.9
+    """
+    assert 0 <= fraction <= 1, "The fraction should be between 0 and 1"
+    k = int(np.ceil(fraction * len(df)))
+    values = df[column_name].to_numpy(dtype=np.float64)
+    return df.iloc[np.sort(_top_positions(values, k, largest))]
+
+
+def select_top_k_per_node(
+    df: pd.DataFrame,
+    column_name: str,
+    k: int,
+    node_columns: Optional[List[str]] = None,
+    largest: bool = True,
+) -> pd.DataFrame:
+    """
+    Select, for each node, its k edges with the largest (or smallest) values of a column.
+    An edge is kept if it is among the top k edges of any of its endpoints.
+    :param df: pd.DataFrame, the dataframe containing the edges to be filtered.
+    :param column_name: str, the name of the column to use for the selection.
+    :param k: int, the number of edges to keep per node.
+    :param node_columns: list[str], the columns with the endpoints of the edges.
+        Default is None (['source', 'target']). With a single column, e.g. ['source'],
+        the top k out-edges of each node are kept.
+    :param largest: bool, whether to keep the largest values. Default is True.
+    :return: pd.DataFrame, the selected edges, in their original order.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({"source": ["a", "a", "a", "b"], "target": ["b", "c", "d", "c"], "w": [3, 2, 1, 0]})
+    >>> select_top_k_per_node(df, "w", 1, node_columns=["source"])
+      source target  w
+    0      a      b  3
+    3      b      c  0
+    """
+    assert k > 0, "k should be positive"
+    node_columns = ["source", "target"] if node_columns is None else node_columns
+    values = df[column_name].to_numpy(dtype=np.float64)
+    keys = np.tile(-values if largest else values, len(node_columns))
+    edges = np.tile(np.arange(len(df)), len(node_columns))
+    nodes = pd.factorize(
+        pd.concat([df[column] for column in node_columns], ignore_index=True)
+    )[0]
+    valid = ~np.isnan(keys)
+    keys, edges, nodes = keys[valid], edges[valid], nodes[valid]
+    order = np.lexsort((keys, nodes))
+    sorted_nodes = nodes[order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_nodes[1:] != sorted_nodes[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, len(sorted_nodes)])
+    rank_in_group = np.arange(len(sorted_nodes)) - np.repeat(group_starts, group_sizes)
+    return df.iloc[np.unique(edges[order[rank_in_group < k]])]
+
+
+class TopKAccumulator:
+    """
+    Keep the k edges with the largest (or smallest) values of a column
+    among the chunks of edges added to it, e.g. while a similarity engine
+    produces them, without ever holding all the edges.
+
+    This is a buffered partial sort, not a heap: the chunks are buffered, and when
+    the buffer holds more than 2k edges it is cut down to its top k edges with
+    np.argpartition, so that the selection costs O(E) over E edges and the memory
+    is O(k) plus a chunk. The top k is global: the top k edges of each node
+    are not kept. For a top fraction of a known number of edges E
+    (e.g. n(n-1)/2 pairs of users), use k = ceil(fraction * E).
+
+    Parameters
+    ----------
+    column_name : str
+        The name of the column to use for the selection.
+    k : int
+        The number of edges to keep.
+    largest : bool, optional
+        Whether to keep the largest values. Default is True.
+    columns : list[str], optional
+        The columns of the result if no edge is added. Default is None, in which case
+        they are the columns of the first chunk added, or 'source', 'target'
+        and column_name if no chunk is added.
+
+    Examples
+    --------
+    >>> accumulator = TopKAccumulator("w", k=2)
+    >>> accumulator.add(pd.DataFrame({"source": [1, 2], "target": [3, 4], "w": [0.5, 0.1]}))
+    >>> accumulator.add(pd.DataFrame({"source": [5, 6], "target": [7, 8], "w": [0.2, 0.9]}))
+    >>> accumulator.result()
+       source  target    w
+    0       6       8  0.9
+    1       1       3  0.5
+    """
+
+    def __init__(
+        self,
+        column_name: str,
+        k: int,
+        largest: bool = True,
+        columns: Optional[List[str]] = None,
+    ):
+        assert k > 0, "k should be positive"
+        self.column_name = column_name
+        self.k = k
+        self.largest = largest
+        self.n_seen = 0
+        self._chunks: List[pd.DataFrame] = []
+        self._n_buffered = 0
+        # the result without edges, with the columns (and types) of the edges
+        self._empty = pd.DataFrame(
+            columns=["source", "target", column_name] if columns is None else columns
+        )
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """
+        Add a chunk of edges.
+        :param chunk: pd.DataFrame, the edges, with column column_name.
+        :return: None
+        """
+        if not self._chunks:
+            self._empty = chunk.iloc[:0]
+        self.n_seen += len(chunk)
+        self._chunks.append(chunk)
+        self._n_buffered += len(chunk)
+        if self._n_buffered > 2 * self.k:
+            self._shrink()
+
+    def _shrink(self) -> None:
+        """
+        Cut the buffer down to its top k edges
+        """
+        buffer = pd.concat(self._chunks, ignore_index=True)
+        values = buffer[self.column_name].to_numpy(dtype=np.float64)
+        buffer = buffer.iloc[np.sort(_top_positions(values, self.k, self.largest))]
+        self._chunks = [buffer]
+        self._n_buffered = len(buffer)
+
+    def result(self) -> pd.DataFrame:
+        """
+        Returns the top k edges added so far, sorted by value.
+        :return: pd.DataFrame
+        """
+        if self._n_buffered == 0:
+            return self._empty.copy()
+        self._shrink()
+        return self._chunks[0].sort_values(
+            self.column_name,
+            ascending=not self.largest,
+            kind="stable",
+            ignore_index=True,
+        )
+
+    def __repr__(self) -> str:
+        return f"TopKAccumulator(column_name={self.column_name!r}, k={self.k}, n_seen={self.n_seen})"
+
+
+def iter_edge_chunks(
+    chunks: EdgeChunks, columns: Optional[List[str]] = None
+) -> Iterable[pd.DataFrame]:
+    """
+    Iterate over the chunks of an edge list that does not fit in memory.
+    :param chunks: the edge list, either as the path(s) to parquet file(s),
+        or as a function returning a new iterable of pd.DataFrame chunks at each call
+        (the edges are read more than once, so a one-shot generator is not enough).
+    :param columns: list[str], the columns to read from parquet files.
+        Default is None (all columns).
+    :return: iterable of pd.DataFrame, the chunks.
+    """
+    if callable(chunks):
+        return chunks()
+    if columns is None:
+        columns = ds.dataset(chunks, format="parquet").schema.names
+    return iter_parquet_batches(chunks, columns=columns)
+
+
+def sketch_edge_weights(
+    chunks: EdgeChunks, column_name: str, k: int = 400
+) -> KLLSketch:
+    """
+    Summarize the distribution of an edge attribute with a quantile sketch,
+    in one pass over the chunks of the edge list.
+    Sketches of disjoint parts of the edges (e.g. built by parallel workers)
+    can be combined with KLLSketch.merge.
+    :param chunks: the edge list, see iter_edge_chunks.
+    :param column_name: str, the name of the column to summarize.
+    :param k: int, the size of the sketch, see KLLSketch. Default is 400.
+    :return: KLLSketch, the sketch of the column.
+    """
+    sketch = KLLSketch(k=k)
+    for chunk in iter_edge_chunks(chunks, columns=[column_name]):
+        sketch.update(chunk[column_name].to_numpy())
+    return sketch
+
+
+def _find_rank_value(
+    chunks: EdgeChunks,
+    column_name: str,
+    rank: int,
+    lower: float,
+    upper: float,
+    n_bins: int,
+    max_values: int,
+) -> Optional[float]:
+    """
+    Find the value with the given (0-based) rank among the sorted values of a column,
+    assuming it lies in [lower, upper]. Each pass over the edges either collects
+    the values in the range, once there are at most max_values of them,
+    or narrows the range down to the bin of a histogram that holds the rank.
+    :param chunks: the edge list, see iter_edge_chunks.
+    :param column_name: str, the name of the column.
+    :param rank: int, the rank of the value to find.
+    :param lower: float, the lower bound of the range.
+    :param upper: float, the upper bound of the range.
+    :param n_bins: int, the number of bins of the histograms.
+    :param max_values: int, the maximum number of values to collect in memory.
+    :return: float, the value, or None if it is not in the range.
+    """
+    n_below: Optional[int] = None
+    n_in_range: Optional[int] = None
+    include_upper = True
+    while True:
+        degenerate = np.nextafter(lower, np.inf) >= upper
+        collect = degenerate or (n_in_range is not None and n_in_range <= max_values)
+        edges = np.linspace(lower, upper, n_bins + 1)
+        counts = np.zeros(n_bins, dtype=np.int64)
+        collected = []
+        below = 0
+        n_lower = n_upper = 0
+        for chunk in iter_edge_chunks(chunks, columns=[column_name]):
+            values = chunk[column_name].to_numpy(dtype=np.float64)
+            below += int((values < lower).sum())
+            upper_mask = values <= upper if include_upper else values < upper
+            in_range = values[(values >= lower) & upper_mask]
+            if degenerate:
+                # the range holds at most two distinct floats, lower and upper
+                n_lower += int((in_range == lower).sum())
+                n_upper += int((in_range != lower).sum())
+            elif collect:
+                collected.append(in_range)
+            else:
+                # with an open upper bound, in_range has no values in the last edge
+                counts += np.histogram(in_range, bins=edges)[0]
+        if n_below is None:
+            n_below = below
+        if degenerate:
+            if n_below <= rank < n_below + n_lower:
+                return lower
+            if n_below + n_lower <= rank < n_below + n_lower + n_upper:
+                return upper
+            return None
+        if collect:
+            values = np.sort(np.concatenate(collected)) if collected else np.empty(0)
+            if not n_below <= rank < n_below + len(values):
+                return None
+            return float(values[rank - n_below])
+        cumulative = n_below + np.cumsum(counts)
+        if not n_below <= rank < cumulative[-1]:
+            return None
+        b = int(np.searchsorted(cumulative, rank, side="right"))
+        n_below = int(cumulative[b - 1]) if b > 0 else n_below
+        n_in_range = int(counts[b])
+        include_upper = include_upper and b == n_bins - 1
+        lower, upper = float(edges[b]), float(edges[b + 1])
+
+
+def estimate_percentile(
+    chunks: EdgeChunks,
+    column_name: str,
+    percentile: float,
+    exact: bool = False,
+    sketch: Optional[KLLSketch] = None,
+    n_bins: int = 4096,
+    max_values: int = 1_000_000,
+) -> float:
+    """
+    Compute a percentile of an edge attribute over an edge list that does not fit in memory.
+    The percentile is estimated with a quantile sketch, in one pass over the edges.
+    If exact is True, further passes refine it to the value that pandas.Series.quantile
+    (with linear interpolation) would return on the whole column: the sketch brackets
+    the values around the percentile, and histograms of the bracket narrow it down
+    until the few values left can be sorted in memory.
+    :param chunks: the edge list, see iter_edge_chunks.
+    :param column_name: str, the name of the column.
+    :param percentile: float, the percentile, between 0 and 100.
+    :param exact: bool, whether to refine the estimate to the exact percentile.
+        Default is False.
+    :param sketch: KLLSketch, a sketch of the column already built over all the edges,
+        e.g. by merging the sketches of parallel workers. Default is None,
+        in which case it is built with sketch_edge_weights.
+    :param n_bins: int, the number of bins of the refinement histograms. Default is 4096.
+    :param max_values: int, the maximum number of values held in memory
+        by the refinement. Default is 1000000.
+    :return: float, the percentile.
+    ----------------
+    Example:
+    ----------------
+    >>> chunks = lambda: (pd.DataFrame({"weight": [i, i + 0.5]}) for i in range(50))
+    >>> estimate_percentile(chunks, "weight", 50, exact=True)
+    24.75
+    """
+    assert 0 <= percentile <= 100, "The percentile should be between 0 and 100"
+    if sketch is None:
+        sketch = sketch_edge_weights(chunks, column_name)
+    q = percentile / 100
+    estimate = sketch.quantile(q)
+    if not exact:
+        return estimate
+    position = q * (sketch.n - 1)
+    ranks = [int(np.floor(position)), int(np.ceil(position))]
+    # bracket the ranks with the sketch, with a margin of a few times its error
+    margin = 4.0 / sketch.k
+    lower = sketch.quantile(max(0.0, q - margin))
+    upper = sketch.quantile(min(1.0, q + margin))
+    values = []
+    for rank in ranks:
+        value = _find_rank_value(
+            chunks, column_name, rank, lower, upper, n_bins, max_values
+        )
+        if value is None:
+            value = _find_rank_value(
+                chunks, column_name, rank, sketch.min, sketch.max, n_bins, max_values
+            )
+        if value is None:
+            raise ValueError("The edges changed between passes")
+        values.append(value)
+    return values[0] + (position - ranks[0]) * (values[1] - values[0])
+
+
+def filter_edgelist_by_percentile_streaming(
+    chunks: EdgeChunks,
+    column_name: str,
+    percentile: float,
+    comparison: Literal["<", "<=", "==", ">=", ">"],
+    exact: bool = False,
+    sketch: Optional[KLLSketch] = None,
+) -> Generator[pd.DataFrame, None, None]:
+    """
+    Filter edges based on a percentile and a comparison operator, like
+    filter_edgelist_by_percentile, over an edge list that does not fit in memory.
+    The percentile is computed with estimate_percentile, then the edges are read again
+    and filtered chunk by chunk.
+    :param chunks: the edge list, see iter_edge_chunks.
+    :param column_name: str, the name of the column to use for filtering.
+    :param percentile: float, the percentile value to compare against.
+    :param comparison: str, the comparison operator to use.
+        The comparison operators available are: "<", "<=", "==", ">=", ">".
+    :param exact: bool, whether to compute the exact percentile instead of
+        an estimate. Default is False.
+    :param sketch: KLLSketch, a sketch of the column already built over all the edges.
+        Default is None.
+    :return: generator, a generator that yields the filtered chunks as pd.DataFrame.
+    """
+    compare = COMPARISONS[comparison]
+    threshold = estimate_percentile(
+        chunks, column_name, percentile, exact=exact, sketch=sketch
+    )
+    for chunk in iter_edge_chunks(chunks):
+        filtered = chunk[compare(chunk[column_name].to_numpy(), threshold)]
+        if len(filtered) > 0:
+            yield filtered
+
+
+def _disparity(
+    weights: np.ndarray, strengths: np.ndarray, degrees: np.ndarray
+) -> np.ndarray:
+    """
+    Returns the disparity filter p-values (1 - w / s) ** (k - 1) of edges
+    with respect to one of their endpoints, with strength s and degree k.
+    Edges of nodes with degree 1 have p-value 1.
+    :param weights: np.ndarray, the weights of the edges.
+    :param strengths: np.ndarray, the strengths of the endpoints.
+    :param degrees: np.ndarray, the degrees of the endpoints.
+    :return: np.ndarray of float64, the p-values.
+    """
+    ratio = np.divide(
+        weights,
+        strengths,
+        out=np.zeros(len(weights), dtype=np.float64),
+        where=strengths != 0,
+    )
+    return np.power(np.clip(1.0 - ratio, 0.0, 1.0), degrees - 1.0)
+
+
+def compute_disparity(
+    df: pd.DataFrame,
+    weight_column: str = "weight",
+    source_column: str = "source",
+    target_column: str = "target",
+    output_column: str = "disparity",
+) -> pd.DataFrame:
+    """
+    Compute the disparity filter p-values of the edges of an undirected weighted graph
+    (Serrano, Boguna, Vespignani, "Extracting the multiscale backbone of complex
+    weighted networks", PNAS 2009). The p-value of an edge with weight w at a node
+    with strength s and degree k is (1 - w / s) ** (k - 1), and the p-value of the edge
+    is the minimum over its two endpoints.
+    :param df: pd.DataFrame, the edge list, with each edge listed once.
+    :param weight_column: str, the name of the column with the edge weights.
+        Default is 'weight'.
+    :param source_column: str, the name of the column with the source nodes.
+        Default is 'source'.
+    :param target_column: str, the name of the column with the target nodes.
+        Default is 'target'.
+    :param output_column: str, the name of the new column with the p-values.
+        Default is 'disparity'.
+    :return: pd.DataFrame, the edge list with the new column.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({"source": ["a", "a", "a"], "target": ["b", "c", "d"], "weight": [8, 1, 1]})
+    >>> compute_disparity(df)["disparity"].round(2).tolist()
+    [0.04, 0.81, 0.81]
+    """
+    codes, _ = pd.factorize(
+        pd.concat([df[source_column], df[target_column]], ignore_index=True)
+    )
+    weights = df[weight_column].to_numpy(dtype=np.float64)
+    strengths = np.bincount(codes, weights=np.tile(weights, 2))
+    degrees = np.bincount(codes).astype(np.float64)
+    source, target = codes[: len(df)], codes[len(df) :]
+    df = df.copy()
+    df[output_column] = np.minimum(
+        _disparity(weights, strengths[source], degrees[source]),
+        _disparity(weights, strengths[target], degrees[target]),
+    )
+    return df
+
+
+def disparity_filter(
+    df: pd.DataFrame,
+    alpha: float = 0.05,
+    weight_column: str = "weight",
+    source_column: str = "source",
+    target_column: str = "target",
+) -> pd.DataFrame:
+    """
+    Extract the backbone of an undirected weighted graph with the disparity filter,
+    i.e. keep the edges that are significant (p-value < alpha) for at least one
+    of their endpoints. See compute_disparity.
+    :param df: pd.DataFrame, the edge list, with each edge listed once.
+    :param alpha: float, the significance level. Default is 0.05.
+    :param weight_column: str, the name of the column with the edge weights.
+        Default is 'weight'.
+    :param source_column: str, the name of the column with the source nodes.
+        Default is 'source'.
+    :param target_column: str, the name of the column with the target nodes.
+        Default is 'target'.
+    :return: pd.DataFrame, the edges of the backbone, with a 'disparity' column.
+    """
+    df = compute_disparity(df, weight_column, source_column, target_column)
+    return df[df["disparity"].to_numpy() < alpha]
+
+
+def disparity_csr(matrix: sp.spmatrix) -> sp.csr_matrix:
+    """
+    Compute the disparity filter p-values of all the edges of an undirected weighted
+    graph given as a symmetric sparse adjacency matrix (e.g. from edgelist_to_csr).
+    :param matrix: sp.spmatrix, the (n, n) symmetric adjacency matrix.
+    :return: sp.csr_matrix, a matrix with the same sparsity pattern,
+        holding the p-value of each edge.
+    """
+    matrix = sp.csr_matrix(matrix, dtype=np.float64)
+    matrix.eliminate_zeros()
+    degrees = np.diff(matrix.indptr).astype(np.float64)
+    strengths = np.asarray(matrix.sum(axis=1)).ravel()
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    cols = matrix.indices
+    pvalues = np.minimum(
+        _disparity(matrix.data, strengths[rows], degrees[rows]),
+        _disparity(matrix.data, strengths[cols], degrees[cols]),
+    )
+    return sp.csr_matrix((pvalues, matrix.indices, matrix.indptr), shape=matrix.shape)
+
+
+def compute_disparity_streaming(
+    chunks: EdgeChunks,
+    weight_column: str = "weight",
+    source_column: str = "source",
+    target_column: str = "target",
+    output_column: str = "disparity",
+    registry: Optional[IdRegistry] = None,
+) -> Generator[pd.DataFrame, None, None]:
+    """
+    Compute the disparity filter p-values over an edge list that does not fit in memory,
+    as compute_disparity. A first pass over the chunks accumulates the strength and
+    degree of each node, then a second pass yields the chunks with the p-values,
+    so that only one chunk and the node arrays are held in memory.
+    :param chunks: the edge list, see iter_edge_chunks.
+    :param weight_column: str, the name of the column with the edge weights.
+        Default is 'weight'.
+    :param source_column: str, the name of the column with the source nodes.
+        Default is 'source'.
+    :param target_column: str, the name of the column with the target nodes.
+        Default is 'target'.
+    :param output_column: str, the name of the new column with the p-values.
+        Default is 'disparity'.
+    :param registry: IdRegistry, the registry of the node identifiers.
+        Default is None, in which case the nodes are registered during the first pass.
+    :return: generator, a generator that yields the chunks with the new column.
+    """
+    registry = IdRegistry() if registry is None else registry
+    strengths = np.zeros(len(registry), dtype=np.float64)
+    degrees = np.zeros(len(registry), dtype=np.float64)
+    columns = [source_column, target_column, weight_column]
+    for chunk in iter_edge_chunks(chunks, columns=columns):
+        registry.add(chunk[source_column])
+        registry.add(chunk[target_column])
+        codes = np.concatenate(
+            [
+                registry.encode(chunk[source_column]),
+                registry.encode(chunk[target_column]),
+            ]
+        )
+        weights = np.tile(chunk[weight_column].to_numpy(dtype=np.float64), 2)
+        strengths = _add_counts(strengths, np.bincount(codes, weights=weights))
+        degrees = _add_counts(degrees, np.bincount(codes))
+    for chunk in iter_edge_chunks(chunks):
+        weights = chunk[weight_column].to_numpy(dtype=np.float64)
+        source = registry.encode(chunk[source_column])
+        target = registry.encode(chunk[target_column])
+        chunk = chunk.copy()
+        chunk[output_column] = np.minimum(
+            _disparity(weights, strengths[source], degrees[source]),
+            _disparity(weights, strengths[target], degrees[target]),
+        )
+        yield chunk
+
+
+def _add_counts(totals: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Add per-node counts to running totals, growing the totals for new nodes
+    :param totals: np.ndarray, the running totals.
+    :param counts: np.ndarray, the counts of a chunk, indexed like the totals.
+    :return: np.ndarray, the updated totals.
+    """
+    if len(counts) > len(totals):
+        totals = np.concatenate([totals, np.zeros(len(counts) - len(totals))])
+    totals[: len(counts)] += counts
+    return totals
+
+
+def _neighborhood_overlap(
+    adjacency: sp.csr_matrix, rows: np.ndarray, cols: np.ndarray, chunk_size: int
+) -> np.ndarray:
+    """
+    Returns the neighborhood overlap of the edges (rows[i], cols[i]) of a graph
+    given as a binary symmetric adjacency matrix, computing the common neighbors
+    of chunk_size edges at a time.
+    :param adjacency: sp.csr_matrix, the (n, n) binary symmetric adjacency matrix.
+    :param rows: np.ndarray, the indices of the sources of the edges.
+    :param cols: np.ndarray, the indices of the targets of the edges.
+    :param chunk_size: int, the number of edges processed at a time.
+    :return: np.ndarray of float64, the overlaps.
+    """
+    degrees = np.diff(adjacency.indptr)
+    common = np.zeros(len(rows), dtype=np.float64)
+    for start in range(0, len(rows), chunk_size):
+        end = start + chunk_size
+        common[start:end] = np.asarray(
+            adjacency[rows[start:end]].multiply(adjacency[cols[start:end]]).sum(axis=1)
+        ).ravel()
+    union = degrees[rows] + degrees[cols] - 2 - common
+    return np.divide(
+        common,
+        union,
+        out=np.zeros(len(rows), dtype=np.float64),
+        where=(union > 0) & (rows != cols),
+    )
+
+
+def compute_neighborhood_overlap(
+    df: pd.DataFrame,
+    source_column: str = "source",
+    target_column: str = "target",
+    output_column: str = "overlap",
+    chunk_size: int = 100_000,
+) -> pd.DataFrame:
+    """
+    Compute the neighborhood overlap of the edges of an undirected graph
+    (Onnela et al., "Structure and tie strengths in mobile communication networks",
+    PNAS 2007): the number of common neighbors of the endpoints u and v, divided by
+    the number of nodes neighbor of either of them, u and v excluded, i.e.
+    n_uv / ((k_u - 1) + (k_v - 1) - n_uv). Edges whose endpoints have no other
+    neighbors, and self-loops, have overlap 0.
+    The common neighbors are only computed for the existing edges, by multiplying
+    the rows of the sparse adjacency matrix of their endpoints, chunk_size edges at a time.
+    :param df: pd.DataFrame, the edge list, e.g. of a projected co-retweet graph.
+    :param source_column: str, the name of the column with the source nodes.
+        Default is 'source'.
+    :param target_column: str, the name of the column with the target nodes.
+        Default is 'target'.
+    :param output_column: str, the name of the new column with the overlaps.
+        Default is 'overlap'.
+    :param chunk_size: int, the number of edges processed at a time. Default is 100000.
+    :return: pd.DataFrame, the edge list with the new column.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({"source": ["a", "a", "b", "c"], "target": ["b", "c", "c", "d"]})
+    >>> compute_neighborhood_overlap(df)["overlap"].tolist()
+    [1.0, 0.5, 0.5, 0.0]
+    """
+    assert chunk_size > 0, "Chunk size should be positive"
+    codes, uniques = pd.factorize(
+        pd.concat([df[source_column], df[target_column]], ignore_index=True)
+    )
+    rows, cols = codes[: len(df)], codes[len(df) :]
+    n = len(uniques)
+    adjacency = sp.coo_matrix(
+        (np.ones(2 * len(df), dtype=np.float64), (codes, np.r_[cols, rows])),
+        shape=(n, n),
+    ).tocsr()
+    # duplicated edges and self-loops do not count as neighbors
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    adjacency.data[:] = 1.0
+    df = df.copy()
+    df[output_column] = _neighborhood_overlap(adjacency, rows, cols, chunk_size)
+    return df
+
+
+def neighborhood_overlap_filter(
+    df: pd.DataFrame,
+    threshold: float = 0.39,
+    comparison: Literal["<", "<=", "==", ">=", ">"] = ">=",
+    source_column: str = "source",
+    target_column: str = "target",
+    chunk_size: int = 100_000,
+) -> pd.DataFrame:
+    """
+    Filter edges based on their neighborhood overlap (see compute_neighborhood_overlap),
+    e.g. to keep the edges embedded in dense groups of users.
+    :param df: pd.DataFrame, the edge list.
+    :param threshold: float, the threshold value to compare against. Default is 0.39.
+    :param comparison: str, the comparison operator to use. Default is ">=".
+        The comparison operators available are: "<", "<=", "==", ">=", ">".
+    :param source_column: str, the name of the column with the source nodes.
+        Default is 'source'.
+    :param target_column: str, the name of the column with the target nodes.
+        Default is 'target'.
+    :param chunk_size: int, the number of edges processed at a time. Default is 100000.
+    :return: pd.DataFrame, the filtered edge list, with an 'overlap' column.
+    """
+    df = compute_neighborhood_overlap(
+        df, source_column, target_column, chunk_size=chunk_size
+    )
+    return filter_edgelist(df, "overlap", threshold, comparison)
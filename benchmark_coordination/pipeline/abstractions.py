@@ -3,6 +3,8 @@ from typing import List, Optional, Union
 import pandas as pd
 import uuid
 
+from benchmark_coordination.pipeline.profiling import export_metrics
+
 
 class IPipeline(ABC):
     def __init__(self, verbose: bool = False, pipeline_id: Optional[str] = None):
@@ -15,6 +17,19 @@ class IPipeline(ABC):
     def fit(self, data: pd.DataFrame) -> Union[pd.DataFrame, List[pd.DataFrame]]:
         pass
 
+    @property
+    @abstractmethod
+    def metrics(self) -> pd.DataFrame:
+        pass
+
+    def export_metrics(self, file_path: str) -> None:
+        """
+        Save the metrics of the last fit to a '.json' or '.parquet' file
+        :param file_path: str, the path of the file
+        :return: None
+        """
+        export_metrics(self.metrics, file_path)
+
     @property
     def pipeline_id(self) -> str:
         """
@@ -0,0 +1,396 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+import types
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa  # type: ignore
+import pyarrow.parquet as pq  # type: ignore
+
+from benchmark_coordination.utils.logging import logger
+
+
+def fingerprint_dataframe(data: pd.DataFrame) -> str:
+    """
+    Compute a content fingerprint of a dataframe.
+    The fingerprint depends on the column names, the dtypes, the index and the values.
+    Columns holding unhashable values (e.g. lists) are fingerprinted through their repr.
+    :param data: pd.DataFrame, the dataframe to fingerprint.
+    :return: str, the hex digest of the fingerprint.
+    ----------------
+    Example:
+    ----------------
+    >>> import pandas as pd
+    >>> df = pd.DataFrame({"author_id": [1, 2], "trace": ["a", "b"]})
+    >>> fingerprint_dataframe(df) == fingerprint_dataframe(df.copy())
+    True
+    """
+    digest = hashlib.sha256()
+    digest.update(repr(list(data.columns)).encode())
+    digest.update(repr([str(dtype) for dtype in data.dtypes]).encode())
+    digest.update(
+        pd.util.hash_pandas_object(data.index, index=False).to_numpy().tobytes()
+    )
+    for column in data.columns:
+        try:
+            hashed = pd.util.hash_pandas_object(data[column], index=False)
+        except TypeError:
+            hashed = pd.util.hash_pandas_object(data[column].map(repr), index=False)
+        digest.update(hashed.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _hash_value(value: Any, digest: Any, seen: Set[int]) -> None:
+    """
+    Feed the content of a value into a hash digest.
+    Arrays and pandas objects are hashed through their full content, functions through
+    their identity, bytecode and closure, and other objects through their pickle.
+    :param value: Any, the value to hash.
+    :param digest: hashlib hash object, the digest to update.
+    :param seen: set, the ids of the functions being hashed, to stop on recursion.
+    :raise TypeError: if the value cannot be hashed by content.
+    """
+    digest.update(f"\x1e{type(value).__module__}.{type(value).__qualname__}".encode())
+    if value is None or isinstance(value, (bool, int, float, complex, str)):
+        # the repr of these types is exact
+        digest.update(repr(value).encode())
+    elif isinstance(value, bytes):
+        digest.update(value)
+    elif isinstance(value, np.generic):
+        digest.update(str(value.dtype).encode() + value.tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype}{value.shape}".encode())
+        if value.dtype.hasobject:
+            _hash_value(value.tolist(), digest, seen)
+        else:
+            digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, pd.DataFrame):
+        digest.update(fingerprint_dataframe(value).encode())
+    elif isinstance(value, (pd.Series, pd.Index)):
+        digest.update(f"{value.dtype}{value.name!r}".encode())
+        hashed = pd.util.hash_pandas_object(value, index=False).to_numpy()
+        digest.update(hashed.tobytes())
+        if isinstance(value, pd.Series):
+            _hash_value(value.index, digest, seen)
+    elif isinstance(value, (list, tuple)):
+        digest.update(str(len(value)).encode())
+        for item in value:
+            _hash_value(item, digest, seen)
+    elif isinstance(value, (set, frozenset, dict)):
+        # hash the items independently, so that the result does not depend on their order
+        items = value.items() if isinstance(value, dict) else ((v, None) for v in value)
+        hashed_items = []
+        for key, item in items:
+            item_digest = hashlib.sha256()
+            _hash_value(key, item_digest, seen)
+            _hash_value(item, item_digest, seen)
+            hashed_items.append(item_digest.digest())
+        digest.update(b"".join(sorted(hashed_items)))
+    elif isinstance(value, partial):
+        _hash_value((value.func, value.args, value.keywords), digest, seen)
+    elif isinstance(value, types.CodeType):
+        digest.update(value.co_code)
+        _hash_value(value.co_names, digest, seen)
+        _hash_value(value.co_consts, digest, seen)
+    elif isinstance(value, (types.FunctionType, types.MethodType)):
+        function: Any = getattr(value, "__func__", value)
+        digest.update(f"{function.__module__}.{function.__qualname__}".encode())
+        if id(function) in seen:
+            return
+        seen.add(id(function))
+        _hash_value(function.__code__, digest, seen)
+        _hash_value(function.__defaults__, digest, seen)
+        _hash_value(function.__kwdefaults__, digest, seen)
+        for cell in function.__closure__ or ():
+            _hash_value(cell.cell_contents, digest, seen)
+        if isinstance(value, types.MethodType):
+            _hash_value(value.__self__, digest, seen)
+    elif isinstance(value, (type, types.BuiltinFunctionType, types.ModuleType)):
+        name = getattr(value, "__qualname__", value.__name__)
+        digest.update(f"{getattr(value, '__module__', '')}.{name}".encode())
+    else:
+        try:
+            digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            raise TypeError(f"Cannot hash {type(value).__qualname__}: {e}") from e
+
+
+def fingerprint_step(step: Callable, params: Dict[str, Any]) -> Optional[str]:
+    """
+    Compute a fingerprint of a pipeline step from the function identity and its params.
+    For plain python functions, the bytecode, the constants and the closure are part
+    of the identity, so that editing the body of a step invalidates its fingerprint.
+    The params are hashed by content: arrays and pandas objects through all their values,
+    and other objects through their pickle. Steps with a param that cannot be hashed
+    by content (e.g. an open file) are uncacheable.
+    :param step: Callable, the function applied by the step.
+    :param params: dict, the keyword arguments passed to the step.
+    :return: str, the hex digest of the fingerprint, or None if the step is uncacheable.
+    ----------------
+    Example:
+    ----------------
+    >>> def double(df, column):
+    ...     return df.assign(**{column: df[column] * 2})
+    >>> fingerprint_step(double, {"column": "a"}) == fingerprint_step(double, {"column": "a"})
+    True
+    >>> fingerprint_step(double, {"column": "a"}) == fingerprint_step(double, {"column": "b"})
+    False
+    """
+    digest = hashlib.sha256()
+    try:
+        _hash_value(step, digest, set())
+        _hash_value(params, digest, set())
+    except (TypeError, RecursionError) as e:
+        logger.debug(f"Step {step!r} is uncacheable: {e}")
+        return None
+    return digest.hexdigest()
+
+
+# the values of object columns that are read back unchanged from parquet
+_SCALAR_TYPES = (str, bytes, bool, int, float, np.generic)
+# the parquet metadata key listing the positions of the columns of lists
+_LIST_COLUMNS_KEY = b"benchmark_coordination.list_columns"
+
+
+def _list_columns(data: pd.DataFrame) -> Optional[List[int]]:
+    """
+    Find the columns of lists, which parquet reads back as arrays
+    :param data: pd.DataFrame, the data to cache.
+    :return: list[int], the positions of the columns of lists of scalars, or None
+        if a column holds other values that are not read back unchanged
+        (e.g. tuples, dicts or lists of tuples).
+    """
+    positions = []
+    for position, (_, column) in enumerate(data.items()):
+        if column.dtype != object:
+            continue
+        values = column[column.notna()]
+        others = {t for t in map(type, values) if not issubclass(t, _SCALAR_TYPES)}
+        if not others:
+            continue
+        if others != {list}:
+            return None
+        # the lists are restored, but not the containers in them (e.g. n-grams)
+        elements = set(map(type, (x for values_list in values for x in values_list)))
+        if not all(issubclass(t, _SCALAR_TYPES) for t in elements):
+            return None
+        positions.append(position)
+    return positions
+
+
+class StepCache:
+    """
+    On-disk, content-addressed cache of the intermediate results of a Pipeline.
+
+    Each entry is the output of a pipeline prefix, stored as a parquet file and keyed
+    by the fingerprint of the input data chained with the fingerprints of the steps
+    of the prefix. A pipeline can therefore resume from the deepest cached prefix.
+    The total size of the cache is bounded, and the least recently used entries
+    are evicted first.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory where the cached dataframes are stored. It is created if missing.
+    max_size_bytes : int, optional
+        The maximum total size of the cache on disk. Default is 10 GiB.
+
+    Examples
+    --------
+    >>> import tempfile
+    >>> from benchmark_coordination.pipeline.pipeline import Pipeline
+    >>> from benchmark_coordination.network_builder.thresholding import filter_edgelist
+    >>> cache = StepCache(tempfile.mkdtemp())
+    >>> pipe = Pipeline(
+    ...     steps=[("filter", filter_edgelist, {"column_name": "w", "threshold": 1, "comparison": ">"})],
+    ...     cache=cache,
+    ... )
+    >>> df = pd.DataFrame({"source": [1, 2], "target": [2, 3], "w": [1, 2]})
+    >>> pipe.fit(df).equals(pipe.fit(df))  # the second fit is read from the cache
+    True
+    """
+
+    _SUFFIX = ".parquet"
+
+    def __init__(self, cache_dir: str, max_size_bytes: int = 10 * 1024**3):
+        assert max_size_bytes > 0, "The maximum size of the cache must be positive"
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self._last_access_ns = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        """
+        Returns the path of the file storing the entry with the given key
+        :param key: str, the key of the entry
+        :return: str
+        """
+        return os.path.join(self.cache_dir, key + self._SUFFIX)
+
+    def _touch(self, path: str) -> None:
+        """
+        Mark a file as the most recently used entry, by updating its modification time.
+        The timestamps are kept strictly increasing, since the filesystem clock
+        can be coarser than the interval between two accesses.
+        :param path: str, the path of the entry
+        """
+        self._last_access_ns = max(time.time_ns(), self._last_access_ns + 1)
+        os.utime(path, ns=(self._last_access_ns, self._last_access_ns))
+
+    def prefix_keys(
+        self, data: pd.DataFrame, steps: List[Tuple]
+    ) -> List[Optional[str]]:
+        """
+        Compute the keys of all the prefixes of a list of pipeline steps.
+        The i-th key identifies the output of the first i + 1 steps applied to data.
+        The keys from the first uncacheable step onwards are None.
+        :param data: pd.DataFrame, the input data of the pipeline.
+        :param steps: list of tuples, the (name, step, params) steps of the pipeline.
+        :return: list[str or None], one key for each step.
+        """
+        keys: List[Optional[str]] = []
+        key: Optional[str] = fingerprint_dataframe(data)
+        for _, step, params in steps:
+            fingerprint = fingerprint_step(step, params)
+            if key is not None and fingerprint is not None:
+                key = hashlib.sha256((key + fingerprint).encode()).hexdigest()
+            else:
+                key = None
+            keys.append(key)
+        return keys
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Read an entry from the cache, marking it as recently used.
+        :param key: str, the key of the entry.
+        :return: pd.DataFrame, the cached data, or None if the key is not in the cache.
+        """
+        path = self._path(key)
+        try:
+            table = pq.read_table(path)
+        except FileNotFoundError:
+            return None
+        data = table.to_pandas()
+        # restore the lists, which are read as arrays
+        metadata = table.schema.metadata or {}
+        for position in json.loads(metadata.get(_LIST_COLUMNS_KEY, b"[]")):
+            values = table.column(position).to_pylist()
+            data.isetitem(position, pd.Series(values, index=data.index, dtype=object))
+        self._touch(path)
+        return data
+
+    def put(self, key: str, data: pd.DataFrame) -> bool:
+        """
+        Write an entry to the cache, then evict the least recently used entries
+        if the cache exceeds its maximum size.
+        Dataframes that are not read back unchanged from parquet (e.g. columns
+        of tuples or dicts) are not cached, so that a cache hit returns the same data
+        as running the steps. Columns of lists are restored when read.
+        :param key: str, the key of the entry.
+        :param data: pd.DataFrame, the data to cache.
+        :return: bool, True if the data was cached, False otherwise.
+        """
+        list_columns = _list_columns(data)
+        if list_columns is None:
+            logger.debug(f"Cannot cache entry {key}: values not read back unchanged")
+            return False
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            table = pa.Table.from_pandas(data)
+            metadata = {
+                **(table.schema.metadata or {}),
+                _LIST_COLUMNS_KEY: json.dumps(list_columns).encode(),
+            }
+            pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            logger.debug(f"Cannot cache entry {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+        self._touch(path)
+        self._evict()
+        return key in self
+
+    def deepest_prefix(
+        self, keys: List[Optional[str]]
+    ) -> Tuple[int, Optional[pd.DataFrame]]:
+        """
+        Find the deepest cached prefix among the given prefix keys.
+        :param keys: list[str or None], the prefix keys, as returned by prefix_keys.
+        :return: tuple, the number of steps covered by the cached prefix and its data.
+            If no prefix is cached, returns (0, None).
+        """
+        for n_steps in range(len(keys), 0, -1):
+            key = keys[n_steps - 1]
+            if key is None:
+                continue
+            data = self.get(key)
+            if data is not None:
+                return n_steps, data
+        return 0, None
+
+    def _entries(self) -> List[Tuple[int, int, str]]:
+        """
+        Returns the entries of the cache, from the least to the most recently used
+        :return: list of (last access time, size in bytes, path) tuples
+        """
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith(self._SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, file_name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return sorted(entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """
+        Returns the total size of the cache on disk
+        :return: int
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache fits its maximum size
+        """
+        entries = self._entries()
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+            logger.debug(f"Evicted {path} from the step cache")
+
+    def clear(self) -> None:
+        """
+        Remove all the entries from the cache
+        """
+        for _, _, path in self._entries():
+            os.remove(path)
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def __repr__(self) -> str:
+        return (
+            f"StepCache(cache_dir={self.cache_dir!r}, "
+            f"max_size_bytes={self.max_size_bytes})"
+        )
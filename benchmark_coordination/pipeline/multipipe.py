@@ -4,6 +4,13 @@ import multiprocessing
 
 from benchmark_coordination.pipeline.abstractions import IPipeline
 from benchmark_coordination.pipeline.pipeline import Pipeline
+from benchmark_coordination.pipeline.prefix_tree import (
+    build_prefix_tree,
+    fit_subtree,
+    run_node,
+)
+from benchmark_coordination.pipeline.profiling import METRICS_COLUMNS
+from benchmark_coordination.utils.logging import logger
 
 
 class MultiPipeline(IPipeline):
@@ -21,12 +28,25 @@ class MultiPipeline(IPipeline):
     verbose : bool, optional
         Whether to log the steps of the pipeline. Default is False.
 
+    share_prefixes : bool, optional
+        Whether to run the leading steps shared by several pipelines only once.
+        Steps are shared when they apply the same function with the same params.
+        The shared prefix is run once and its output is fanned out to the branches,
+        which are fitted in parallel from the first point where the pipelines diverge.
+        The step cache of the pipelines is not used in this mode, and the metrics of a
+        shared step list all the pipelines sharing it in 'pipeline_id'.
+        Default is False.
+
     Attributes
     ----------
     named_pipelines : Dictionary-like object, with the following attributes.
         Read-only attribute to access any step parameter by user given name.
         Keys are step names and values are steps parameters.
 
+    metrics : pd.DataFrame
+        The per-step metrics recorded by the worker processes during the last fit,
+        for the pipelines created with profile=True, identified by 'pipeline_id'.
+
     """
 
     def __init__(
@@ -34,9 +54,12 @@ class MultiPipeline(IPipeline):
         pipelines: List[Pipeline],
         multipipeline_id: Optional[str] = None,
         verbose: bool = False,
+        share_prefixes: bool = False,
     ):
         super().__init__(verbose=verbose, pipeline_id=multipipeline_id)
         self._pipelines = pipelines
+        self.share_prefixes = share_prefixes
+        self._metrics = pd.DataFrame(columns=METRICS_COLUMNS)
 
     @property
     def pipelines(self) -> List[Pipeline]:
@@ -54,6 +77,14 @@ class MultiPipeline(IPipeline):
         """
         return [pipeline.pipeline_id for pipeline in self.pipelines]
 
+    @property
+    def metrics(self) -> pd.DataFrame:
+        """
+        Returns the per-step metrics of all pipelines recorded during the last fit
+        :return: pd.DataFrame
+        """
+        return self._metrics
+
     def _pipeline_ids(self) -> List[str]:
         """
         Returns the IDs of the pipelines, in the order they were added
@@ -72,6 +103,19 @@ class MultiPipeline(IPipeline):
         """
         return pipeline.pipeline_id, pipeline.fit(data)
 
+    def _fit_pipeline_with_metrics(
+        self, pipeline: Pipeline, data: pd.DataFrame
+    ) -> Tuple[str, pd.DataFrame, pd.DataFrame]:
+        """
+        Fit a pipeline on the data, also returning the metrics recorded in the worker
+        :param pipeline: Pipeline, the pipeline to fit
+        :param data: pd.DataFrame, the data to fit the pipeline on
+        :return: Tuple[str, pd.DataFrame, pd.DataFrame], the ID of the pipeline,
+            the transformed data and the per-step metrics
+        """
+        pipeline_id, result = self._fit_pipeline(pipeline, data)
+        return pipeline_id, result, pipeline.metrics
+
     def fit(self, data: pd.DataFrame) -> List[pd.DataFrame]:
         """
         Fit each pipeline on the data, running each pipeline in parallel.
@@ -86,13 +130,67 @@ class MultiPipeline(IPipeline):
         List[pd.DataFrame]
             The transformed data.
         """
+        if self.share_prefixes:
+            return self._fit_shared(data)
         n_processes = max(multiprocessing.cpu_count() - 1, len(self.pipelines))
         with multiprocessing.Pool(n_processes) as pool:
             results = pool.starmap(
-                self._fit_pipeline, [(pipeline, data) for pipeline in self.pipelines]
+                self._fit_pipeline_with_metrics,
+                [(pipeline, data) for pipeline in self.pipelines],
             )
         # return the data in the order of the pipelines
-        df_dict = {pipeline_id: result for pipeline_id, result in results}
+        df_dict = {pipeline_id: result for pipeline_id, result, _ in results}
+        metrics = [metrics for _, _, metrics in results if not metrics.empty]
+        self._metrics = (
+            pd.concat(metrics, ignore_index=True)
+            if metrics
+            else pd.DataFrame(columns=METRICS_COLUMNS)
+        )
+        return [df_dict[pipeline_id] for pipeline_id in self._pipeline_ids()]
+
+    def _fit_shared(self, data: pd.DataFrame) -> List[pd.DataFrame]:
+        """
+        Fit the pipelines on the data, running the steps they share only once.
+        The trunk shared by all the pipelines is run in the current process
+        on a copy of the data, then the branches are fitted in parallel.
+        Only the steps of the pipelines created with profile=True are profiled.
+        :param data: pd.DataFrame, the data to run through the pipelines
+        :return: List[pd.DataFrame], the transformed data, in the order of the pipelines
+        """
+        root = build_prefix_tree(self.pipelines)
+        records: list = []
+        if self.verbose:
+            n_steps = sum(len(pipeline) for pipeline in self.pipelines)
+            logger.info(f"Running {root.n_steps()} unique steps out of {n_steps}.")
+
+        # run the trunk shared by all the pipelines
+        node = root
+        while len(node.children) == 1 and not node.pipeline_ids:
+            node = next(iter(node.children.values()))
+            if node.depth == 1:
+                # steps modifying their input in place must not modify the caller's data
+                data = data.copy()
+            data = run_node(node, data, False, records)
+
+        # fan out to the branches, each one is sent to a worker
+        branches = list(node.children.values())
+        results = [(pipeline_id, data.copy()) for pipeline_id in node.pipeline_ids]
+        if branches:
+            n_processes = max(multiprocessing.cpu_count() - 1, len(branches))
+            with multiprocessing.Pool(n_processes) as pool:
+                outputs = pool.starmap(
+                    fit_subtree, [(branch, data, False) for branch in branches]
+                )
+            for branch_results, branch_records in outputs:
+                results.extend(branch_results)
+                records.extend(branch_records)
+
+        self._metrics = (
+            pd.DataFrame(records, columns=METRICS_COLUMNS)
+            if records
+            else pd.DataFrame(columns=METRICS_COLUMNS)
+        )
+        df_dict = dict(results)
         return [df_dict[pipeline_id] for pipeline_id in self._pipeline_ids()]
 
     def __len__(self) -> int:
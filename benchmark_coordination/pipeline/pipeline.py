@@ -1,8 +1,11 @@
 from functools import partial
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
 import pandas as pd
 
 from benchmark_coordination.pipeline.abstractions import IPipeline
+from benchmark_coordination.pipeline.cache import StepCache
+from benchmark_coordination.pipeline.profiling import METRICS_COLUMNS, StepProfiler
+from benchmark_coordination.pipeline.streaming import n_row_local_steps
 from benchmark_coordination.utils.logging import logger
 
 
@@ -24,11 +27,20 @@ class Pipeline(IPipeline):
         The ID of the pipeline. If not provided, a random ID will be generated.
     verbose : bool, optional
         Whether to log the steps of the pipeline. Default is False.
+    cache : StepCache, optional
+        If provided, the output of each step is stored in the cache, and the pipeline
+        resumes from the deepest prefix of steps already cached for the same input data.
+        Default is None (no caching).
+    profile : bool, optional
+        Whether to record per-step metrics (wall time, CPU time, peak memory,
+        rows and columns in/out, memory footprint) during fit. Default is False.
 
     Attributes
     ----------
     named_steps : Dictionary-like object. Read-only attribute to access any step parameter
         by name. Keys are step names and values are steps parameters.
+    metrics : pd.DataFrame. The per-step metrics recorded during the last fit,
+        one row per executed step. Empty if profile is False.
 
     Examples
     --------
@@ -66,10 +78,15 @@ class Pipeline(IPipeline):
         *,
         pipeline_id: Optional[str] = None,
         verbose: bool = False,
+        cache: Optional[StepCache] = None,
+        profile: bool = False,
     ):
         super().__init__(verbose=verbose, pipeline_id=pipeline_id)
 
         self._steps = steps
+        self.cache = cache
+        self.profile = profile
+        self._profiler: Optional[StepProfiler] = None
 
     @property
     def steps(self) -> List[Tuple]:
@@ -90,6 +107,16 @@ class Pipeline(IPipeline):
             named_steps[name] = partial(step, **params)
         return named_steps
 
+    @property
+    def metrics(self) -> pd.DataFrame:
+        """
+        Returns the per-step metrics recorded during the last fit
+        :return: pd.DataFrame
+        """
+        if self._profiler is None:
+            return pd.DataFrame(columns=METRICS_COLUMNS)
+        return self._profiler.to_dataframe()
+
     def fit(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Fit the pipeline on the data.
@@ -104,13 +131,96 @@ class Pipeline(IPipeline):
         pd.DataFrame
             The transformed data.
         """
+        self._profiler = StepProfiler(self._pipeline_id) if self.profile else None
         with logger.contextualize(pipeline=self._pipeline_id):
-            for name, step, params in self.steps:
-                data = step(data, **params)
+            keys: List[Optional[str]] = []
+            n_cached = 0
+            if self.cache is not None:
+                keys = self.cache.prefix_keys(data, self.steps)
+                n_cached, cached = self.cache.deepest_prefix(keys)
+                if cached is not None:
+                    data = cached
+                    if self.verbose:
+                        logger.info(f"Steps 1-{n_cached}: loaded from cache.")
+            for i, (name, step, params) in enumerate(self.steps):
+                if i < n_cached:
+                    continue
+                if self._profiler is not None:
+                    data = self._profiler.run(i, name, step, data, params)
+                else:
+                    data = step(data, **params)
+                key = keys[i] if self.cache is not None else None
+                if self.cache is not None and key is not None:
+                    self.cache.put(key, data)
                 if self.verbose:
                     logger.info(f"Step {name}: completed.")
             return data
 
+    def transform_chunks(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Generator[pd.DataFrame, None, None]:
+        """
+        Apply the pipeline to each chunk of the data independently.
+        All the steps must be row-local (see utils.step_markers.row_local),
+        so that only one chunk at a time is held in memory.
+
+        Parameters
+        ----------
+        chunks : iterable of pd.DataFrame
+            The chunks of the data, e.g. from utils.io_utils.iter_parquet_batches.
+
+        Returns
+        -------
+        Generator[pd.DataFrame, None, None]
+            The transformed chunks.
+        """
+        if n_row_local_steps(self.steps) < len(self.steps):
+            raise ValueError("All the steps must be row-local to transform chunks")
+        with logger.contextualize(pipeline=self._pipeline_id):
+            for i, chunk in enumerate(chunks):
+                for _, step, params in self.steps:
+                    chunk = step(chunk, **params)
+                if self.verbose:
+                    logger.info(f"Chunk {i}: completed.")
+                yield chunk
+
+    def fit_chunks(self, chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Fit the pipeline on data given in chunks, e.g. larger than memory.
+        The leading row-local steps (see utils.step_markers.row_local) are applied
+        chunk by chunk, then the reduced chunks are concatenated, with a new index,
+        and the remaining steps are run on the whole data.
+
+        Parameters
+        ----------
+        chunks : iterable of pd.DataFrame
+            The chunks of the data, e.g. from utils.io_utils.iter_parquet_batches.
+
+        Returns
+        -------
+        pd.DataFrame
+            The transformed data.
+        """
+        n_local = n_row_local_steps(self.steps)
+        local = Pipeline(
+            self.steps[:n_local], pipeline_id=self._pipeline_id, verbose=self.verbose
+        )
+        reduced = list(local.transform_chunks(chunks))
+        if not reduced:
+            raise ValueError("No chunks to fit the pipeline on")
+        data = pd.concat(reduced, ignore_index=True)
+        del reduced
+        remaining = Pipeline(
+            self.steps[n_local:],
+            pipeline_id=self._pipeline_id,
+            verbose=self.verbose,
+            cache=self.cache,
+            profile=self.profile,
+        )
+        data = remaining.fit(data)
+        self._profiler = remaining._profiler
+        return data
+
     def __len__(self) -> int:
         """
         Returns the length of the Pipeline
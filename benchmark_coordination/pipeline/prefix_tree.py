@@ -0,0 +1,148 @@
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+
+from benchmark_coordination.pipeline.cache import fingerprint_step
+from benchmark_coordination.pipeline.pipeline import Pipeline
+from benchmark_coordination.pipeline.profiling import StepProfiler
+
+
+class PrefixNode:
+    """
+    A node of the prefix tree of a set of pipelines.
+
+    Each node stands for one step, shared by all the pipelines whose
+    leading steps are the steps on the path from the root to the node.
+    Two steps are the same when they apply the same function with the same params,
+    regardless of the name given to them in each pipeline.
+    Uncacheable steps (see fingerprint_step) are never shared.
+
+    Parameters
+    ----------
+    step : tuple, optional
+        The (name, step, params) tuple of the step. None for the root of the tree.
+    depth : int, optional
+        The number of steps on the path from the root, this node included. Default is 0.
+
+    Attributes
+    ----------
+    children : dict
+        The child nodes, keyed by the fingerprint of their step, or by a unique key
+        for uncacheable steps.
+    pipeline_ids : list of str
+        The IDs of the pipelines that end at this node.
+    shared_by : list of str
+        The IDs of all the pipelines that run the step of this node.
+    profile : bool
+        Whether any of the pipelines that run the step of this node is profiled.
+    """
+
+    def __init__(self, step: Optional[Tuple] = None, depth: int = 0):
+        self.step = step
+        self.depth = depth
+        self.children: Dict[str, "PrefixNode"] = {}
+        self.pipeline_ids: List[str] = []
+        self.shared_by: List[str] = []
+        self.profile = False
+
+    def n_steps(self) -> int:
+        """
+        Returns the number of steps in the subtree rooted at this node
+        :return: int
+        """
+        own = 0 if self.step is None else 1
+        return own + sum(child.n_steps() for child in self.children.values())
+
+    def __repr__(self) -> str:
+        name = "root" if self.step is None else self.step[0]
+        return f"PrefixNode(step={name}, shared_by={self.shared_by})"
+
+
+def build_prefix_tree(pipelines: List[Pipeline]) -> PrefixNode:
+    """
+    Build the prefix tree of a list of pipelines, merging the leading steps
+    that apply the same function with the same params.
+    :param pipelines: list of Pipeline, the pipelines to merge.
+    :return: PrefixNode, the root of the tree.
+    ----------------
+    Example:
+    ----------------
+    >>> from benchmark_coordination.network_builder.thresholding import filter_edgelist
+    >>> f = ("f", filter_edgelist, {"column_name": "w", "threshold": 1, "comparison": ">"})
+    >>> g = ("g", filter_edgelist, {"column_name": "w", "threshold": 2, "comparison": ">"})
+    >>> root = build_prefix_tree([Pipeline([f, g]), Pipeline([f, f])])
+    >>> root.n_steps()
+    3
+    """
+    root = PrefixNode()
+    for pipeline in pipelines:
+        node = root
+        for name, step, params in pipeline.steps:
+            key = fingerprint_step(step, params)
+            if key is None:
+                # the params cannot be compared, so the step is not shared
+                key = f"uncacheable-{len(node.children)}"
+            if key not in node.children:
+                node.children[key] = PrefixNode((name, step, params), node.depth + 1)
+            node = node.children[key]
+            node.shared_by.append(pipeline.pipeline_id)
+            node.profile = node.profile or pipeline.profile
+        node.pipeline_ids.append(pipeline.pipeline_id)
+    return root
+
+
+def run_node(
+    node: PrefixNode, data: pd.DataFrame, profile: bool, records: List[Dict[str, Any]]
+) -> pd.DataFrame:
+    """
+    Apply the step of a node to the data.
+    :param node: PrefixNode, the node to run.
+    :param data: pd.DataFrame, the input of the step.
+    :param profile: bool, whether to record the metrics of the step, even if none
+        of the pipelines sharing it is profiled.
+    :param records: list, where the metrics of the step are appended if it is profiled.
+        The 'pipeline_id' of the record lists all the pipelines sharing the step.
+    :return: pd.DataFrame, the output of the step.
+    """
+    assert node.step is not None, "The root of the prefix tree has no step to run"
+    name, step, params = node.step
+    if not (profile or node.profile):
+        return step(data, **params)
+    profiler = StepProfiler(",".join(node.shared_by))
+    data = profiler.run(node.depth - 1, name, step, data, params)
+    records.extend(profiler.records)
+    return data
+
+
+def fit_subtree(
+    node: PrefixNode, data: pd.DataFrame, profile: bool = False
+) -> Tuple[List[Tuple[str, pd.DataFrame]], List[Dict[str, Any]]]:
+    """
+    Run the subtree rooted at a node, executing each step once and fanning
+    its output out to the pipelines ending at the node and to the child nodes.
+    Every consumer but the last receives a copy of the output, so that steps
+    modifying their input in place do not affect the other branches.
+    :param node: PrefixNode, the root of the subtree. Its step is run on the data,
+        unless it is the root of the whole tree.
+    :param data: pd.DataFrame, the input of the subtree.
+    :param profile: bool, whether to record the metrics of all the steps, or only
+        of the steps of the pipelines created with profile=True. Default is False.
+    :return: tuple, the list of (pipeline ID, result) pairs for all the pipelines
+        ending in the subtree, and the list of recorded metrics.
+    """
+    results: List[Tuple[str, pd.DataFrame]] = []
+    records: List[Dict[str, Any]] = []
+    if node.step is not None:
+        data = run_node(node, data, profile, records)
+    children = list(node.children.values())
+    n_consumers = len(node.pipeline_ids) + len(children)
+    for pipeline_id in node.pipeline_ids:
+        n_consumers -= 1
+        results.append((pipeline_id, data.copy() if n_consumers > 0 else data))
+    for child in children:
+        n_consumers -= 1
+        child_results, child_records = fit_subtree(
+            child, data.copy() if n_consumers > 0 else data, profile
+        )
+        results.extend(child_results)
+        records.extend(child_records)
+    return results, records
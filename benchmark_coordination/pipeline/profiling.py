@@ -0,0 +1,196 @@
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # pragma: no cover (not available on Windows)
+    resource = None  # type: ignore
+
+METRICS_COLUMNS = [
+    "pipeline_id",
+    "step_index",
+    "step",
+    "wall_time_s",
+    "cpu_time_s",
+    "peak_memory_bytes",
+    "max_rss_bytes",
+    "rows_in",
+    "columns_in",
+    "memory_in_bytes",
+    "rows_out",
+    "columns_out",
+    "memory_out_bytes",
+    "process_id",
+]
+
+
+def _max_rss_bytes() -> Optional[int]:
+    """
+    Returns the peak resident set size of the current process, in bytes
+    :return: int, or None if not available on this platform
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _describe(data: Any) -> Dict[str, Optional[int]]:
+    """
+    Returns the shape and the memory footprint of a step input or output
+    :param data: the data, usually a pd.DataFrame
+    :return: dict, with keys 'rows', 'columns' and 'memory_bytes'
+    """
+    if isinstance(data, pd.DataFrame):
+        return {
+            "rows": len(data),
+            "columns": len(data.columns),
+            "memory_bytes": int(data.memory_usage(deep=True).sum()),
+        }
+    return {"rows": None, "columns": None, "memory_bytes": None}
+
+
+class StepProfiler:
+    """
+    Records per-step metrics of a pipeline: wall time, CPU time,
+    peak memory allocated by the step (via tracemalloc), peak resident set size
+    of the process, and shape and memory footprint of the step input and output.
+
+    Parameters
+    ----------
+    pipeline_id : str
+        The ID of the profiled pipeline, stored with each record.
+    trace_memory : bool, optional
+        Whether to trace the memory allocations of each step with tracemalloc.
+        Tracing slows down the steps noticeably. Default is True.
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> profiler = StepProfiler("pipe")
+    >>> df = profiler.run(0, "dedup", pd.DataFrame.drop_duplicates, pd.DataFrame({"a": [1, 1]}), {})
+    >>> profiler.to_dataframe()[["step", "rows_in", "rows_out"]]
+        step  rows_in  rows_out
+    0  dedup        2         1
+    """
+
+    def __init__(self, pipeline_id: str, trace_memory: bool = True):
+        self.pipeline_id = pipeline_id
+        self.trace_memory = trace_memory
+        self.records: List[Dict[str, Any]] = []
+
+    def run(
+        self,
+        step_index: int,
+        name: str,
+        step: Callable,
+        data: Any,
+        params: Dict[str, Any],
+    ) -> Any:
+        """
+        Apply a step to the data, recording its metrics.
+        :param step_index: int, the position of the step in the pipeline.
+        :param name: str, the name of the step.
+        :param step: Callable, the function applied by the step.
+        :param data: the input of the step.
+        :param params: dict, the keyword arguments passed to the step.
+        :return: the output of the step.
+        """
+        data_in = _describe(data)
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        try:
+            data = step(data, **params)
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+            peak_memory = None
+            if self.trace_memory:
+                peak_memory = tracemalloc.get_traced_memory()[1] - memory_before
+            if started_tracing:
+                tracemalloc.stop()
+        data_out = _describe(data)
+        self.records.append(
+            {
+                "pipeline_id": self.pipeline_id,
+                "step_index": step_index,
+                "step": name,
+                "wall_time_s": wall_time,
+                "cpu_time_s": cpu_time,
+                "peak_memory_bytes": peak_memory,
+                "max_rss_bytes": _max_rss_bytes(),
+                "rows_in": data_in["rows"],
+                "columns_in": data_in["columns"],
+                "memory_in_bytes": data_in["memory_bytes"],
+                "rows_out": data_out["rows"],
+                "columns_out": data_out["columns"],
+                "memory_out_bytes": data_out["memory_bytes"],
+                "process_id": os.getpid(),
+            }
+        )
+        return data
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns the recorded metrics, one row per step
+        :return: pd.DataFrame, with columns METRICS_COLUMNS
+        """
+        return pd.DataFrame(self.records, columns=METRICS_COLUMNS)
+
+
+def summarize_metrics(metrics: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate per-step metrics into per-pipeline totals, sorted by wall time,
+    to spot the most expensive pipelines.
+    :param metrics: pd.DataFrame, the per-step metrics (e.g. MultiPipeline.metrics).
+    :return: pd.DataFrame, indexed by pipeline_id, with the total wall and CPU time,
+        the largest per-step peak memory, the number of steps and the name
+        of the slowest step of each pipeline.
+    """
+    if metrics.empty:
+        return pd.DataFrame(
+            columns=[
+                "wall_time_s",
+                "cpu_time_s",
+                "peak_memory_bytes",
+                "n_steps",
+                "slowest_step",
+            ]
+        )
+    grouped = metrics.groupby("pipeline_id")
+    summary = grouped.agg(
+        wall_time_s=("wall_time_s", "sum"),
+        cpu_time_s=("cpu_time_s", "sum"),
+        peak_memory_bytes=("peak_memory_bytes", "max"),
+        n_steps=("step", "count"),
+    )
+    slowest = metrics.loc[grouped["wall_time_s"].idxmax()].set_index("pipeline_id")
+    summary["slowest_step"] = slowest["step"]
+    return summary.sort_values("wall_time_s", ascending=False)
+
+
+def export_metrics(metrics: pd.DataFrame, file_path: str) -> None:
+    """
+    Save pipeline metrics to a JSON (records orientation) or a parquet file,
+    depending on the file extension.
+    :param metrics: pd.DataFrame, the metrics to be saved.
+    :param file_path: str, the path of the file. It should end with '.json' or '.parquet'.
+    :return: None
+    """
+    if file_path.endswith(".json"):
+        metrics.to_json(file_path, orient="records", indent=2)
+    elif file_path.endswith(".parquet"):
+        metrics.to_parquet(file_path, index=False)
+    else:
+        raise ValueError("Metrics can only be exported to '.json' or '.parquet' files")
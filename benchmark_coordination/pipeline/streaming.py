@@ -0,0 +1,17 @@
+from typing import List, Tuple
+
+from benchmark_coordination.utils.step_markers import is_row_local
+
+
+def n_row_local_steps(steps: List[Tuple]) -> int:
+    """
+    Count the leading row-local steps of a pipeline.
+    :param steps: list of tuples, the (name, step, params) steps of the pipeline.
+    :return: int, the number of steps before the first step that is not row-local.
+    """
+    n_steps = 0
+    for _, step, _ in steps:
+        if not is_row_local(step):
+            break
+        n_steps += 1
+    return n_steps
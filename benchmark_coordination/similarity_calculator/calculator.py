@@ -1,6 +1,10 @@
 from typing import Callable, Dict, List
 
+import benchmark_coordination.similarity_calculator.kernels as kernels
 import benchmark_coordination.similarity_calculator.scores as scores
+from benchmark_coordination.similarity_calculator.cross_correlation import (
+    cross_correlation_similarity,
+)
 from benchmark_coordination.types.similarity_types import SimilarityMeasure
 
 
@@ -15,29 +19,54 @@ class SimilarityCalculator:
     >>> vector2 = [4, 5, 6]
     >>> similarity_calculator.calculate_similarity(vector1, vector2)
     0.9746318461970762
+    >>> import numpy as np
+    >>> encoded_calculator = SimilarityCalculator("jaccard", encoded=True)
+    >>> encoded_calculator.calculate_similarity(np.array([0, 1]), np.array([1, 2]))
+    0.3333333333333333
     """
 
-    def __init__(self, similarity_score: SimilarityMeasure) -> None:
+    def __init__(
+        self, similarity_score: SimilarityMeasure, encoded: bool = False
+    ) -> None:
         """
         Initialize the SimilarityCalculator object with the similarity score to be used.
         :param similarity_score: str, the similarity score to be used.
             If the similarity score is not one of the following:
+                "boolean"
                 "cardinality"
                 "cosine"
+                "cross-correlation"
                 "jaccard"
+                "jaccard-binary"
                 "ratcliff-obershelp"
             a ValueError will be raised.
+        :param encoded: bool, whether the vectors are encoded: sets of traces as sorted
+            arrays of unique ints (see kernels.encode_traces) for "cardinality" and
+            "jaccard", compared without building Python sets, and binary vectors packed
+            into 64-bit words (see kernels.pack_binary) for "jaccard-binary".
+            The other scores do not support encoded vectors. Default is False.
         :return: None
         """
         self.similarity_score = similarity_score
+        self.encoded = encoded
 
         self.similarity_measures: Dict[str, Callable] = {
+            "boolean": scores.boolean_similarity,
             "cardinality": scores.cardinality_similarity,
             "cosine": scores.cosine_similarity,
+            "cross-correlation": cross_correlation_similarity,
             "jaccard": scores.jaccard_similarity,
+            "jaccard-binary": scores.jaccard_binary_similarity,
             "ratcliff-obershelp": scores.ratcliff_obershelp_similarity,
         }
 
+        if encoded:
+            self.similarity_measures = {
+                "cardinality": kernels.cardinality_encoded,
+                "jaccard": kernels.jaccard_encoded,
+                "jaccard-binary": kernels.packed_jaccard,
+            }
+
         if self.similarity_score not in self.similarity_measures:
             raise ValueError("Invalid similarity score")
 
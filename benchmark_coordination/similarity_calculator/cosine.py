@@ -0,0 +1,217 @@
+from typing import Any, Literal, Optional, Sequence
+from numpy.typing import DTypeLike, NDArray
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp  # type: ignore
+
+
+def build_vector_matrix(
+    vectors: Sequence[Any],
+    coalesce: Literal["pad", "cut", "raise"] = "pad",
+    dtype: DTypeLike = np.float64,
+) -> NDArray[Any]:
+    """
+    Stack vectors of possibly different lengths into a fixed-dimension matrix, once,
+    instead of padding or cutting each pair of vectors when comparing them.
+    :param vectors: sequence of array-like, the vectors.
+    :param coalesce: one of 'pad', 'cut', 'raise'. If 'pad', the vectors are padded with 0
+        to the length of the longest one, which leaves their cosine similarities unchanged.
+        If 'cut', they are truncated to the length of the shortest one (of all the vectors,
+        not of each pair as in scores.cosine_similarity). If 'raise', an error is raised
+        if the vectors have different lengths. Default is 'pad'.
+    :param dtype: the dtype of the matrix. Default is np.float64.
+    :return: np.ndarray, the (n_vectors, n_dims) matrix.
+    ----------------
+    Example:
+    ----------------
+    >>> build_vector_matrix([[1, 2], [3, 4, 5]])
+    array([[1., 2., 0.],
+           [3., 4., 5.]])
+    """
+    assert coalesce in ("pad", "cut", "raise"), f"Invalid coalesce: {coalesce}"
+    lengths = np.array([len(vector) for vector in vectors], dtype=np.int64)
+    if len(lengths) and coalesce == "raise" and (lengths != lengths[0]).any():
+        raise ValueError("Vectors must have the same length")
+    n_dims = (
+        0
+        if len(lengths) == 0
+        else int(lengths.min() if coalesce == "cut" else lengths.max())
+    )
+    matrix = np.zeros((len(lengths), n_dims), dtype=dtype)
+    for i, vector in enumerate(vectors):
+        values = np.asarray(vector)[:n_dims]
+        matrix[i, : len(values)] = values
+    return matrix
+
+
+class CosineEngine:
+    """
+    Cosine similarities of many vectors (e.g. the activity vectors of the authors),
+    with the vectors L2-normalized once, so that the cosine similarity of two vectors
+    is the dot product of their normalized rows, and blocks of pairs are matrix products.
+
+    Vectors of different lengths are stacked into a fixed-dimension matrix up front
+    (see build_vector_matrix). With dtype np.float32, the matrix takes half the memory
+    and the products run about twice as fast, with similarities accurate to about 1e-6.
+    Unlike scores.cosine_similarity, all-zero vectors are allowed, with similarity 0.
+
+    Parameters
+    ----------
+    vectors : np.ndarray, sp.spmatrix or sequence of array-like
+        The (n_vectors, n_dims) matrix of vectors, sparse or dense,
+        or a sequence of vectors of possibly different lengths.
+    authors : array-like, optional
+        The labels of the vectors, used by network. Default is None (0 to n_vectors - 1).
+    dtype : dtype, optional
+        The dtype of the normalized vectors, np.float64 or np.float32. Default is np.float64.
+    coalesce : str, optional
+        How vectors of different lengths are stacked, see build_vector_matrix.
+        Default is 'pad'.
+
+    Attributes
+    ----------
+    matrix : np.ndarray or sp.csr_matrix
+        The normalized vectors.
+    norms : np.ndarray
+        The L2 norm of each vector, before normalization.
+    authors : pd.Index
+        The labels of the vectors.
+
+    Examples
+    --------
+    >>> engine = CosineEngine([[1, 0, 1], [1, 1, 1], [-1, 0]], authors=["a", "b", "c"])
+    >>> engine.similarity(0, 1)
+    0.816496580927726
+    >>> engine.one_vs_many(2)
+    array([-0.70710678, -0.57735027,  1.        ])
+    >>> engine.network(threshold=0.5)
+      source target  similarity
+    0      a      b    0.816497
+    """
+
+    def __init__(
+        self,
+        vectors: Any,
+        authors: Optional[Any] = None,
+        dtype: DTypeLike = np.float64,
+        coalesce: Literal["pad", "cut", "raise"] = "pad",
+    ):
+        if sp.issparse(vectors):
+            matrix = sp.csr_matrix(vectors, dtype=dtype)
+            squares = matrix.multiply(matrix).sum(axis=1)
+            self.norms = np.sqrt(np.asarray(squares, dtype=np.float64).ravel())
+        else:
+            if isinstance(vectors, np.ndarray) and vectors.ndim == 2:
+                matrix = vectors.astype(dtype)
+            else:
+                matrix = build_vector_matrix(vectors, coalesce=coalesce, dtype=dtype)
+            self.norms = np.linalg.norm(matrix.astype(np.float64), axis=1)
+        scale = np.divide(
+            1.0, self.norms, out=np.zeros_like(self.norms), where=self.norms > 0
+        ).astype(dtype)
+        if sp.issparse(matrix):
+            self.matrix = sp.csr_matrix(sp.diags(scale) @ matrix, dtype=dtype)
+        else:
+            self.matrix = matrix * scale[:, None]
+        n_vectors = self.matrix.shape[0]
+        self.authors = pd.Index(np.arange(n_vectors) if authors is None else authors)
+        assert len(self.authors) == n_vectors, "There should be one author per vector"
+        self.dtype = np.dtype(dtype)
+
+    def _rows(self, rows: Any) -> Any:
+        """
+        Returns the normalized vectors of the given rows, as a dense array
+        :param rows: int, slice or array of int, the rows.
+        :return: np.ndarray, the vectors.
+        """
+        matrix = self.matrix[rows]
+        return matrix.toarray() if sp.issparse(matrix) else matrix
+
+    def similarity(self, i: int, j: int) -> float:
+        """
+        Calculate the cosine similarity of two vectors.
+        :param i: int, the row of the first vector.
+        :param j: int, the row of the second vector.
+        :return: float, the cosine similarity, between -1 and 1.
+        """
+        value = np.dot(self._rows(i).ravel(), self._rows(j).ravel())
+        return float(np.clip(value, -1.0, 1.0))
+
+    def one_vs_many(self, i: int, rows: Optional[Any] = None) -> NDArray[Any]:
+        """
+        Calculate the cosine similarity of a vector with many vectors.
+        :param i: int, the row of the vector.
+        :param rows: array of int, the rows of the other vectors. Default is None (all).
+        :return: np.ndarray, the cosine similarities, of the dtype of the engine.
+        """
+        others = self.matrix if rows is None else self.matrix[rows]
+        values = others @ self._rows(i).ravel()
+        return np.clip(np.asarray(values).ravel(), -1.0, 1.0)
+
+    def block(self, rows: Any = None, columns: Any = None) -> NDArray[Any]:
+        """
+        Calculate the cosine similarities of all the pairs of two sets of vectors,
+        as a single matrix product.
+        :param rows: int, slice or array of int, the rows of the first vectors.
+            Default is None (all).
+        :param columns: int, slice or array of int, the rows of the second vectors.
+            Default is None (all).
+        :return: np.ndarray, the (n_rows, n_columns) cosine similarities.
+        """
+        left = self.matrix if rows is None else self.matrix[rows]
+        right = self.matrix if columns is None else self.matrix[columns]
+        values = left @ right.T
+        values = values.toarray() if sp.issparse(values) else np.asarray(values)
+        return np.clip(values, -1.0, 1.0)
+
+    def network(
+        self,
+        threshold: Optional[float] = None,
+        symmetric: bool = True,
+        return_normalized: bool = False,
+        block_size: int = 1024,
+    ) -> pd.DataFrame:
+        """
+        Build the cosine similarity network of the vectors, block_size rows at a time,
+        so that only the pairs above the threshold are kept in memory.
+        :param threshold: float, the minimum similarity of the pairs kept (inclusive),
+            compared with the returned similarities. Default is None (all the pairs).
+        :param symmetric: bool, whether each pair is listed once, with the source before
+            the target in the order of the vectors, or twice, once in each direction.
+            Default is True.
+        :param return_normalized: bool, whether to return the normalized similarities
+            (between 0 and 1), as scores.cosine_similarity. Default is False.
+        :param block_size: int, the number of rows processed at a time. Default is 1024.
+        :return: pd.DataFrame, the edge list with columns 'source', 'target' and 'similarity'.
+        """
+        assert block_size > 0, "Block size should be positive"
+        n_vectors = self.matrix.shape[0]
+        sources, targets, similarities = [], [], []
+        for start in range(0, n_vectors, block_size):
+            values = self.block(slice(start, start + block_size))
+            if return_normalized:
+                values = (values + 1) / 2
+            rows, columns = np.indices(values.shape)
+            rows += start
+            keep = columns > rows if symmetric else columns != rows
+            if threshold is not None:
+                keep &= values >= threshold
+            sources.append(rows[keep])
+            targets.append(columns[keep])
+            similarities.append(values[keep])
+        if not sources:
+            return pd.DataFrame(columns=["source", "target", "similarity"])
+        return pd.DataFrame(
+            {
+                "source": self.authors.take(np.concatenate(sources)).to_numpy(),
+                "target": self.authors.take(np.concatenate(targets)).to_numpy(),
+                "similarity": np.concatenate(similarities),
+            }
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"CosineEngine(n_vectors={self.matrix.shape[0]}, "
+            f"n_dims={self.matrix.shape[1]}, dtype={self.dtype})"
+        )
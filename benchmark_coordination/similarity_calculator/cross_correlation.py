@@ -0,0 +1,132 @@
+from typing import Any, Optional, Tuple
+from numpy.typing import NDArray
+
+import numpy as np
+import pandas as pd
+import scipy.fft  # type: ignore
+import scipy.sparse as sp  # type: ignore
+
+
+def max_cross_correlation(
+    matrix: Any,
+    pairs: NDArray[np.integer],
+    max_lag: int,
+    chunk_size: int = 1024,
+) -> Tuple[NDArray[np.float64], NDArray[np.int64]]:
+    """
+    Compute the maximum normalized cross-correlation of pairs of activity vectors
+    (e.g. the rows of features_builder.activity_vectors.build_activity_matrix)
+    over a range of lags, with batched FFTs.
+    The normalized cross-correlation of x and y at lag L is
+    sum_t x[t] * y[t + L] / (||x|| * ||y||), i.e. the cosine similarity of x and y
+    shifted back by L bins, so that accounts posting with a fixed delay score as high
+    as synchronous ones, and the lag 0 gives the time-bin cosine similarity.
+    The vectors of chunk_size pairs are transformed at a time, to bound the memory.
+    :param matrix: np.ndarray or sp.spmatrix, the (n_users, n_bins) activity vectors.
+    :param pairs: np.ndarray, the (n_pairs, 2) row indices of the candidate pairs.
+    :param max_lag: int, the maximum lag in bins, in either direction.
+    :param chunk_size: int, the number of pairs processed at a time. Default is 1024.
+    :return: tuple of np.ndarray, the maximum cross-correlation of each pair,
+        between 0 and 1 for non-negative vectors (0 if a vector is all zeros),
+        and the lag L reaching it (positive if the second user trails the first).
+    ----------------
+    Example:
+    ----------------
+    >>> x = np.array([[0, 1, 0, 2, 0, 0], [0, 0, 0, 1, 0, 2]])
+    >>> max_cross_correlation(x, np.array([[0, 1]]), max_lag=3)
+    (array([1.]), array([2]))
+    """
+    assert max_lag >= 0, "Maximum lag should be non-negative"
+    assert chunk_size > 0, "Chunk size should be positive"
+    matrix = sp.csr_matrix(matrix, dtype=np.float64)
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    n_bins = matrix.shape[1]
+    max_lag = min(max_lag, max(n_bins - 1, 0))
+    # long enough for the circular correlation not to wrap around within max_lag
+    n_fft = scipy.fft.next_fast_len(n_bins + max_lag, real=True)
+    lags = np.r_[np.arange(max_lag + 1), np.arange(-max_lag, 0)]
+    positions = lags % n_fft
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+
+    values = np.zeros(len(pairs), dtype=np.float64)
+    best_lags = np.zeros(len(pairs), dtype=np.int64)
+    for start in range(0, len(pairs), chunk_size):
+        chunk = pairs[start : start + chunk_size]
+        users, inverse = np.unique(chunk, return_inverse=True)
+        inverse = inverse.reshape(-1, 2)
+        spectra = scipy.fft.rfft(matrix[users].toarray(), n=n_fft, axis=1)
+        correlation = scipy.fft.irfft(
+            np.conj(spectra[inverse[:, 0]]) * spectra[inverse[:, 1]], n=n_fft, axis=1
+        )[:, positions]
+        best = np.argmax(correlation, axis=1)
+        denominator = norms[chunk[:, 0]] * norms[chunk[:, 1]]
+        values[start : start + len(chunk)] = np.divide(
+            correlation[np.arange(len(chunk)), best],
+            denominator,
+            out=np.zeros(len(chunk)),
+            where=denominator > 0,
+        )
+        best_lags[start : start + len(chunk)] = lags[best]
+    # remove the round-off of the FFTs on exact matches
+    return np.clip(values, -1.0, 1.0), best_lags
+
+
+def cross_correlation_similarity(
+    vector1: NDArray[Any], vector2: NDArray[Any], max_lag: int = 1
+) -> float:
+    """
+    Calculate the maximum normalized cross-correlation between two activity vectors
+    over the lags from -max_lag to max_lag, see max_cross_correlation.
+    The shorter vector is padded with 0.
+    :param vector1: The first vector.
+    :param vector2: The second vector.
+    :param max_lag: The maximum lag, in either direction. Default is 1.
+    :return: The maximum cross-correlation between the two vectors.
+    ----------------
+    Example:
+    ----------------
+    >>> round(cross_correlation_similarity([1, 0, 2, 0], [0, 1, 0, 2]), 6)
+    1.0
+    >>> round(cross_correlation_similarity([1, 0, 2, 0], [0, 1, 0, 2], max_lag=0), 6)
+    0.0
+    """
+    length = max(len(vector1), len(vector2))
+    matrix = np.zeros((2, length))
+    matrix[0, : len(vector1)] = vector1
+    matrix[1, : len(vector2)] = vector2
+    values, _ = max_cross_correlation(matrix, np.array([[0, 1]]), max_lag)
+    return float(values[0])
+
+
+def cross_correlation_network(
+    matrix: Any,
+    authors: pd.Index,
+    max_lag: int,
+    pairs: Optional[NDArray[np.integer]] = None,
+    chunk_size: int = 1024,
+) -> pd.DataFrame:
+    """
+    Build a similarity network from the maximum lagged cross-correlation
+    of the activity vectors of the authors.
+    :param matrix: np.ndarray or sp.spmatrix, the (n_authors, n_bins) activity vectors.
+    :param authors: pd.Index, the authors of the rows of the matrix.
+    :param max_lag: int, the maximum lag in bins, in either direction.
+    :param pairs: np.ndarray, the (n_pairs, 2) row indices of the candidate pairs,
+        e.g. the pairs with a high time-bin cosine similarity. Default is None,
+        in which case all the pairs of authors are scored.
+    :param chunk_size: int, the number of pairs processed at a time. Default is 1024.
+    :return: pd.DataFrame, the edge list with columns 'source', 'target',
+        'similarity' and 'lag'.
+    """
+    if pairs is None:
+        pairs = np.column_stack(np.triu_indices(len(authors), k=1))
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    values, lags = max_cross_correlation(matrix, pairs, max_lag, chunk_size)
+    return pd.DataFrame(
+        {
+            "source": authors[pairs[:, 0]],
+            "target": authors[pairs[:, 1]],
+            "similarity": values,
+            "lag": lags,
+        }
+    )
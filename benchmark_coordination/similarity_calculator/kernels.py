@@ -0,0 +1,359 @@
+from typing import Any, Literal, Optional, Tuple
+from numpy.typing import NDArray
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp  # type: ignore
+
+# number of 1 bits of each byte
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def encode_traces(
+    dataframe: pd.DataFrame,
+    users: Optional[Any] = None,
+    author_column: str = "author_id",
+    trace_column: str = "trace",
+) -> Tuple[pd.Index, NDArray[np.int64], NDArray[np.int64]]:
+    """
+    Encode the set of traces of each user as a sorted array of unique int codes,
+    in one pass over the dataframe. The sets are stored back to back, in the
+    compressed sparse row layout: the set of user i is indices[indptr[i]:indptr[i + 1]].
+    :param dataframe: pd.DataFrame, the dataframe with columns author_column and trace_column.
+    :param users: array-like, the users to encode, in order. Default is None
+        (the users of the dataframe, sorted).
+    :param author_column: str, the name of the column with the users. Default is 'author_id'.
+    :param trace_column: str, the name of the column with the traces. Default is 'trace'.
+    :return: tuple, the users, the (n_users + 1,) offsets of their sets, and the codes.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({"author_id": [2, 1, 1, 2], "trace": ["#a", "#b", "#a", "#a"]})
+    >>> encode_traces(df)
+    (Index([1, 2], dtype='int64'), array([0, 2, 3]), array([0, 1, 0]))
+    """
+    labels = pd.Index(
+        np.sort(dataframe[author_column].unique()) if users is None else users
+    )
+    codes, items = pd.factorize(dataframe[trace_column], use_na_sentinel=False)
+    rows = labels.get_indexer(dataframe[author_column])
+    keep = rows >= 0
+    n_items = max(len(items), 1)
+    keys = np.unique(rows[keep].astype(np.int64) * n_items + codes[keep])
+    indptr = np.searchsorted(keys // n_items, np.arange(len(labels) + 1))
+    return labels, indptr.astype(np.int64), keys % n_items
+
+
+def intersection_size(set1: NDArray[np.integer], set2: NDArray[np.integer]) -> int:
+    """
+    Count the common elements of two sorted arrays of unique ints.
+    Each element of the smaller array is searched in the larger one,
+    in O(n log m) and without building sets.
+    :param set1: np.ndarray, the first sorted array.
+    :param set2: np.ndarray, the second sorted array.
+    :return: int, the number of common elements.
+    ----------------
+    Example:
+    ----------------
+    >>> intersection_size(np.array([1, 3, 5]), np.array([2, 3, 4, 5]))
+    2
+    """
+    if len(set1) > len(set2):
+        set1, set2 = set2, set1
+    if len(set1) == 0:
+        return 0
+    positions = np.minimum(np.searchsorted(set2, set1), len(set2) - 1)
+    return int(np.count_nonzero(set2[positions] == set1))
+
+
+def intersection_sizes(
+    query: NDArray[np.integer],
+    indptr: NDArray[np.integer],
+    indices: NDArray[np.integer],
+) -> NDArray[np.int64]:
+    """
+    Count the common elements of a sorted array of unique ints with each of many
+    sorted arrays stored back to back (see encode_traces), in a single pass.
+    :param query: np.ndarray, the sorted array.
+    :param indptr: np.ndarray, the (n_sets + 1,) offsets of the other arrays.
+    :param indices: np.ndarray, the concatenated other arrays.
+    :return: np.ndarray of int64, the number of common elements with each array.
+    ----------------
+    Example:
+    ----------------
+    >>> intersection_sizes(np.array([0, 2]), np.array([0, 2, 3, 5]), np.array([0, 1, 2, 1, 2]))
+    array([1, 1, 1])
+    """
+    if len(query) == 0:
+        return np.zeros(len(indptr) - 1, dtype=np.int64)
+    positions = np.minimum(np.searchsorted(query, indices), len(query) - 1)
+    hits = np.r_[0, np.cumsum(query[positions] == indices)]
+    return hits[indptr[1:]] - hits[indptr[:-1]]
+
+
+def popcount(words: NDArray[np.unsignedinteger]) -> NDArray[np.int64]:
+    """
+    Count the 1 bits of packed words along their last axis.
+    :param words: np.ndarray of unsigned ints, the words.
+    :return: np.ndarray of int64, the number of 1 bits of each row of words.
+    ----------------
+    Example:
+    ----------------
+    >>> popcount(np.array([[3, 2**63]], dtype=np.uint64))
+    array([3])
+    """
+    words = np.ascontiguousarray(words)
+    bytes_ = words.view(np.uint8).reshape(
+        words.shape[:-1] + (words.shape[-1] * words.itemsize,)
+    )
+    return _POPCOUNT_TABLE[bytes_].sum(axis=-1, dtype=np.int64)
+
+
+def _popcount64(words: NDArray[np.uint64]) -> NDArray[np.uint64]:
+    """
+    Count the 1 bits of each 64-bit word, with the SWAR (SIMD within a register)
+    reduction of bit pairs, nibbles and bytes, without temporaries larger than the words
+    :param words: np.ndarray of uint64, the words.
+    :return: np.ndarray of uint64, the number of 1 bits of each word.
+    """
+    words = words - ((words >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    words = (words & np.uint64(0x3333333333333333)) + (
+        (words >> np.uint64(2)) & np.uint64(0x3333333333333333)
+    )
+    words = (words + (words >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (words * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+def pack_bitmaps(
+    indptr: NDArray[np.integer], indices: NDArray[np.integer], n_items: int
+) -> NDArray[np.uint64]:
+    """
+    Pack sets of int codes (see encode_traces) into bitmaps of 64-bit words,
+    bit j of row i being set if code j is in set i.
+    Bitmaps are compact for dense traces, i.e. when the sets hold
+    a sizeable fraction of the n_items codes.
+    :param indptr: np.ndarray, the (n_sets + 1,) offsets of the sets.
+    :param indices: np.ndarray, the concatenated sets.
+    :param n_items: int, the number of distinct codes.
+    :return: np.ndarray of uint64, the (n_sets, ceil(n_items / 64)) bitmaps.
+    ----------------
+    Example:
+    ----------------
+    >>> pack_bitmaps(np.array([0, 2, 3]), np.array([0, 3, 64]), 65)
+    array([[9, 0],
+           [0, 1]], dtype=uint64)
+    """
+    n_words = max((n_items + 63) // 64, 1)
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    indices = np.asarray(indices, dtype=np.int64)
+    bitmaps = np.zeros((len(indptr) - 1, n_words), dtype=np.uint64)
+    np.bitwise_or.at(
+        bitmaps,
+        (rows, indices // 64),
+        np.left_shift(np.uint64(1), (indices % 64).astype(np.uint64)),
+    )
+    return bitmaps
+
+
+def bitmap_intersection_sizes(
+    query: NDArray[np.uint64], bitmaps: NDArray[np.uint64]
+) -> NDArray[np.int64]:
+    """
+    Count the common elements of a set with each of many sets, as bitmaps
+    (see pack_bitmaps).
+    :param query: np.ndarray of uint64, the (n_words,) bitmap of the set.
+    :param bitmaps: np.ndarray of uint64, the (n_sets, n_words) bitmaps of the other sets.
+    :return: np.ndarray of int64, the number of common elements with each set.
+    ----------------
+    Example:
+    ----------------
+    >>> bitmaps = pack_bitmaps(np.array([0, 2, 3]), np.array([0, 3, 3]), 4)
+    >>> bitmap_intersection_sizes(bitmaps[0], bitmaps)
+    array([2, 1])
+    """
+    return popcount(bitmaps & query)
+
+
+def set_similarities(
+    intersections: NDArray[np.integer],
+    size: int,
+    sizes: NDArray[np.integer],
+    score: Literal["cardinality", "jaccard"],
+) -> NDArray[Any]:
+    """
+    Turn the intersection sizes of a set with many sets into similarities.
+    :param intersections: np.ndarray, the number of common elements with each set.
+    :param size: int, the size of the set.
+    :param sizes: np.ndarray, the sizes of the other sets.
+    :param score: str, one of 'cardinality' (the number of common elements)
+        or 'jaccard' (the number of common elements over the size of the union).
+    :return: np.ndarray, the similarities, int for 'cardinality' and float for 'jaccard'.
+    """
+    if score == "cardinality":
+        return np.asarray(intersections, dtype=np.int64)
+    if score == "jaccard":
+        return intersections / (size + sizes - intersections)
+    raise ValueError(f"Invalid set similarity score: {score}")
+
+
+def cardinality_encoded(
+    vector1: NDArray[np.integer], vector2: NDArray[np.integer]
+) -> int:
+    """
+    Calculate the cardinality similarity (see scores.cardinality_similarity)
+    of two sets encoded as sorted arrays of unique ints (see encode_traces).
+    :param vector1: The first sorted array.
+    :param vector2: The second sorted array.
+    :return: The number of common elements.
+    ----------------
+    Example:
+    >>> cardinality_encoded(np.array([1, 2, 3]), np.array([2, 3, 4]))
+    2
+    """
+    return intersection_size(vector1, vector2)
+
+
+def jaccard_encoded(
+    vector1: NDArray[np.integer], vector2: NDArray[np.integer]
+) -> float:
+    """
+    Calculate the Jaccard similarity (see scores.jaccard_similarity)
+    of two sets encoded as sorted arrays of unique ints (see encode_traces).
+    :param vector1: The first sorted array.
+    :param vector2: The second sorted array.
+    :return: The Jaccard similarity between the two sets.
+    ----------------
+    Example:
+    >>> jaccard_encoded(np.array([1, 2, 3]), np.array([2, 3, 4]))
+    0.5
+    """
+    intersection = intersection_size(vector1, vector2)
+    return intersection / (len(vector1) + len(vector2) - intersection)
+
+
+def pack_binary(vectors: Any) -> NDArray[np.uint64]:
+    """
+    Pack binary vectors (e.g. the presence of users in time windows, or the rows of
+    features_builder.activity_vectors.build_activity_matrix > 0) into rows of 64-bit
+    words, for packed_jaccard and its batched variants.
+    :param vectors: np.ndarray or sp.spmatrix, the (n_vectors, n_dims) vectors of 0 and 1,
+        or a single vector.
+    :return: np.ndarray of uint64, the (n_vectors, ceil(n_dims / 64)) packed vectors.
+    ----------------
+    Example:
+    ----------------
+    >>> pack_binary([[1, 0, 1], [0, 0, 1]])
+    array([[5],
+           [4]], dtype=uint64)
+    """
+    if sp.issparse(vectors):
+        matrix = sp.csr_matrix(vectors)
+        matrix.eliminate_zeros()
+        assert np.all(matrix.data == 1), "Vectors must be binary (0 or 1)"
+        matrix.sort_indices()
+        return pack_bitmaps(matrix.indptr, matrix.indices, matrix.shape[1])
+    vectors = np.atleast_2d(np.asarray(vectors))
+    assert np.all((vectors == 0) | (vectors == 1)), "Vectors must be binary (0 or 1)"
+    n_words = max((vectors.shape[1] + 63) // 64, 1)
+    packed = np.packbits(vectors.astype(bool), axis=1, bitorder="little")
+    # pad the bytes to whole words, the bits of each word in little-endian order
+    padded = np.zeros((len(vectors), 8 * n_words), dtype=np.uint8)
+    padded[:, : packed.shape[1]] = packed
+    return padded.view("<u8").astype(np.uint64)
+
+
+def _jaccard_from_counts(
+    intersections: NDArray[np.int64], unions: NDArray[np.int64]
+) -> NDArray[np.float64]:
+    """
+    Returns the Jaccard similarities, 0 where the union is empty
+    :param intersections: np.ndarray, the sizes of the intersections.
+    :param unions: np.ndarray, the sizes of the unions.
+    :return: np.ndarray of float64.
+    """
+    return np.divide(
+        intersections,
+        unions,
+        out=np.zeros(np.shape(intersections), dtype=np.float64),
+        where=unions > 0,
+    )
+
+
+def packed_jaccard(vector1: NDArray[np.uint64], vector2: NDArray[np.uint64]) -> float:
+    """
+    Calculate the Jaccard similarity (see scores.jaccard_binary_similarity)
+    of two binary vectors packed with pack_binary, from the popcounts of their
+    bitwise and / or.
+    :param vector1: The first packed vector.
+    :param vector2: The second packed vector.
+    :return: The Jaccard similarity, 0 if both vectors are all zeros.
+    ----------------
+    Example:
+    >>> packed = pack_binary([[1, 0, 0], [1, 0, 1]])
+    >>> packed_jaccard(packed[0], packed[1])
+    0.5
+    """
+    intersection = popcount(np.ravel(vector1 & vector2))
+    union = popcount(np.ravel(vector1 | vector2))
+    return float(_jaccard_from_counts(intersection, union))
+
+
+def packed_jaccard_one_vs_many(
+    query: NDArray[np.uint64], packed: NDArray[np.uint64]
+) -> NDArray[np.float64]:
+    """
+    Calculate the Jaccard similarity of a packed binary vector with each of many.
+    :param query: np.ndarray of uint64, the (n_words,) packed vector.
+    :param packed: np.ndarray of uint64, the (n_vectors, n_words) packed vectors.
+    :return: np.ndarray of float64, the similarities, 0 where both vectors are all zeros.
+    ----------------
+    Example:
+    ----------------
+    >>> packed = pack_binary([[1, 0, 0], [1, 0, 1], [0, 1, 0]])
+    >>> packed_jaccard_one_vs_many(packed[0], packed)
+    array([1. , 0.5, 0. ])
+    """
+    return _jaccard_from_counts(popcount(packed & query), popcount(packed | query))
+
+
+def packed_jaccard_block(
+    packed1: NDArray[np.uint64],
+    packed2: Optional[NDArray[np.uint64]] = None,
+    block_size: int = 1024,
+) -> NDArray[np.float64]:
+    """
+    Calculate the Jaccard similarity of all the pairs of packed binary vectors
+    of two sets, by tiles of block_size rows of the first set and
+    block_size // n_words rows of the second one, so that the words compared at a time,
+    and the memory they take, are bounded by about block_size**2 whatever the sizes
+    of the sets. The intersections are the SWAR popcounts of the AND of the words of each
+    tile, and the unions follow from the popcounts of the vectors.
+    :param packed1: np.ndarray of uint64, the (n1, n_words) packed vectors.
+    :param packed2: np.ndarray of uint64, the (n2, n_words) packed vectors.
+        Default is None (the pairs of vectors of packed1).
+    :param block_size: int, the number of rows of packed1 processed at a time.
+        Default is 1024.
+    :return: np.ndarray of float64, the (n1, n2) similarities,
+        0 where both vectors are all zeros.
+    ----------------
+    Example:
+    ----------------
+    >>> packed_jaccard_block(pack_binary([[1, 0, 0], [1, 0, 1], [0, 1, 0]]))
+    array([[1. , 0.5, 0. ],
+           [0.5, 1. , 0. ],
+           [0. , 0. , 1. ]])
+    """
+    assert block_size > 0, "Block size should be positive"
+    packed2 = packed1 if packed2 is None else packed2
+    counts1, counts2 = popcount(packed1), popcount(packed2)
+    result = np.zeros((len(packed1), len(packed2)), dtype=np.float64)
+    column_block_size = max(1, block_size // max(1, packed1.shape[1]))
+    for start in range(0, len(packed1), block_size):
+        rows = slice(start, start + block_size)
+        for column_start in range(0, len(packed2), column_block_size):
+            columns = slice(column_start, column_start + column_block_size)
+            common = packed1[rows, None, :] & packed2[None, columns, :]
+            intersections = _popcount64(common).sum(axis=-1, dtype=np.int64)
+            unions = counts1[rows, None] + counts2[columns] - intersections
+            result[rows, columns] = _jaccard_from_counts(intersections, unions)
+    return result
@@ -4,6 +4,25 @@ from numpy.typing import NDArray
 import numpy as np
 
 
+def boolean_similarity(vector1: NDArray[Any], vector2: NDArray[Any]) -> float:
+    """
+    Calculate the boolean similarity between two vectors.
+    Boolean similarity is 1 if the vectors are identical sequences, and 0 otherwise.
+    :param vector1: The first vector.
+    :param vector2: The second vector.
+    :return: The boolean similarity between the two vectors.
+    ----------------
+    Example:
+    >>> vector1 = ["#a", "#b"]
+    >>> vector2 = ["#b", "#a"]
+    >>> boolean_similarity(vector1, vector1)
+    1.0
+    >>> boolean_similarity(vector1, vector2)
+    0.0
+    """
+    return float(list(vector1) == list(vector2))
+
+
 def cardinality_similarity(vector1: NDArray[Any], vector2: NDArray[Any]) -> float:
     """
     Calculate the cardinality similarity between two vectors.
@@ -71,9 +90,9 @@ def cosine_similarity(
     0.5
     """
     # non-zero vectors
-    assert (
-        np.linalg.norm(vector1) > 0 and np.linalg.norm(vector2) > 0
-    ), "Vectors must be non-zero"
+    norm1 = np.linalg.norm(vector1)
+    norm2 = np.linalg.norm(vector2)
+    assert norm1 > 0 and norm2 > 0, "Vectors must be non-zero"
     # check that the vectors have the same length
     same_length = len(vector1) == len(vector2)
     if not same_length and coalesce == "pad":
@@ -82,16 +101,16 @@ def cosine_similarity(
         # pad the end of the vectors
         vector1 = np.pad(vector1, (0, max_length - len(vector1)), constant_values=0)
         vector2 = np.pad(vector2, (0, max_length - len(vector2)), constant_values=0)
-        print(vector1, vector2)
     if not same_length and coalesce == "cut":
         # cut the longer vector
         min_length = min(len(vector1), len(vector2))
         vector1 = vector1[:min_length]
         vector2 = vector2[:min_length]
+        norm1 = np.linalg.norm(vector1)
+        norm2 = np.linalg.norm(vector2)
 
+    # padding with 0 leaves the norms unchanged
     dot_product = np.dot(vector1, vector2)
-    norm1 = np.linalg.norm(vector1)
-    norm2 = np.linalg.norm(vector2)
     similarity = dot_product / (norm1 * norm2)
     if return_normalized:
         similarity = (similarity + 1) / 2
@@ -152,9 +171,7 @@ def jaccard_binary_similarity(vector1: NDArray[Any], vector2: NDArray[Any]) -> f
     vector1 = np.array(vector1)
     vector2 = np.array(vector2)
     # check that the vectors are binary
-    assert all(
-        np.logical_or(vector1 == 0, vector1 == 1)
-    ), "Vector1 must be binary (0 or 1)"
+    assert np.all((vector1 == 0) | (vector1 == 1)), "Vector1 must be binary (0 or 1)"
     # jaccard similarity (binary, element-wise)
     intersection = np.logical_and(vector1, vector2)
     union = np.logical_or(vector1, vector2)
@@ -1,3 +1,11 @@
 from typing import Literal
 
-SimilarityMeasure = Literal["cardinality", "cosine", "jaccard", "ratcliff-obershelp"]
+SimilarityMeasure = Literal[
+    "boolean",
+    "cardinality",
+    "cosine",
+    "cross-correlation",
+    "jaccard",
+    "jaccard-binary",
+    "ratcliff-obershelp",
+]
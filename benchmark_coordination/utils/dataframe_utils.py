@@ -1,4 +1,5 @@
 import pandas as pd
+from typing import Literal, Optional
 
 
 def contains_columns(df: pd.DataFrame, columns: list[str]) -> bool:
@@ -25,15 +26,80 @@ def cast_columns_to_datetime(df: pd.DataFrame, columns: list[str]) -> pd.DataFra
     return df
 
 
-def cast_columns_to_str(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+def cast_columns_to_str(
+    df: pd.DataFrame,
+    columns: list[str],
+    dtype_backend: Literal["python", "pyarrow"] = "python",
+) -> pd.DataFrame:
     """
     Cast the specified columns in the DataFrame to string.
     :param df: pd.DataFrame, the DataFrame to cast.
     :param columns: list[str], the list of column names to cast.
+    :param dtype_backend: str, one of 'python', 'pyarrow'. If 'python', the strings
+        are stored as python objects (and missing values become 'None').
+        If 'pyarrow', they are stored in contiguous pyarrow buffers
+        (and missing values stay missing), which takes much less memory.
+        Default is 'python'.
     :return: pd.DataFrame, the DataFrame with the specified columns cast to string.
     """
     if not contains_columns(df, columns):
         raise ValueError("Columns not found in DataFrame")
+    dtype = str if dtype_backend == "python" else pd.StringDtype("pyarrow")
     for column in columns:
-        df[column] = df[column].astype(str)
+        df[column] = df[column].astype(dtype)
+    return df
+
+
+def build_global_dictionary(df: pd.DataFrame, columns: list[str]) -> pd.Index:
+    """
+    Build the sorted dictionary of all the distinct values in the specified columns,
+    e.g. all the users appearing as 'author_id' or as 'original_author'.
+    :param df: pd.DataFrame, the DataFrame with the values.
+    :param columns: list[str], the list of column names sharing the dictionary.
+    :return: pd.Index, the distinct non-missing values, sorted.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({"author_id": ["b", "a"], "original_author": ["c", "a"]})
+    >>> build_global_dictionary(df, ["author_id", "original_author"])
+    Index(['a', 'b', 'c'], dtype='object')
+    """
+    if not contains_columns(df, columns):
+        raise ValueError("Columns not found in DataFrame")
+    values = pd.concat([df[column] for column in columns], ignore_index=True)
+    return pd.Index(values.dropna().unique()).sort_values()
+
+
+def cast_columns_to_category(
+    df: pd.DataFrame, columns: list[str], categories: Optional[pd.Index] = None
+) -> pd.DataFrame:
+    """
+    Cast the specified columns in the DataFrame to categoricals sharing one dictionary,
+    so that their integer codes are comparable across columns (and across dataframes
+    cast with the same dictionary). Groupbys and joins on the columns then run on the
+    codes; use observed=True in groupbys to skip the categories absent from the data.
+    :param df: pd.DataFrame, the DataFrame to cast.
+    :param columns: list[str], the list of column names to cast.
+    :param categories: pd.Index, the global dictionary of values.
+        Default is None, in which case it is built from the columns
+        (see build_global_dictionary).
+    :return: pd.DataFrame, the DataFrame with the specified columns cast to category.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({"author_id": ["b", "a"], "original_author": ["c", "a"]})
+    >>> df = cast_columns_to_category(df, ["author_id", "original_author"])
+    >>> df["original_author"].cat.codes.tolist()
+    [2, 0]
+    """
+    if categories is None:
+        categories = build_global_dictionary(df, columns)
+    if not contains_columns(df, columns):
+        raise ValueError("Columns not found in DataFrame")
+    dtype = pd.CategoricalDtype(categories)
+    for column in columns:
+        cast = df[column].astype(dtype)
+        if cast.isna().sum() != df[column].isna().sum():
+            raise ValueError(f"Column {column} has values missing from the dictionary")
+        df[column] = cast
     return df
@@ -0,0 +1,171 @@
+from typing import Any, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+import pyarrow as pa  # type: ignore
+
+from benchmark_coordination.utils.logging import logger
+
+MAX_INDEX = np.iinfo(np.int32).max
+
+
+class IdRegistry:
+    """
+    A registry mapping identifiers (e.g. authors, or retweeted tweets)
+    to dense int32 indices.
+
+    Indices are assigned once, in order of first registration, and never change,
+    so that all the windows and engines encoding their identifiers with the same
+    registry produce matrices with the same rows and columns, which can be stacked
+    and compared without remapping. The registry can be saved to an Arrow IPC file,
+    which worker processes memory-map instead of receiving a pickled copy.
+    The labels of a memory-mapped registry stay in the Arrow buffers: decode only
+    converts the requested labels, and the lookup index is built on the first
+    call that needs it (add, encode, `in` or labels).
+
+    Parameters
+    ----------
+    labels : iterable, optional
+        The identifiers to register, in order. Duplicates are registered once.
+
+    Examples
+    --------
+    >>> registry = IdRegistry(["alice", "bob"])
+    >>> registry.add(["carol", "alice"])
+    >>> registry.encode(["carol", "alice"])
+    array([2, 0], dtype=int32)
+    >>> registry.decode([1, 2]).tolist()
+    ['bob', 'carol']
+    """
+
+    def __init__(self, labels: Optional[Iterable[Any]] = None):
+        self._labels = pd.Index([])
+        self._arrow_labels: Optional[pa.ChunkedArray] = None
+        if labels is not None:
+            self.add(labels)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, columns: List[str]) -> "IdRegistry":
+        """
+        Build a registry with all the identifiers in the specified columns
+        :param df: pd.DataFrame, the dataframe with the identifiers
+        :param columns: list[str], the columns with the identifiers
+            (e.g. ['author_id', 'original_author'])
+        :return: IdRegistry
+        """
+        registry = cls()
+        for column in columns:
+            registry.add(df[column].dropna())
+        return registry
+
+    @property
+    def labels(self) -> pd.Index:
+        """
+        Returns the registered identifiers, the position of each being its index
+        :return: pd.Index
+        """
+        if self._arrow_labels is not None:
+            self._labels = pd.Index(self._arrow_labels.to_numpy(zero_copy_only=False))
+            self._arrow_labels = None
+        return self._labels
+
+    def add(self, values: Iterable[Any]) -> None:
+        """
+        Register the identifiers that are not registered yet, in order of first appearance.
+        :param values: iterable, the identifiers to register.
+        :return: None
+        """
+        if not isinstance(values, (pd.Series, pd.Index, np.ndarray)):
+            values = list(values)
+        labels = self.labels
+        new = pd.Index(values, name=None).unique()
+        if len(labels) > 0:
+            new = new[labels.get_indexer(new) == -1]
+        if len(new) == 0:
+            return
+        if len(labels) + len(new) > MAX_INDEX:
+            raise OverflowError("The registry cannot hold more than 2**31 - 1 ids")
+        self._labels = labels.append(new) if len(labels) else new
+
+    def encode(self, values: Iterable[Any], strict: bool = True) -> np.ndarray:
+        """
+        Map identifiers to their indices.
+        :param values: iterable, the identifiers to encode.
+        :param strict: bool, whether to raise a KeyError for unregistered identifiers.
+            If False, they are encoded as -1. Default is True.
+        :return: np.ndarray of int32, the indices.
+        """
+        if not isinstance(values, (pd.Series, pd.Index, np.ndarray)):
+            values = list(values)
+        codes = self.labels.get_indexer(pd.Index(values)).astype(np.int32)
+        if strict and (codes == -1).any():
+            missing = np.asarray(values, dtype=object)[codes == -1][:5]
+            raise KeyError(f"Identifiers not in the registry: {list(missing)}")
+        return codes
+
+    def decode(self, codes: Iterable[int]) -> np.ndarray:
+        """
+        Map indices back to their identifiers.
+        :param codes: iterable of int, the indices.
+        :return: np.ndarray, the identifiers.
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        if self._arrow_labels is not None:
+            taken = self._arrow_labels.take(pa.array(codes.ravel()))
+            return taken.to_numpy(zero_copy_only=False).reshape(codes.shape)
+        return self._labels.to_numpy()[codes]
+
+    def encode_columns(
+        self, df: pd.DataFrame, columns: List[str], suffix: str = "_idx"
+    ) -> pd.DataFrame:
+        """
+        Add the indices of the identifiers in the specified columns as new int32 columns,
+        named after the original columns with the given suffix.
+        Windows sliced from the encoded dataframe keep consistent indices.
+        :param df: pd.DataFrame, the dataframe with the identifiers.
+        :param columns: list[str], the columns to encode.
+        :param suffix: str, the suffix of the new columns. Default is '_idx'.
+        :return: pd.DataFrame, the dataframe with the new columns.
+        """
+        for column in columns:
+            df[column + suffix] = self.encode(df[column])
+        return df
+
+    def save(self, file_path: str) -> None:
+        """
+        Save the registry to an (uncompressed) Arrow IPC file.
+        :param file_path: str, the path to the file.
+        :return: None
+        """
+        table = pa.table({"label": pa.array(self.labels.to_numpy())})
+        with pa.OSFile(file_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        logger.debug(f"Registry of {len(self)} ids saved to {file_path}")
+
+    @classmethod
+    def load(cls, file_path: str, memory_map: bool = True) -> "IdRegistry":
+        """
+        Load a registry saved with save.
+        :param file_path: str, the path to the file.
+        :param memory_map: bool, whether to memory-map the file instead of reading it,
+            so that processes loading the same registry share the pages of the labels.
+            The labels are kept as an Arrow array until they need to be looked up.
+            Default is True.
+        :return: IdRegistry
+        """
+        with pa.memory_map(file_path) if memory_map else pa.OSFile(file_path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        registry = cls()
+        registry._arrow_labels = table.column("label")
+        return registry
+
+    def __len__(self) -> int:
+        if self._arrow_labels is not None:
+            return len(self._arrow_labels)
+        return len(self._labels)
+
+    def __contains__(self, value: Any) -> bool:
+        return value in self.labels
+
+    def __repr__(self) -> str:
+        return f"IdRegistry(n_ids={len(self)})"
@@ -1,29 +1,181 @@
+import os
+import uuid
 import pandas as pd
+import pyarrow as pa  # type: ignore
+import pyarrow.dataset as ds  # type: ignore
+import pyarrow.parquet as pq  # type: ignore
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+from benchmark_coordination.types import datetime_fmt
 from benchmark_coordination.utils.logging import logger
+from benchmark_coordination.utils.step_markers import required_columns
 
+DEFAULT_COLUMNS = [
+    "author_id",
+    "author",
+    "tweet_text",
+    "timestamp",
+    "links",
+    "is_retweet",
+    "original_author",
+    "mentioned_usernames",
+    "mentioned_hashtags",
+]
 
-def read_from_parquet(file_path: str) -> pd.DataFrame:
+PARTITION_COLUMN = "date"
+DATE_PARTITIONING = ds.partitioning(
+    pa.schema([(PARTITION_COLUMN, pa.string())]), flavor="hive"
+)
+
+
+def build_parquet_filters(
+    start_time: Optional[Union[datetime, str]] = None,
+    end_time: Optional[Union[datetime, str]] = None,
+    author_ids: Optional[Iterable[Any]] = None,
+    is_retweet: Optional[bool] = None,
+) -> List[Tuple[str, str, Any]]:
+    """
+    Build the filters to push down to the parquet reader.
+    The filters are combined with a logical AND, and they are evaluated by pyarrow
+    against the row group statistics, so that row groups that cannot match are skipped.
+    :param start_time: datetime, the start of the time range on column 'timestamp' (inclusive).
+        Default is None (no lower bound).
+    :param end_time: datetime, the end of the time range on column 'timestamp' (inclusive).
+        Default is None (no upper bound).
+    :param author_ids: iterable, the values of column 'author_id' to keep.
+        Default is None (all authors).
+    :param is_retweet: bool, the value of column 'is_retweet' to keep.
+        Default is None (both retweets and original posts).
+    :return: list of (column, operator, value) tuples, in the pyarrow filters format.
+    ----------------
+    Example:
+    ----------------
+    >>> build_parquet_filters(author_ids=[1, 2], is_retweet=True)
+    [('author_id', 'in', [1, 2]), ('is_retweet', '==', True)]
+    """
+    filters: List[Tuple[str, str, Any]] = []
+    if start_time is not None:
+        filters.append(("timestamp", ">=", pd.Timestamp(start_time)))
+    if end_time is not None:
+        filters.append(("timestamp", "<=", pd.Timestamp(end_time)))
+    if author_ids is not None:
+        filters.append(("author_id", "in", list(author_ids)))
+    if is_retweet is not None:
+        filters.append(("is_retweet", "==", is_retweet))
+    return filters
+
+
+def infer_columns(file_path: str, steps: List[Tuple]) -> List[str]:
+    """
+    Infer the columns of a parquet file that are used by the steps of a pipeline.
+    A column is used if a step names it in a param called 'column' or '<...>_column'
+    (or 'columns' and '<...>_columns' for lists), or if the step function declares it
+    with the utils.step_markers.requires_columns decorator. Names that are not columns of the file
+    (e.g. columns created by previous steps) are ignored.
+    :param file_path: str, the path to the parquet file.
+    :param steps: list of tuples, the (name, step, params) steps of the pipeline.
+    :return: list[str], the used columns, in the order of the file schema.
+    """
+    candidates: Set[str] = set()
+    for _, step, params in steps:
+        candidates.update(required_columns(step))
+        for key, value in params.items():
+            if isinstance(value, str) and (key == "column" or key.endswith("_column")):
+                candidates.add(value)
+            elif isinstance(value, (list, tuple)) and (
+                key == "columns" or key.endswith("_columns")
+            ):
+                candidates.update(value)
+    schema = pq.read_schema(file_path)
+    return [name for name in schema.names if name in candidates]
+
+
+def read_from_parquet(
+    file_path: str,
+    columns: Optional[List[str]] = None,
+    start_time: Optional[Union[datetime, str]] = None,
+    end_time: Optional[Union[datetime, str]] = None,
+    author_ids: Optional[Iterable[Any]] = None,
+    is_retweet: Optional[bool] = None,
+    dtype_backend: Optional[Literal["pyarrow", "numpy_nullable"]] = None,
+) -> pd.DataFrame:
     """
     Read data from a parquet file.
+    Only the requested columns are read, and the filters are pushed down to pyarrow,
+    which skips the row groups whose statistics do not match them.
     :param file_path: str, the path to the parquet file.
         e.g. 'scratch/cs/ecanet/coordination_sim/all_real.parquet.gzip'
+    :param columns: list[str], the columns to read. Default is None (DEFAULT_COLUMNS).
+        See also infer_columns, to read only the columns used by a pipeline.
+    :param start_time: datetime, keep rows with 'timestamp' >= start_time. Default is None.
+    :param end_time: datetime, keep rows with 'timestamp' <= end_time. Default is None.
+    :param author_ids: iterable, keep rows with 'author_id' in author_ids. Default is None.
+    :param is_retweet: bool, keep rows with 'is_retweet' == is_retweet. Default is None.
+    :param dtype_backend: str, one of 'pyarrow', 'numpy_nullable'. If 'pyarrow',
+        the columns are backed by pyarrow arrays, e.g. strings are not python objects.
+        Default is None (numpy-backed columns, strings as python objects).
     :return: pd.DataFrame, the data read from the parquet file.
     """
     logger.debug(f"Reading data from {file_path}")
-    return pd.read_parquet(
-        file_path,
-        columns=[
-            "author_id",
-            "author",
-            "tweet_text",
-            "timestamp",
-            "links",
-            "is_retweet",
-            "original_author",
-            "mentioned_usernames",
-            "mentioned_hashtags",
-        ],
+    columns = DEFAULT_COLUMNS if columns is None else columns
+    kwargs: Dict[str, Any] = {}
+    filters = build_parquet_filters(start_time, end_time, author_ids, is_retweet)
+    if filters:
+        kwargs["filters"] = filters
+    if dtype_backend is not None:
+        kwargs["dtype_backend"] = dtype_backend
+    return pd.read_parquet(file_path, columns=columns, **kwargs)
+
+
+def iter_parquet_batches(
+    file_paths: Union[str, List[str]],
+    columns: Optional[List[str]] = None,
+    batch_size: int = 131_072,
+    start_time: Optional[Union[datetime, str]] = None,
+    end_time: Optional[Union[datetime, str]] = None,
+    author_ids: Optional[Iterable[Any]] = None,
+    is_retweet: Optional[bool] = None,
+) -> Generator[pd.DataFrame, None, None]:
+    """
+    Read data from one or many parquet files as a stream of dataframe chunks,
+    holding only a few record batches in memory at a time.
+    The columns and the filters are pushed down to pyarrow as in read_from_parquet.
+    :param file_paths: str or list[str], the path(s) to the parquet file(s),
+        or to a directory of parquet files.
+    :param columns: list[str], the columns to read. Default is None (DEFAULT_COLUMNS).
+    :param batch_size: int, the maximum number of rows in each chunk. Default is 131072.
+    :param start_time: datetime, keep rows with 'timestamp' >= start_time. Default is None.
+    :param end_time: datetime, keep rows with 'timestamp' <= end_time. Default is None.
+    :param author_ids: iterable, keep rows with 'author_id' in author_ids. Default is None.
+    :param is_retweet: bool, keep rows with 'is_retweet' == is_retweet. Default is None.
+    :return: generator, a generator that yields the chunks as pd.DataFrame.
+    """
+    assert batch_size > 0, "Batch size should be positive"
+    logger.debug(f"Streaming data from {file_paths}")
+    columns = DEFAULT_COLUMNS if columns is None else columns
+    filters = build_parquet_filters(start_time, end_time, author_ids, is_retweet)
+    dataset = ds.dataset(file_paths, format="parquet")
+    batches = dataset.to_batches(
+        columns=columns,
+        filter=pq.filters_to_expression(filters) if filters else None,
+        batch_size=batch_size,
+        batch_readahead=1,
+        fragment_readahead=1,
     )
+    for batch in batches:
+        if batch.num_rows > 0:
+            yield batch.to_pandas()
 
 
 def save_to_parquet(data: pd.DataFrame, file_path: str) -> None:
@@ -37,3 +189,96 @@ def save_to_parquet(data: pd.DataFrame, file_path: str) -> None:
     assert not data.empty, "Data is empty"
     data.to_parquet(file_path, index=False)
     logger.debug(f"Data saved to {file_path}")
+
+
+def save_to_partitioned_parquet(
+    data: pd.DataFrame,
+    root_path: str,
+    timestamp_column: str = "timestamp",
+    row_group_size: int = 131_072,
+) -> None:
+    """
+    Save data to a parquet dataset partitioned by date, in hive style
+    (i.e. one directory 'date=YYYY-MM-DD/' per day).
+    Within each partition the rows are sorted by timestamp, so that the row groups
+    cover disjoint time ranges and time filters can skip them.
+    Each call writes new files, so data can be appended to an existing dataset.
+    :param data: pd.DataFrame, the data to be saved.
+    :param root_path: str, the path to the root directory of the dataset.
+    :param timestamp_column: str, the name of the column with the timestamps,
+        in datetime format. Default is 'timestamp'.
+    :param row_group_size: int, the maximum number of rows in each row group.
+        Default is 131072.
+    :return: None
+    """
+    assert not data.empty, "Data is empty"
+    assert (
+        PARTITION_COLUMN not in data.columns
+    ), f"Column '{PARTITION_COLUMN}' is reserved for partitioning"
+    data = data.sort_values(timestamp_column, kind="stable")
+    dates = pd.to_datetime(data[timestamp_column]).dt.strftime(datetime_fmt.DATE_FMT)
+    file_name = f"part-{uuid.uuid4().hex}.parquet"
+    for date, partition in data.groupby(dates, sort=True):
+        partition_path = os.path.join(root_path, f"{PARTITION_COLUMN}={date}")
+        os.makedirs(partition_path, exist_ok=True)
+        table = pa.Table.from_pandas(partition, preserve_index=False)
+        pq.write_table(
+            table,
+            os.path.join(partition_path, file_name),
+            row_group_size=row_group_size,
+        )
+    logger.debug(f"Data saved to {root_path}")
+
+
+def open_time_partitions(root_path: str) -> ds.Dataset:
+    """
+    Open a dataset written by save_to_partitioned_parquet, listing its partitions once,
+    to read several time ranges from it with read_time_partitions.
+    :param root_path: str, the path to the root directory of the dataset.
+    :return: ds.Dataset, the dataset.
+    """
+    return ds.dataset(root_path, format="parquet", partitioning=DATE_PARTITIONING)
+
+
+def read_time_partitions(
+    root_path: Union[str, ds.Dataset],
+    start_time: Union[datetime, str],
+    end_time: Union[datetime, str],
+    columns: Optional[List[str]] = None,
+    timestamp_column: str = "timestamp",
+    whole_days: bool = False,
+) -> pd.DataFrame:
+    """
+    Read the data in a time range from a dataset written by save_to_partitioned_parquet.
+    Only the partitions of the days overlapping the time range are read.
+    :param root_path: str, the path to the root directory of the dataset,
+        or the dataset opened with open_time_partitions, to list the partitions once
+        when reading several time ranges.
+    :param start_time: datetime, the start of the time range (inclusive).
+    :param end_time: datetime, the end of the time range (inclusive).
+    :param columns: list[str], the columns to read. Default is None (all columns).
+    :param timestamp_column: str, the name of the column with the timestamps.
+        Default is 'timestamp'.
+    :param whole_days: bool, whether to return all the rows of the days overlapping
+        the time range, instead of the rows in the time range only. Default is False.
+    :return: pd.DataFrame, the data read from the dataset, sorted by timestamp.
+    """
+    start_time = pd.Timestamp(start_time)
+    end_time = pd.Timestamp(end_time)
+    dataset = (
+        open_time_partitions(root_path) if isinstance(root_path, str) else root_path
+    )
+    date = ds.field(PARTITION_COLUMN)
+    expression = (date >= start_time.strftime(datetime_fmt.DATE_FMT)) & (
+        date <= end_time.strftime(datetime_fmt.DATE_FMT)
+    )
+    if not whole_days:
+        timestamp = ds.field(timestamp_column)
+        expression = expression & (timestamp >= start_time) & (timestamp <= end_time)
+    if columns is None:
+        columns = [name for name in dataset.schema.names if name != PARTITION_COLUMN]
+    logger.debug(f"Reading data between {start_time} and {end_time}")
+    data = dataset.to_table(columns=columns, filter=expression).to_pandas()
+    if timestamp_column in data.columns:
+        data = data.sort_values(timestamp_column, kind="stable", ignore_index=True)
+    return data
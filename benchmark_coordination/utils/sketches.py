@@ -0,0 +1,562 @@
+import math
+from typing import Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from numpy.typing import NDArray
+
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+class KLLSketch:
+    """
+    A mergeable quantile sketch (Karnin, Lang, Liberty, "Optimal quantile approximation
+    in streams", FOCS 2016), to estimate quantiles of a stream of numbers
+    in memory independent of the length of the stream.
+
+    The sketch keeps a hierarchy of compactors: level h holds items standing for
+    2**h items of the stream each. When a level overflows its capacity, it is sorted
+    and every other item is promoted to the next level, starting from a random offset.
+    The rank error is about 1/k of the number of items with high probability.
+    Sketches built over different parts of the stream (e.g. by parallel workers)
+    can be merged into a sketch of the whole stream.
+
+    Parameters
+    ----------
+    k : int, optional
+        The capacity of the top compactor, trading memory for accuracy. Default is 400.
+    seed : int, optional
+        The seed of the random offsets used by the compactions. Default is None.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> sketch = KLLSketch(seed=0)
+    >>> sketch.update(np.arange(100_000))
+    >>> other = KLLSketch(seed=1)
+    >>> other.update(np.arange(100_000, 200_000))
+    >>> sketch.merge(other)
+    >>> sketch.n
+    200000
+    >>> abs(sketch.quantile(0.5) - 100_000) < 2_000
+    True
+    """
+
+    _C = 2.0 / 3.0
+
+    def __init__(self, k: int = 400, seed: Optional[int] = None):
+        assert k >= 8, "k should be at least 8"
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.compactors: List[NDArray[np.float64]] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        """
+        Returns the capacity of a compactor, which decreases geometrically
+        from the top level down to the bottom one
+        :param level: int, the level of the compactor
+        :return: int
+        """
+        depth = len(self.compactors) - level - 1
+        return max(2, int(math.ceil(self.k * self._C**depth)))
+
+    def update(self, values: Any) -> None:
+        """
+        Add values to the sketch. Missing values are ignored.
+        :param values: array-like of numbers, the values to add.
+        :return: None
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        """
+        Merge another sketch into this one, which then summarizes both streams.
+        :param other: KLLSketch, the sketch to merge.
+        :return: None
+        """
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _compress(self) -> None:
+        """
+        Compact the levels exceeding their capacity, until all the levels fit
+        """
+        level = 0
+        while level < len(self.compactors):
+            items = self.compactors[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.compactors):
+                self.compactors.append(np.empty(0))
+            items = np.sort(items)
+            # an odd item out stays at this level, the others are halved
+            kept, items = items[: len(items) % 2], items[len(items) % 2 :]
+            promoted = items[self._rng.integers(2) :: 2]
+            self.compactors[level] = kept
+            self.compactors[level + 1] = np.concatenate(
+                [self.compactors[level + 1], promoted]
+            )
+            # adding a level lowers the capacity of the levels below it
+            level = 0
+
+    def _weighted_items(self):
+        """
+        Returns the items of all the levels, sorted, with their cumulative weights
+        :return: tuple of np.ndarray, the items and the cumulative weights
+        """
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate(
+            [
+                np.full(len(compactor), 2**level, dtype=np.float64)
+                for level, compactor in enumerate(self.compactors)
+            ]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile of the values added to the sketch.
+        :param q: float, the quantile, between 0 and 1.
+        :return: float, the estimated quantile.
+        """
+        assert 0 <= q <= 1, "The quantile should be between 0 and 1"
+        if self.n == 0:
+            raise ValueError("Cannot estimate a quantile of an empty sketch")
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+        items, cumulative_weights = self._weighted_items()
+        idx = np.searchsorted(cumulative_weights, q * cumulative_weights[-1])
+        return float(items[min(idx, len(items) - 1)])
+
+    def rank(self, value: float) -> float:
+        """
+        Estimate the number of values added to the sketch that are <= value.
+        :param value: float, the value.
+        :return: float, the estimated rank.
+        """
+        if self.n == 0:
+            return 0.0
+        items, cumulative_weights = self._weighted_items()
+        idx = np.searchsorted(items, value, side="right")
+        if idx == 0:
+            return 0.0
+        return float(cumulative_weights[idx - 1] / cumulative_weights[-1] * self.n)
+
+    def __len__(self) -> int:
+        return sum(len(compactor) for compactor in self.compactors)
+
+    def __repr__(self) -> str:
+        return f"KLLSketch(k={self.k}, n={self.n}, items={len(self)})"
+
+
+def _hash(values: Any, seed: int = 0) -> NDArray[np.uint64]:
+    """
+    Hash values to 64 bits, with a family of hash functions indexed by the seed.
+    Equal values are hashed equally across calls, e.g. from different chunks of a column.
+    :param values: array-like, the values to hash.
+    :param seed: int, the index of the hash function. Default is 0.
+    :return: np.ndarray of uint64, the hashes.
+    """
+    hashes = np.asarray(
+        pd.util.hash_pandas_object(pd.Series(values), index=False), dtype=np.uint64
+    )
+    return _mix(hashes, seed)
+
+
+def _mix(hashes: NDArray[np.uint64], seed: int = 0) -> NDArray[np.uint64]:
+    """
+    Mix 64-bit hashes with a seed (the splitmix64 finalizer)
+    :param hashes: np.ndarray of uint64, the hashes.
+    :param seed: int, the seed. Default is 0.
+    :return: np.ndarray of uint64, the mixed hashes.
+    """
+    z = hashes + np.uint64((seed + 1) * _GOLDEN % 2**64)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return np.asarray(z ^ (z >> np.uint64(31)), dtype=np.uint64)
+
+
+def _sorted_isin(
+    sorted_values: NDArray[np.uint64], values: NDArray[np.uint64]
+) -> NDArray[np.bool_]:
+    """
+    Returns whether each value is in a sorted array, by binary search
+    :param sorted_values: np.ndarray of uint64, the sorted array.
+    :param values: np.ndarray of uint64, the values to look up.
+    :return: np.ndarray of bool, whether each value is in sorted_values.
+    """
+    positions = np.searchsorted(sorted_values, values)
+    found = positions < len(sorted_values)
+    found[found] = sorted_values[positions[found]] == values[found]
+    return found
+
+
+def _bit_length(values: NDArray[np.uint64]) -> NDArray[np.int64]:
+    """
+    Returns the number of bits needed to represent each value, 0 for 0
+    :param values: np.ndarray of uint64, the values.
+    :return: np.ndarray of int64, the bit lengths.
+    """
+    lengths = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= np.uint64(1 << shift)
+        lengths += shift * high
+        values = np.where(high, values >> np.uint64(shift), values)
+    return lengths + (values > 0)
+
+
+class CountMinSketch:
+    """
+    A frequency sketch (Cormode, Muthukrishnan, "An improved data stream summary:
+    the count-min sketch and its applications", J. Algorithms 2005), to estimate
+    the number of occurrences of each value in a stream in fixed memory.
+
+    Each value increments one counter in each of depth rows of width counters,
+    chosen by independent hash functions, and its count is estimated by the minimum
+    of its counters. The estimates are never below the true counts, and exceed them
+    by at most e / width of the total count with probability 1 - exp(-depth).
+    Sketches of different parts of the stream can be merged.
+
+    Parameters
+    ----------
+    width : int, optional
+        The number of counters per row. Default is 2**16.
+    depth : int, optional
+        The number of rows. Default is 4.
+    seed : int, optional
+        The seed of the hash functions. Only sketches with the same seed
+        can be merged. Default is 0.
+
+    Examples
+    --------
+    >>> sketch = CountMinSketch()
+    >>> sketch.update(["a", "b", "a"])
+    >>> sketch.update(["a", "c"])
+    >>> sketch.query(["a", "b", "d"])
+    array([3, 1, 0])
+    """
+
+    def __init__(self, width: int = 2**16, depth: int = 4, seed: int = 0):
+        assert width > 0 and depth > 0, "Width and depth should be positive"
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.n = 0
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, values: Any) -> NDArray[np.int64]:
+        """
+        Returns the counter of each value in each row
+        :param values: array-like, the values.
+        :return: np.ndarray, the (depth, n_values) counters.
+        """
+        return np.stack(
+            [
+                (_hash(values, self.seed * self.depth + row) % np.uint64(self.width))
+                for row in range(self.depth)
+            ]
+        ).astype(np.int64)
+
+    def update(self, values: Any, counts: Optional[Any] = None) -> None:
+        """
+        Add occurrences of values to the sketch.
+        :param values: array-like, the values.
+        :param counts: array-like of int, the number of occurrences of each value.
+            Default is None (one each).
+        :return: None
+        """
+        if len(values) == 0:
+            return
+        weights = None if counts is None else np.asarray(counts, dtype=np.float64)
+        for row, columns in enumerate(self._columns(values)):
+            self.table[row] += np.rint(
+                np.bincount(columns, weights=weights, minlength=self.width)
+            ).astype(np.int64)
+        self.n += len(values) if counts is None else int(np.sum(counts))
+
+    def query(self, values: Any) -> NDArray[np.int64]:
+        """
+        Estimate the number of occurrences of values.
+        :param values: array-like, the values.
+        :return: np.ndarray of int64, the estimated counts, never below the true ones.
+        """
+        if len(values) == 0:
+            return np.empty(0, dtype=np.int64)
+        columns = self._columns(values)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other: "CountMinSketch") -> None:
+        """
+        Merge another sketch into this one, which then summarizes both streams.
+        :param other: CountMinSketch, the sketch to merge, with the same parameters.
+        :return: None
+        """
+        if (other.width, other.depth, other.seed) != (
+            self.width,
+            self.depth,
+            self.seed,
+        ):
+            raise ValueError("Only sketches with the same parameters can be merged")
+        self.table += other.table
+        self.n += other.n
+
+    def __repr__(self) -> str:
+        return f"CountMinSketch(width={self.width}, depth={self.depth}, n={self.n})"
+
+
+class HyperLogLog:
+    """
+    A distinct-count sketch (Flajolet et al., "HyperLogLog: the analysis of a near-optimal
+    cardinality estimation algorithm", AofA 2007), to estimate the number of distinct
+    values in a stream in fixed memory, with a relative error of about 1.04 / sqrt(2**p).
+
+    Each value is hashed to one of 2**p registers, which keeps the maximum position
+    of the first 1 bit in the rest of the hashes. Values added with keys are also counted
+    per key (e.g. hashtags per user), each key having its own counts: the distinct values
+    of a key are kept exactly (as hashes) up to exact_limit of them, then the key is
+    promoted to its own registers. Small counts, which are the most frequent and the
+    least accurate with registers, are therefore exact, and the memory of a key is
+    bounded by that of its registers. Each update only looks up its own (key, value)
+    pairs among the stored ones, by binary search, and updates the counts of its keys,
+    so that its cost does not grow with the hashing of all the data seen so far.
+    Keys are identified by a 64-bit hash.
+    Sketches of different parts of the stream can be merged.
+
+    Parameters
+    ----------
+    p : int, optional
+        The number of bits indexing the registers, between 4 and 16. Default is 12.
+    exact_limit : int, optional
+        The number of distinct values of a key kept exactly before the key is promoted
+        to registers. Default is None, in which case it is 2**p // 16, the number of
+        16-byte (key, value) hashes taking the memory of the 2**p one-byte registers.
+    seed : int, optional
+        The seed of the hash functions. Only sketches with the same seed
+        can be merged. Default is 0.
+
+    Attributes
+    ----------
+    registers : np.ndarray
+        The 2**p registers of all the values, whatever their key.
+
+    Examples
+    --------
+    >>> sketch = HyperLogLog()
+    >>> sketch.update(np.arange(100_000) % 5_000)
+    >>> abs(sketch.estimate() - 5_000) < 250
+    True
+    >>> per_user = HyperLogLog(p=8)
+    >>> per_user.update(["#a", "#b", "#a", "#c"], keys=["u1", "u1", "u2", "u2"])
+    >>> per_user.estimate_keys(["u1", "u2", "u3"])
+    array([2., 2., 0.])
+    """
+
+    def __init__(self, p: int = 12, exact_limit: Optional[int] = None, seed: int = 0):
+        assert 4 <= p <= 16, "p should be between 4 and 16"
+        self.p = p
+        self.exact_limit = 2**p // 16 if exact_limit is None else exact_limit
+        assert self.exact_limit >= 0, "The exact limit should be non-negative"
+        self.seed = seed
+        self.registers = np.zeros(2**p, dtype=np.uint8)
+        # the distinct (key, value) hashes of the keys counted exactly, sorted by
+        # the hash of the pair, and the sorted keys with their number of values
+        self._exact_pairs = np.empty(0, dtype=np.uint64)
+        self._exact_keys = np.empty(0, dtype=np.uint64)
+        self._exact_values = np.empty(0, dtype=np.uint64)
+        self._counted_keys = np.empty(0, dtype=np.uint64)
+        self._counts = np.empty(0, dtype=np.int64)
+        # the sorted hashes of the promoted keys, and their registers
+        self._promoted_keys = np.empty(0, dtype=np.uint64)
+        self._key_registers = np.zeros((0, 2**p), dtype=np.uint8)
+
+    def _positions(
+        self, hashes: NDArray[np.uint64]
+    ) -> Tuple[NDArray[np.int64], NDArray[np.uint8]]:
+        """
+        Returns the register of each hashed value and its rank
+        :param hashes: np.ndarray of uint64, the hashes of the values.
+        :return: tuple of np.ndarray, the registers and the ranks.
+        """
+        registers = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        # a guard bit bounds the position of the first 1 bit in the remaining bits
+        remaining = (hashes << np.uint64(self.p)) | np.uint64(1 << (self.p - 1))
+        return registers, (65 - _bit_length(remaining)).astype(np.uint8)
+
+    def _promote(self, keys: NDArray[np.uint64]) -> None:
+        """
+        Give registers to keys counted exactly so far, moving their values into them
+        :param keys: np.ndarray of uint64, the hashes of the keys, not promoted yet.
+        :return: None
+        """
+        keys = np.unique(keys)
+        self._promoted_keys = np.concatenate([self._promoted_keys, keys])
+        self._key_registers = np.concatenate(
+            [self._key_registers, np.zeros((len(keys), 2**self.p), dtype=np.uint8)]
+        )
+        order = np.argsort(self._promoted_keys, kind="stable")
+        self._promoted_keys = self._promoted_keys[order]
+        self._key_registers = self._key_registers[order]
+        counted = _sorted_isin(keys, self._counted_keys)
+        if counted.any():
+            self._counted_keys = self._counted_keys[~counted]
+            self._counts = self._counts[~counted]
+            moved = pd.Series(self._exact_keys).isin(keys).to_numpy()
+            self._add_promoted(self._exact_keys[moved], self._exact_values[moved])
+            self._exact_pairs = self._exact_pairs[~moved]
+            self._exact_keys = self._exact_keys[~moved]
+            self._exact_values = self._exact_values[~moved]
+
+    def _add_promoted(
+        self, keys: NDArray[np.uint64], values: NDArray[np.uint64]
+    ) -> None:
+        """
+        Add hashed values to the registers of their promoted keys
+        :param keys: np.ndarray of uint64, the hashes of the keys, all promoted.
+        :param values: np.ndarray of uint64, the hashes of the values.
+        :return: None
+        """
+        rows = np.searchsorted(self._promoted_keys, keys)
+        registers, ranks = self._positions(values)
+        np.maximum.at(self._key_registers, (rows, registers), ranks)
+
+    def _add_keys(self, keys: NDArray[np.uint64], values: NDArray[np.uint64]) -> None:
+        """
+        Count hashed values per key, promoting the keys with too many distinct values
+        :param keys: np.ndarray of uint64, the hashes of the keys.
+        :param values: np.ndarray of uint64, the hashes of the values.
+        :return: None
+        """
+        promoted = _sorted_isin(self._promoted_keys, keys)
+        self._add_promoted(keys[promoted], values[promoted])
+        keys, values = keys[~promoted], values[~promoted]
+        # only the new pairs are compared with the stored ones, by binary search
+        pairs, first = np.unique(_mix(keys ^ _mix(values), 1), return_index=True)
+        is_new = ~_sorted_isin(self._exact_pairs, pairs)
+        pairs, keys, values = pairs[is_new], keys[first[is_new]], values[first[is_new]]
+        if len(pairs) == 0:
+            return
+        positions = np.searchsorted(self._exact_pairs, pairs)
+        self._exact_pairs = np.insert(self._exact_pairs, positions, pairs)
+        self._exact_keys = np.insert(self._exact_keys, positions, keys)
+        self._exact_values = np.insert(self._exact_values, positions, values)
+
+        new_keys, new_counts = np.unique(keys, return_counts=True)
+        counted = _sorted_isin(self._counted_keys, new_keys)
+        rows = np.searchsorted(self._counted_keys, new_keys[counted])
+        self._counts[rows] += new_counts[counted]
+        positions = np.searchsorted(self._counted_keys, new_keys[~counted])
+        self._counted_keys = np.insert(
+            self._counted_keys, positions, new_keys[~counted]
+        )
+        self._counts = np.insert(self._counts, positions, new_counts[~counted])
+        counts = self._counts[np.searchsorted(self._counted_keys, new_keys)]
+        over = new_keys[counts > self.exact_limit]
+        if len(over) > 0:
+            self._promote(over)
+
+    def update(self, values: Any, keys: Optional[Any] = None) -> None:
+        """
+        Add values to the sketch.
+        :param values: array-like, the values.
+        :param keys: array-like, the key of each value, to count the distinct values
+            per key. Default is None.
+        :return: None
+        """
+        if len(values) == 0:
+            return
+        hashes = _hash(values, 2 * self.seed)
+        np.maximum.at(self.registers, *self._positions(hashes))
+        if keys is not None:
+            self._add_keys(_hash(keys, 2 * self.seed + 1), hashes)
+
+    def _estimate(self, registers: NDArray[np.uint8]) -> NDArray[np.float64]:
+        """
+        Returns the estimated number of distinct values of each set of registers
+        :param registers: np.ndarray, the (n_sets, 2**p) registers.
+        :return: np.ndarray of float64, the estimates.
+        """
+        m = registers.shape[1]
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        raw = alpha * m**2 / np.exp2(-registers.astype(np.float64)).sum(axis=1)
+        zeros = (registers == 0).sum(axis=1)
+        # linear counting is more accurate for small counts
+        small = (raw <= 2.5 * m) & (zeros > 0)
+        linear = m * np.log(m / np.maximum(zeros, 1))
+        return np.where(small, linear, raw)
+
+    def estimate(self) -> float:
+        """
+        Estimate the number of distinct values added to the sketch, for all the keys.
+        :return: float, the estimated number of distinct values.
+        """
+        return float(self._estimate(self.registers[None, :])[0])
+
+    def estimate_keys(self, keys: Any) -> NDArray[np.float64]:
+        """
+        Estimate the number of distinct values of each key.
+        The counts of the keys with at most exact_limit distinct values are exact.
+        :param keys: array-like, the keys.
+        :return: np.ndarray of float64, the estimated number of distinct values of each key.
+        """
+        if len(keys) == 0:
+            return np.empty(0, dtype=np.float64)
+        hashes = _hash(keys, 2 * self.seed + 1)
+        estimates = np.zeros(len(hashes), dtype=np.float64)
+        counted = _sorted_isin(self._counted_keys, hashes)
+        rows = np.searchsorted(self._counted_keys, hashes[counted])
+        estimates[counted] = self._counts[rows]
+        promoted = _sorted_isin(self._promoted_keys, hashes)
+        rows = np.searchsorted(self._promoted_keys, hashes[promoted])
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        estimates[promoted] = self._estimate(self._key_registers[unique_rows])[inverse]
+        return estimates
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """
+        Merge another sketch into this one, which then summarizes both streams.
+        :param other: HyperLogLog, the sketch to merge, with the same parameters.
+        :return: None
+        """
+        if (other.p, other.exact_limit, other.seed) != (
+            self.p,
+            self.exact_limit,
+            self.seed,
+        ):
+            raise ValueError("Only sketches with the same parameters can be merged")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        new = other._promoted_keys[
+            ~_sorted_isin(self._promoted_keys, other._promoted_keys)
+        ]
+        if len(new) > 0:
+            self._promote(new)
+        rows = np.searchsorted(self._promoted_keys, other._promoted_keys)
+        self._key_registers[rows] = np.maximum(
+            self._key_registers[rows], other._key_registers
+        )
+        self._add_keys(other._exact_keys, other._exact_values)
+
+    def __repr__(self) -> str:
+        return (
+            f"HyperLogLog(p={self.p}, n_promoted_keys={len(self._promoted_keys)}, "
+            f"estimate={self.estimate():.0f})"
+        )
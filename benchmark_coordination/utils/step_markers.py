@@ -0,0 +1,67 @@
+from typing import Callable, List, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+
+def row_local(step: F) -> F:
+    """
+    Mark a pipeline step as row-local.
+    A step is row-local if the output for each row depends only on that row,
+    like filters and text cleaning. Row-local steps can be applied chunk by chunk
+    to an input larger than memory (see Pipeline.fit_chunks), while the other steps
+    need the whole data at once.
+    :param step: Callable, the function of the step.
+    :return: Callable, the same function, marked as row-local.
+    ----------------
+    Example:
+    ----------------
+    >>> @row_local
+    ... def drop_retweets(df):
+    ...     return df[~df["is_retweet"]]
+    >>> is_row_local(drop_retweets)
+    True
+    """
+    setattr(step, "row_local", True)
+    return step
+
+
+def is_row_local(step: Callable) -> bool:
+    """
+    Check if a pipeline step is marked as row-local.
+    :param step: Callable, the function of the step.
+    :return: bool, True if the step was marked with the row_local decorator.
+    """
+    return bool(getattr(step, "row_local", False))
+
+
+def requires_columns(*columns: str) -> Callable[[F], F]:
+    """
+    Declare the input columns read by a pipeline step, besides the ones named
+    in its params, so that only the columns used by a pipeline are read from a file
+    (see utils.io_utils.infer_columns).
+    :param columns: str, the names of the columns.
+    :return: Callable, a decorator marking the function of the step.
+    ----------------
+    Example:
+    ----------------
+    >>> @requires_columns("author_id", "trace")
+    ... def count_traces(df):
+    ...     return df.groupby("author_id")["trace"].count()
+    >>> required_columns(count_traces)
+    ['author_id', 'trace']
+    """
+
+    def mark(step: F) -> F:
+        setattr(step, "required_columns", list(columns))
+        return step
+
+    return mark
+
+
+def required_columns(step: Callable) -> List[str]:
+    """
+    Returns the input columns declared by a pipeline step.
+    :param step: Callable, the function of the step.
+    :return: list[str], the columns declared with the requires_columns decorator.
+    """
+    return list(getattr(step, "required_columns", []))
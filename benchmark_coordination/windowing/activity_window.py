@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
-from typing import Generator
+import scipy.sparse as sp  # type: ignore
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Generator, Tuple
 
 
 def filter_dataframe(data: pd.DataFrame, start_idx: int, end_idx: int) -> pd.DataFrame:
@@ -35,10 +38,202 @@ def slide_dataframe(
         Default is -1, which means the last index.
     :return: generator, a generator that yields the data in each window.
     """
-    final_index = len(data) if end_idx == -1 else end_idx
-    current_window_start = max(start_idx, 0)
-    current_window_end = current_window_start + window_size
-    while current_window_start < final_index:
-        yield filter_dataframe(data, current_window_start, current_window_end)
-        current_window_start += step_size
-        current_window_end = current_window_start + window_size
+    # validate once, instead of once per window in filter_dataframe
+    assert window_size > 0, "Window size should be positive"
+    assert step_size > 0, "Step size should be positive"
+    assert (
+        data.index.is_monotonic_increasing
+    ), "Data index should be monotonically increasing"
+    starts, ends = window_bounds(len(data), window_size, step_size, start_idx, end_idx)
+    for start, end in zip(starts, ends):
+        yield data.iloc[start:end]
+
+
+def window_bounds(
+    n_activities: int,
+    window_size: int,
+    step_size: int,
+    start_idx: int = 0,
+    end_idx: int = -1,
+    full_only: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the positions of the windows of slide_dataframe, without slicing the data.
+    :param n_activities: int, the number of activities.
+    :param window_size: int, the size of the window as number of activities.
+    :param step_size: int, the size of the step to slide the window.
+    :param start_idx: int, the start index of the data to consider. Default is 0.
+    :param end_idx: int, the end index of the data to consider.
+        Default is -1, which means the last index.
+    :param full_only: bool, whether to drop the last windows, which are shorter
+        than window_size. Default is False.
+    :return: tuple of np.ndarray, the start (inclusive) and end (exclusive)
+        position of each window.
+    ----------------
+    Example:
+    ----------------
+    >>> window_bounds(5, 2, 2)
+    (array([0, 2, 4]), array([2, 4, 5]))
+    """
+    final_index = n_activities if end_idx == -1 else end_idx
+    starts = np.arange(max(start_idx, 0), final_index, step_size)
+    ends = np.minimum(starts + window_size, n_activities)
+    if full_only:
+        keep = ends - starts == window_size
+        starts, ends = starts[keep], ends[keep]
+    return starts, ends
+
+
+def window_features(
+    values: np.ndarray,
+    window_size: int,
+    step_size: int,
+    start_idx: int = 0,
+    end_idx: int = -1,
+) -> np.ndarray:
+    """
+    Gather the values of all the full windows of slide_dataframe at once, as the rows
+    of a (n_windows, window_size) array, e.g. the encoded traces of the activities
+    (see pd.factorize or utils.id_registry.IdRegistry), for batched similarity.
+    The array is a strided view of values, so it takes no extra memory.
+    :param values: np.ndarray, one value per activity, in the order of the data.
+    :param window_size: int, the size of the window as number of activities.
+    :param step_size: int, the size of the step to slide the window.
+    :param start_idx: int, the start index of the data to consider. Default is 0.
+    :param end_idx: int, the end index of the data to consider.
+        Default is -1, which means the last index.
+    :return: np.ndarray, the (read-only) values of each window.
+    ----------------
+    Example:
+    ----------------
+    >>> window_features(np.array([1, 2, 3, 4, 5]), 2, 2)
+    array([[1, 2],
+           [3, 4]])
+    """
+    values = np.asarray(values)
+    starts, _ = window_bounds(
+        len(values), window_size, step_size, start_idx, end_idx, full_only=True
+    )
+    if len(starts) == 0:
+        return np.empty((0, window_size), dtype=values.dtype)
+    return sliding_window_view(values, window_size)[
+        starts[0] : starts[-1] + 1 : step_size
+    ]
+
+
+def window_count_matrix(windows: np.ndarray, n_codes: int) -> sp.csr_matrix:
+    """
+    Count the occurrences of each code in each window, e.g. the traces used by the
+    activities of each window, as a sparse matrix whose rows can be compared in batch
+    (e.g. cosine similarity of the normalized rows).
+    :param windows: np.ndarray, the (n_windows, window_size) codes of the traces
+        of each window, from window_features, between 0 and n_codes - 1.
+    :param n_codes: int, the number of distinct codes.
+    :return: sp.csr_matrix, the (n_windows, n_codes) counts.
+    ----------------
+    Example:
+    ----------------
+    >>> codes = np.array([0, 1, 1, 2])
+    >>> window_count_matrix(window_features(codes, 2, 1), 3).toarray()
+    array([[1, 1, 0],
+           [0, 2, 0],
+           [0, 1, 1]])
+    """
+    n_windows, window_size = windows.shape
+    matrix = sp.csr_matrix(
+        (
+            np.ones(n_windows * window_size, dtype=np.int64),
+            windows.ravel(),
+            np.arange(0, n_windows * window_size + 1, window_size),
+        ),
+        shape=(n_windows, n_codes),
+    )
+    matrix.sum_duplicates()
+    return matrix
+
+
+def author_windows(
+    data: pd.DataFrame,
+    window_size: int,
+    step_size: int,
+    author_column: str = "author_id",
+    timestamp_column: str = "timestamp",
+    full_only: bool = True,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Slide activity windows over the activities of each author, for all the authors at once.
+    The data is sorted once by author and timestamp, and the windows are returned as
+    offsets into the sorted data, so that the memory is proportional to the data
+    and not to the windows (which overlap when step_size < window_size).
+    The windows of each author are the ones of slide_dataframe on their activities.
+    :param data: pd.DataFrame, the activities, with columns author_column and timestamp_column.
+    :param window_size: int, the size of the window as number of activities.
+    :param step_size: int, the size of the step to slide the window.
+    :param author_column: str, the name of the column with the authors.
+        Default is 'author_id'.
+    :param timestamp_column: str, the name of the column with the timestamps.
+        Default is 'timestamp'.
+    :param full_only: bool, whether to drop the last windows of each author,
+        which are shorter than window_size. Default is True.
+    :return: tuple of pd.DataFrame, the sorted activities (with a new index),
+        and the windows, with columns author_column, 'start' (inclusive) and
+        'end' (exclusive), positions in the sorted activities.
+        See gather_windows to get the values of the full windows in a batch.
+    ----------------
+    Example:
+    ----------------
+    >>> df = pd.DataFrame({"author_id": [2, 1, 2, 1, 1], "timestamp": [4, 3, 1, 2, 1]})
+    >>> activities, windows = author_windows(df, 2, 1)
+    >>> windows
+       author_id  start  end
+    0          1      0    2
+    1          1      1    3
+    2          2      3    5
+    """
+    assert window_size > 0, "Window size should be positive"
+    assert step_size > 0, "Step size should be positive"
+    activities = data.sort_values(
+        [author_column, timestamp_column], kind="stable", ignore_index=True
+    )
+    authors = activities[author_column].to_numpy()
+    group_starts = np.flatnonzero(np.r_[True, authors[1:] != authors[:-1]])
+    if len(authors) == 0:
+        group_starts = group_starts[:0]
+    group_sizes = np.diff(np.r_[group_starts, len(authors)])
+    if full_only:
+        n_windows = np.maximum(0, (group_sizes - window_size) // step_size + 1)
+    else:
+        n_windows = -(-group_sizes // step_size)
+    first_window = np.cumsum(n_windows) - n_windows
+    window_number = np.arange(n_windows.sum()) - np.repeat(first_window, n_windows)
+    starts = np.repeat(group_starts, n_windows) + step_size * window_number
+    ends = np.minimum(
+        starts + window_size, np.repeat(group_starts + group_sizes, n_windows)
+    )
+    windows = pd.DataFrame(
+        {
+            author_column: authors[np.repeat(group_starts, n_windows)],
+            "start": starts,
+            "end": ends,
+        }
+    )
+    return activities, windows
+
+
+def gather_windows(
+    values: np.ndarray, starts: np.ndarray, window_size: int
+) -> np.ndarray:
+    """
+    Gather the values of full windows starting at the given positions, e.g. the encoded
+    traces of the windows of author_windows, as the rows of a (n_windows, window_size) array.
+    :param values: np.ndarray, one value per activity, in the order of the activities.
+    :param starts: np.ndarray, the start position of each window.
+    :param window_size: int, the size of the window as number of activities.
+    :return: np.ndarray, the values of each window.
+    """
+    values = np.asarray(values)
+    starts = np.asarray(starts, dtype=np.int64)
+    if len(starts) == 0:
+        return np.empty((0, window_size), dtype=values.dtype)
+    assert starts.max() + window_size <= len(values), "Windows should be full"
+    return sliding_window_view(values, window_size)[starts]
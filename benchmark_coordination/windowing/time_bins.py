@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Generator, Optional, Tuple, Union
+
+from benchmark_coordination.utils.logging import logger
+
+
+class TimeBinCube:
+    """
+    Counts of events per (source, target) pair, e.g. (author, retweeted tweet),
+    in fixed time bins, stored as cumulative sums so that the counts in any
+    time window are the difference of two prefix sums.
+
+    The events are binned and aggregated once; the counts of a window then cost
+    two binary searches per pair, independently of the number of events in it,
+    so that many window sizes and steps can be tried after a single build.
+    Windows are half-open, [start, end), and their bounds are rounded down to the bins.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The events, with columns source_column, target_column and timestamp_column.
+    bin_size : int, optional
+        The size of the bins in minutes. Default is 5.
+    source_column : str, optional
+        The name of the column with the sources. Default is 'author_id'.
+    target_column : str, optional
+        The name of the column with the targets. Default is 'trace'.
+    timestamp_column : str, optional
+        The name of the column with the timestamps. Default is 'timestamp'.
+    origin : datetime, optional
+        The start of the first bin. Default is None, the earliest event
+        rounded down to the day.
+
+    Attributes
+    ----------
+    pairs : pd.DataFrame
+        The (source, target) pairs with at least one event.
+    n_bins : int
+        The number of bins between the origin and the last event.
+
+    Examples
+    --------
+    >>> df = pd.DataFrame({
+    ...     "author_id": [1, 1, 2],
+    ...     "trace": ["a", "a", "a"],
+    ...     "timestamp": pd.to_datetime(["2022-09-01 00:01", "2022-09-01 00:07", "2022-09-01 00:08"]),
+    ... })
+    >>> cube = TimeBinCube(df, bin_size=5)
+    >>> cube.counts("2022-09-01 00:05", "2022-09-01 00:10")
+       author_id trace  count
+    0          1     a      1
+    1          2     a      1
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        bin_size: int = 5,
+        source_column: str = "author_id",
+        target_column: str = "trace",
+        timestamp_column: str = "timestamp",
+        origin: Optional[Union[datetime, str]] = None,
+    ):
+        assert bin_size > 0, "Bin size should be positive"
+        self.bin_size = bin_size
+        self.source_column = source_column
+        self.target_column = target_column
+        timestamps = pd.to_datetime(data[timestamp_column])
+        self.origin = (
+            timestamps.min().normalize() if origin is None else pd.Timestamp(origin)
+        )
+        bins = self._bin(timestamps.to_numpy())
+        assert len(bins) == 0 or bins.min() >= 0, "Events should not precede the origin"
+        self.n_bins = int(bins.max()) + 1 if len(bins) else 0
+
+        columns = [source_column, target_column]
+        pair_codes = data.groupby(columns, sort=False, dropna=False).ngroup().to_numpy()
+        pairs = data[columns].drop_duplicates().reset_index(drop=True)
+        self.pairs = pairs
+        # one entry per (pair, bin) with events, sorted by pair and bin,
+        # with the number of events of the pair up to the bin (included)
+        keys, counts = np.unique(
+            pair_codes.astype(np.int64) * self.n_bins + bins, return_counts=True
+        )
+        entry_pairs = keys // max(self.n_bins, 1)
+        cumulative = np.cumsum(counts)
+        pair_starts = np.searchsorted(entry_pairs, np.arange(len(pairs)))
+        offsets = np.r_[0, cumulative][pair_starts]
+        self._keys = keys
+        self._cumulative = cumulative - np.repeat(
+            offsets, np.diff(np.r_[pair_starts, len(keys)])
+        )
+        logger.debug(
+            f"Time bin cube of {len(pairs)} pairs, {self.n_bins} bins, {len(keys)} entries"
+        )
+
+    def _bin(self, timestamps: np.ndarray) -> np.ndarray:
+        """
+        Returns the bin of each timestamp
+        :param timestamps: np.ndarray, the timestamps.
+        :return: np.ndarray of int64, the bins.
+        """
+        delta = pd.to_datetime(timestamps) - self.origin
+        return np.asarray(delta // pd.Timedelta(minutes=self.bin_size), dtype=np.int64)
+
+    def _prefix(self, last_bin: int) -> np.ndarray:
+        """
+        Returns the number of events of each pair in the bins up to last_bin (included)
+        :param last_bin: int, the last bin.
+        :return: np.ndarray, the counts of each pair.
+        """
+        pair_codes = np.arange(len(self.pairs), dtype=np.int64)
+        if last_bin < 0:
+            return np.zeros(len(pair_codes), dtype=np.int64)
+        last_bin = min(last_bin, self.n_bins - 1)
+        positions = np.searchsorted(
+            self._keys, pair_codes * self.n_bins + last_bin, side="right"
+        )
+        # the entry before the position is the last one of the pair up to the bin,
+        # unless it belongs to the previous pair
+        previous = np.maximum(positions - 1, 0)
+        found = (positions > 0) & (self._keys[previous] // self.n_bins == pair_codes)
+        return np.where(found, self._cumulative[previous], 0)
+
+    def counts(
+        self,
+        start_time: Union[datetime, str],
+        end_time: Union[datetime, str],
+        drop_zeros: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Count the events of each pair in a time window.
+        :param start_time: datetime, the start of the window (inclusive).
+        :param end_time: datetime, the end of the window (exclusive).
+        :param drop_zeros: bool, whether to drop the pairs without events in the window.
+            Default is True.
+        :return: pd.DataFrame, with columns source_column, target_column and 'count'.
+        """
+        first_bin, end_bin = self._bin(
+            np.array([pd.Timestamp(start_time), pd.Timestamp(end_time)])
+        )
+        counts = self._prefix(end_bin - 1) - self._prefix(first_bin - 1)
+        result = self.pairs.assign(count=counts)
+        if drop_zeros:
+            result = result[counts > 0].reset_index(drop=True)
+        return result
+
+    def slide(
+        self,
+        window_size: int,
+        step_size: int,
+        start_time: Union[datetime, str],
+        end_time: Union[datetime, str],
+    ) -> Generator[Tuple[pd.Timestamp, pd.DataFrame], None, None]:
+        """
+        Count the events of each pair in time windows sliding through the time range,
+        as time_window.slide_dataframe, but with half-open windows.
+        :param window_size: int, the size of the time window in minutes,
+            a multiple of the bin size.
+        :param step_size: int, the size of the step to slide the window in minutes,
+            a multiple of the bin size.
+        :param start_time: datetime, the start time of the time range.
+        :param end_time: datetime, the end time of the time range.
+        :return: generator, a generator that yields the start of each window
+            and its counts, see counts.
+        """
+        assert (
+            window_size % self.bin_size == 0 and step_size % self.bin_size == 0
+        ), "Window and step sizes should be multiples of the bin size"
+        current_window_start = pd.Timestamp(start_time)
+        while current_window_start <= pd.Timestamp(end_time):
+            current_window_end = current_window_start + pd.Timedelta(
+                minutes=window_size
+            )
+            yield current_window_start, self.counts(
+                current_window_start, current_window_end
+            )
+            current_window_start += pd.Timedelta(minutes=step_size)
+
+    def __repr__(self) -> str:
+        return (
+            f"TimeBinCube(bin_size={self.bin_size}, n_pairs={len(self.pairs)}, "
+            f"n_bins={self.n_bins})"
+        )
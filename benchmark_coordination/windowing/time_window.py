@@ -1,12 +1,15 @@
 import pandas as pd
 from datetime import datetime
-from typing import Any, Generator
+from typing import Any, Dict, Generator, List, Optional
 import networkx as nx
 
 import benchmark_coordination.utils.dataframe_utils as df_utils
 import benchmark_coordination.utils.datetime_utils as dt_utils
+import benchmark_coordination.utils.io_utils as io_utils
+from benchmark_coordination.utils.step_markers import row_local
 
 
+@row_local
 def filter_dataframe(
     data: pd.DataFrame, start_time: datetime, end_time: datetime
 ) -> pd.DataFrame:
@@ -46,6 +49,53 @@ def slide_dataframe(
         current_window_end = current_window_start + pd.Timedelta(minutes=window_size)
 
 
+def slide_partitioned_dataset(
+    root_path: str,
+    window_size: int,
+    step_size: int,
+    start_time: datetime,
+    end_time: datetime,
+    columns: Optional[List[str]] = None,
+) -> Generator[pd.DataFrame, None, None]:
+    """
+    Generate a time window that slides through the time range of a dataset
+    partitioned by date (see utils.io_utils.save_to_partitioned_parquet).
+    Each day is read once, when the first window overlapping it is generated,
+    and dropped once the windows have moved past it, so that the cost of sliding is
+    proportional to the size of the time range rather than to the size of the dataset.
+    The windows are the same as the ones of slide_dataframe on the whole data.
+    :param root_path: str, the path to the root directory of the dataset.
+    :param window_size: int, the size of the time window in minutes.
+    :param step_size: int, the size of the step to slide the window in minutes.
+    :param start_time: datetime, the start time of the time range.
+    :param end_time: datetime, the end time of the time range.
+    :param columns: list[str], the columns to read. Default is None (all columns).
+        The 'timestamp' column is always read.
+    :return: generator, a generator that yields the data in each window.
+    """
+    if columns is not None and "timestamp" not in columns:
+        columns = columns + ["timestamp"]
+    # the partitions are listed once, not for every day read
+    dataset = io_utils.open_time_partitions(root_path)
+    days: Dict[pd.Timestamp, pd.DataFrame] = {}
+    current_window_start = pd.Timestamp(start_time)
+    while current_window_start <= end_time:
+        current_window_end = current_window_start + pd.Timedelta(minutes=window_size)
+        window_days = pd.date_range(
+            current_window_start.normalize(), current_window_end.normalize(), freq="D"
+        )
+        # drop the days before the window, read the days not seen yet
+        days = {day: data for day, data in days.items() if day in window_days}
+        for day in window_days:
+            if day not in days:
+                days[day] = io_utils.read_time_partitions(
+                    dataset, day, day, columns=columns, whole_days=True
+                )
+        window_data = pd.concat([days[day] for day in window_days], ignore_index=True)
+        yield filter_dataframe(window_data, current_window_start, current_window_end)
+        current_window_start += pd.Timedelta(minutes=step_size)
+
+
 def filter_graph(
     bipartite: nx.Graph, start_time: datetime, end_time: datetime
 ) -> nx.Graph:
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_coordination.features_builder.activity_vectors import (
+    MINUTES_PER_WEEK,
+    build_activity_matrix,
+    normalize_rows,
+)
+from benchmark_coordination.similarity_calculator.scores import cosine_similarity
+from benchmark_coordination.utils.id_registry import IdRegistry
+
+
+@pytest.fixture
+def activities():
+    """
+    Authors posting over three weeks.
+    """
+    rng = np.random.default_rng(0)
+    n = 500
+    return pd.DataFrame(
+        {
+            "author_id": rng.choice(["a", "b", "c", "d"], n),
+            "timestamp": pd.Timestamp("2022-09-01")
+            + pd.to_timedelta(rng.integers(0, 21 * 86_400, n), unit="s"),
+        }
+    )
+
+
+def test_build_activity_matrix(activities):
+    """
+    Test the build_activity_matrix function against per-author histograms.
+    """
+    matrix, authors = build_activity_matrix(activities, bin_size=30)
+    minutes = (activities["timestamp"] - pd.Timestamp("2022-09-01")).dt.total_seconds()
+    bins = (minutes // 1800).astype(int)
+
+    assert list(authors) == ["a", "b", "c", "d"], f"Got {list(authors)}"
+    assert matrix.shape == (4, bins.max() + 1), f"Got shape {matrix.shape}"
+    for row, author in enumerate(authors):
+        expected = np.bincount(
+            bins[activities["author_id"] == author], minlength=matrix.shape[1]
+        )
+        assert (matrix[row].toarray().ravel() == expected).all(), f"Author {author}"
+
+
+def test_build_activity_matrix_fold_week(activities):
+    """
+    Test the build_activity_matrix function folded on the hours of the week.
+    """
+    matrix, _ = build_activity_matrix(
+        activities, bin_size=60, fold_period=MINUTES_PER_WEEK
+    )
+    timestamps = activities["timestamp"]
+    hour_of_week = timestamps.dt.dayofweek * 24 + timestamps.dt.hour
+
+    assert matrix.shape == (4, 168), f"Got shape {matrix.shape}"
+    assert (
+        np.asarray(matrix.sum(axis=0)).ravel()
+        == np.bincount(hour_of_week, minlength=168)
+    ).all(), "Expected the counts per hour of the week"
+
+
+def test_build_activity_matrix_registry(activities):
+    """
+    Test the build_activity_matrix function with a registry of authors.
+    """
+    registry = IdRegistry(["z", "d", "c", "b", "a"])
+    matrix, authors = build_activity_matrix(activities, registry=registry)
+
+    assert list(authors) == ["z", "d", "c", "b", "a"], f"Got {list(authors)}"
+    assert matrix[0].nnz == 0, "Expected no activity for an author not in the data"
+
+
+def test_normalize_rows_cosine(activities):
+    """
+    Test that the normalized rows give the cosine similarity.
+    """
+    matrix, _ = build_activity_matrix(activities, bin_size=24 * 60)
+    normalized = normalize_rows(matrix)
+    result = (normalized @ normalized.T).toarray()
+    dense = matrix.toarray()
+
+    assert np.isclose(
+        result[0, 1], cosine_similarity(dense[0], dense[1])
+    ), "Expected the cosine similarity"
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_coordination.features_builder.filters import (
+    count_sketch,
+    distinct_sketch,
+    drop_self_actions,
+    filter_by_count,
+    filter_by_count_sketch,
+    filter_by_distinct,
+    filter_by_distinct_sketch,
+)
+from benchmark_coordination.pipeline.pipeline import Pipeline
+
+
+@pytest.fixture
+def retweets():
+    """
+    Users retweeting other users, with a few heavy hitters.
+    """
+    rng = np.random.default_rng(0)
+    n = 20_000
+    return pd.DataFrame(
+        {
+            "author_id": rng.integers(0, 2_000, n),
+            "retweeted": rng.zipf(1.8, n) % 3_000,
+            "hashtag": rng.integers(0, 30, n),
+        }
+    )
+
+
+def test_drop_self_actions(retweets):
+    """
+    Test the drop_self_actions function.
+    """
+    result = drop_self_actions(retweets, "retweeted")
+
+    assert (result["author_id"] != result["retweeted"]).all(), "Self-retweets left"
+    assert len(result) == (retweets["author_id"] != retweets["retweeted"]).sum()
+
+
+def test_filter_by_count(retweets):
+    """
+    Test the filter_by_count function.
+    """
+    counts = retweets["retweeted"].value_counts()
+    result = filter_by_count(retweets, "retweeted", min_count=100, max_count=1_000)
+    expected = counts[(counts >= 100) & (counts <= 1_000)]
+
+    assert set(result["retweeted"]) == set(expected.index), "Unexpected users"
+    assert len(result) == expected.sum(), f"Expected {expected.sum()} rows"
+
+
+def test_filter_by_distinct(retweets):
+    """
+    Test the filter_by_distinct function.
+    """
+    retweets = retweets.astype({"hashtag": "float"})
+    retweets.loc[retweets.index[::3], "hashtag"] = np.nan
+    distinct = retweets.groupby("author_id")["hashtag"].nunique()
+    result = filter_by_distinct(retweets, "author_id", "hashtag", min_distinct=5)
+
+    assert set(result["author_id"]) == set(distinct.index[distinct >= 5])
+    assert result.index.equals(
+        retweets.index[retweets["author_id"].isin(distinct.index[distinct >= 5])]
+    ), "All the rows of the kept users should be kept"
+
+
+def test_filter_by_count_sketch(retweets):
+    """
+    Test that filter_by_count_sketch keeps all the rows kept by filter_by_count.
+    """
+    chunks = [retweets.iloc[i : i + 5_000] for i in range(0, len(retweets), 5_000)]
+    sketch = count_sketch(chunks, "retweeted")
+    result = pd.concat(
+        [filter_by_count_sketch(chunk, "retweeted", sketch, 50) for chunk in chunks]
+    )
+    expected = filter_by_count(retweets, "retweeted", min_count=50)
+
+    assert expected.index.isin(result.index).all(), "Rows of heavy hitters dropped"
+    assert len(result) <= 1.01 * len(expected), "Too many rows kept"
+
+
+def test_filter_by_distinct_sketch(retweets):
+    """
+    Test that filter_by_distinct_sketch is close to filter_by_distinct.
+    """
+    chunks = [retweets.iloc[i : i + 5_000] for i in range(0, len(retweets), 5_000)]
+    sketch = distinct_sketch(chunks, "author_id", "hashtag")
+    result = pd.concat(
+        [
+            filter_by_distinct_sketch(chunk, "author_id", sketch, min_distinct=5)
+            for chunk in chunks
+        ]
+    )
+    expected = filter_by_distinct(retweets, "author_id", "hashtag", min_distinct=5)
+
+    overlap = len(result.index.intersection(expected.index))
+    assert overlap / len(expected) > 0.95, "Too many rows of the expected users dropped"
+    assert len(result) < 1.05 * len(expected), "Too many rows kept"
+
+
+def test_filters_fit_chunks(retweets):
+    """
+    Test that the sketch filters are row-local steps of a pipeline fitted on chunks.
+    """
+    chunks = [retweets.iloc[i : i + 5_000] for i in range(0, len(retweets), 5_000)]
+    sketch = count_sketch(chunks, "author_id")
+    pipe = Pipeline(
+        steps=[
+            ("drop_self_actions", drop_self_actions, {"target_column": "retweeted"}),
+            (
+                "filter_by_count_sketch",
+                filter_by_count_sketch,
+                {"column": "author_id", "sketch": sketch, "min_count": 15},
+            ),
+            (
+                "filter_by_distinct",
+                filter_by_distinct,
+                {
+                    "column": "retweeted",
+                    "distinct_column": "author_id",
+                    "min_distinct": 2,
+                },
+            ),
+        ]
+    )
+    result = pipe.fit_chunks(chunks).reset_index(drop=True)
+    expected = pipe.fit(retweets).reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_filter_by_distinct_sketch_many_keys():
+    """
+    Test that filter_by_distinct_sketch counts each key separately,
+    with many more keys than registers.
+    """
+    rng = np.random.default_rng(0)
+    n_users = 50_000
+    df = pd.DataFrame(
+        {
+            "author_id": np.repeat(np.arange(n_users), 4),
+            "hashtag": np.repeat(
+                rng.integers(0, 1_000, (n_users, 2)), 2, axis=0
+            ).ravel(),
+        }
+    )
+    chunks = [df.iloc[i : i + 40_000] for i in range(0, len(df), 40_000)]
+    sketch = distinct_sketch(chunks, "author_id", "hashtag")
+    result = pd.concat(
+        [
+            filter_by_distinct_sketch(chunk, "author_id", sketch, min_distinct=5)
+            for chunk in chunks
+        ]
+    )
+    expected = filter_by_distinct(df, "author_id", "hashtag", min_distinct=5)
+
+    assert len(expected) == 0, "No user has 5 distinct hashtags"
+    assert len(result) == 0, f"Expected no rows kept, got {len(result)}"
@@ -154,3 +154,77 @@ def test_multipipeline_get_item(sample_pipeline):
 
     with pytest.raises(IndexError):
         pipe[2]
+
+
+def test_multipipeline_fit_shared_prefixes(sample_data):
+    """
+    Test that sharing prefixes gives the same results as fitting each pipeline.
+    """
+    pipelines = [
+        Pipeline(
+            steps=[
+                (
+                    "build_similarity_network",
+                    build_similarity_network,
+                    {"score": "jaccard", "symmetric": True},
+                ),
+                (
+                    "filter_edgelist",
+                    filter_edgelist,
+                    {"column_name": "similarity", "threshold": t, "comparison": ">="},
+                ),
+            ],
+            pipeline_id=f"threshold_{t}",
+            profile=True,
+        )
+        for t in [0.0, 0.3, 0.5]
+    ]
+    expected = MultiPipeline(pipelines=pipelines).fit(sample_data)
+    pipe = MultiPipeline(pipelines=pipelines, share_prefixes=True)
+    result = pipe.fit(sample_data)
+
+    assert len(result) == 3, f"Expected 3 results but got {len(result)}"
+    for res, exp in zip(result, expected):
+        pd.testing.assert_frame_equal(res, exp)
+    # the similarity network is computed once, the filters once per pipeline
+    assert (
+        list(pipe.metrics["step"])
+        == ["build_similarity_network"] + ["filter_edgelist"] * 3
+    ), f"Unexpected steps {list(pipe.metrics['step'])}"
+    assert (
+        pipe.metrics.iloc[0]["pipeline_id"]
+        == "threshold_0.0,threshold_0.3,threshold_0.5"
+    )
+
+
+def add_one_in_place(df, column):
+    df[column] = df[column] + 1
+    return df
+
+
+def test_multipipeline_fit_shared_in_place():
+    """
+    Test that sharing prefixes does not modify the input data with in-place steps,
+    and that only the steps of the profiled pipelines are profiled.
+    """
+    data = pd.DataFrame({"a": [1, 2]})
+    trunk = ("add", add_one_in_place, {"column": "a"})
+    pipelines = [
+        Pipeline(steps=[trunk, trunk], pipeline_id="profiled", profile=True),
+        Pipeline(
+            steps=[trunk, trunk, ("add_again", add_one_in_place, {"column": "a"})],
+            pipeline_id="not_profiled",
+        ),
+        Pipeline(steps=[trunk, ("other", add_one_in_place, {"column": "a"})]),
+    ]
+    pipe = MultiPipeline(pipelines=pipelines[:2], share_prefixes=True)
+    result = pipe.fit(data)
+
+    assert data["a"].tolist() == [1, 2], "The input data was modified"
+    assert [r["a"].tolist() for r in result] == [[3, 4], [4, 5]]
+    assert list(pipe.metrics["step"]) == ["add", "add"], "Unprofiled steps recorded"
+
+    pipe = MultiPipeline(pipelines=pipelines[1:], share_prefixes=True)
+    pipe.fit(data)
+    assert data["a"].tolist() == [1, 2], "The input data was modified"
+    assert pipe.metrics.empty, "No pipeline is profiled"
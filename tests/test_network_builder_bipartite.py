@@ -3,6 +3,7 @@ import pandas as pd
 import networkx as nx
 from benchmark_coordination.network_builder.bipartite import (
     build_bipartite_graph,
+    project_incidence_matrix,
     project_on_nodes,
 )
 
@@ -120,3 +121,23 @@ def test_project_on_nodes_weighted(bipartite_graph):
     assert (
         list(result.edges(data=True)) == expected_edges
     ), f"Expected {expected_edges}, got {result.edges(data=True)}"
+
+
+@pytest.mark.parametrize(
+    "weight, weighted",
+    [(None, False), ("weight", True)],
+)
+def test_project_incidence_matrix(bipartite_graph, weight, weighted):
+    """
+    Test that project_incidence_matrix matches project_on_nodes.
+    """
+    nodes = ["1", "2", "3"]
+    targets = ["A", "B", "C", "D"]
+    incidence = nx.bipartite.biadjacency_matrix(
+        bipartite_graph, row_order=nodes, column_order=targets, weight="weight"
+    )
+    result = project_incidence_matrix(incidence, weighted=weighted)
+    expected = project_on_nodes(bipartite=bipartite_graph, nodes=nodes, weight=weight)
+    expected = nx.to_numpy_array(expected, nodelist=nodes, weight="weight")
+
+    assert (result.toarray() == expected).all(), f"Expected {expected}, got {result}"
@@ -0,0 +1,159 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_coordination.network_builder import coaction
+from benchmark_coordination.network_builder.coaction import (
+    coaction_network,
+    coaction_network_streaming,
+)
+
+
+@pytest.fixture
+def retweets():
+    """
+    Users retweeting a few tweets over two days, sorted by time.
+    """
+    rng = np.random.default_rng(0)
+    n = 400
+    return pd.DataFrame(
+        {
+            "author_id": rng.integers(0, 30, n),
+            "trace": rng.integers(0, 20, n),
+            "timestamp": pd.Timestamp("2020-11-01")
+            + pd.to_timedelta(np.sort(rng.integers(0, 2 * 86_400, n)), unit="s"),
+        }
+    )
+
+
+def _reference(df, delta_t, count):
+    """
+    Count the co-actions of each pair of users by comparing all the pairs of events.
+    """
+    pairs = {}
+    for _, group in df.groupby("trace"):
+        events = list(zip(group["author_id"], group["timestamp"], group["trace"]))
+        for (a, t1, trace), (b, t2, _) in itertools.combinations(events, 2):
+            if a != b and abs((t2 - t1).total_seconds()) <= delta_t:
+                pairs.setdefault((min(a, b), max(a, b)), []).append(trace)
+    if count == "targets":
+        return {pair: len(set(traces)) for pair, traces in pairs.items()}
+    return {pair: len(traces) for pair, traces in pairs.items()}
+
+
+@pytest.mark.parametrize("count", ["targets", "events"])
+def test_coaction_network(retweets, count):
+    """
+    Test that coaction_network counts the co-actions within delta t of each pair of users.
+    """
+    result = coaction_network(retweets, delta_t=600, count=count)
+    expected = _reference(retweets, 600, count)
+
+    assert (result["source"] < result["target"]).all(), "Pairs should be ordered"
+    assert dict(zip(zip(result["source"], result["target"]), result["count"])) == (
+        expected
+    ), f"Different counts with count={count}"
+
+
+def test_coaction_network_asymmetric(retweets):
+    """
+    Test that coaction_network lists each pair in both directions if not symmetric.
+    """
+    symmetric = coaction_network(retweets, delta_t=600)
+    result = coaction_network(retweets, delta_t=600, symmetric=False)
+
+    assert len(result) == 2 * len(symmetric), f"Expected {2 * len(symmetric)} edges"
+    reverse = result.rename(columns={"source": "target", "target": "source"})
+    assert set(result.itertuples(index=False)) == set(
+        reverse[result.columns].itertuples(index=False)
+    ), "Each edge should have its reverse"
+
+
+def test_coaction_network_same_time():
+    """
+    Test that simultaneous actions co-occur with delta t of 0, and that the
+    actions of a user with themselves are ignored.
+    """
+    df = pd.DataFrame(
+        {
+            "author_id": ["a", "b", "a", "c"],
+            "trace": [1, 1, 1, 1],
+            "timestamp": pd.to_datetime(
+                ["2022-09-01 00:00:00"] * 3 + ["2022-09-01 00:00:01"]
+            ),
+        }
+    )
+    result = coaction_network(df, delta_t=0, count="events")
+
+    assert result.values.tolist() == [["a", "b", 2]], f"Unexpected result: {result}"
+
+
+@pytest.mark.parametrize("count", ["targets", "events"])
+def test_coaction_network_streaming(retweets, count, tmp_path):
+    """
+    Test that coaction_network_streaming gives the same network as coaction_network,
+    from chunks in memory and from parquet files.
+    """
+    expected = coaction_network(retweets, delta_t=600, count=count)
+    chunks = [retweets.iloc[i : i + 70] for i in range(0, len(retweets), 70)]
+    paths = []
+    for i, chunk in enumerate(chunks):
+        paths.append(str(tmp_path / f"retweets_{i}.parquet"))
+        chunk.to_parquet(paths[-1], index=False)
+
+    for source in (chunks, paths):
+        result = coaction_network_streaming(source, delta_t=600, count=count)
+        pd.testing.assert_frame_equal(result, expected)
+
+
+def test_coaction_network_streaming_order(retweets):
+    """
+    Test that coaction_network_streaming rejects chunks out of time order.
+    """
+    chunks = [retweets.iloc[200:], retweets.iloc[:200]]
+
+    with pytest.raises(AssertionError):
+        coaction_network_streaming(chunks, delta_t=600)
+
+
+def test_coaction_network_streaming_empty(retweets):
+    """
+    Test that coaction_network_streaming returns an empty edge list without chunks.
+    """
+    for chunks in ([], iter([]), [retweets.iloc[:0]]):
+        result = coaction_network_streaming(chunks, delta_t=600)
+        assert result.empty
+        assert list(result.columns) == ["source", "target", "count"]
+
+
+@pytest.mark.parametrize("count", ["targets", "events"])
+def test_coaction_network_streaming_memory(retweets, count, monkeypatch):
+    """
+    Test that coaction_network_streaming keeps the co-actions aggregated per pair
+    of users (and target), not the co-actions of all the chunks.
+    """
+    sizes = []
+    reduce_coactions = coaction._reduce_coactions
+
+    def recorded(keys, weights):
+        result = reduce_coactions(keys, weights)
+        sizes.append(len(result[0]))
+        return result
+
+    # few users and targets: many co-actions per pair
+    retweets = retweets.assign(
+        author_id=retweets["author_id"] % 5, trace=retweets["trace"] % 3
+    )
+    monkeypatch.setattr(coaction, "_reduce_coactions", recorded)
+    chunks = [retweets.iloc[i : i + 40] for i in range(0, len(retweets), 40)]
+    result = coaction_network_streaming(chunks, delta_t=3_600, count=count)
+    n_keys = 10 * 3 if count == "targets" else 10
+
+    n_coactions = coaction_network(retweets, delta_t=3_600, count="events")["count"]
+    assert n_coactions.sum() > 10 * n_keys, "Expected many co-actions per pair"
+    pd.testing.assert_frame_equal(
+        result, coaction_network(retweets, delta_t=3_600, count=count)
+    )
+    assert max(sizes) <= n_keys, f"The running table grew to {max(sizes)} rows"
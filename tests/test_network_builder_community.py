@@ -0,0 +1,107 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_coordination.network_builder.community import (
+    connected_components,
+    louvain_communities,
+    louvain_csr,
+    modularity,
+)
+
+
+@pytest.fixture
+def planted_partition():
+    """
+    A graph with 4 planted communities of 20 nodes.
+    """
+    graph = nx.planted_partition_graph(4, 20, 0.5, 0.01, seed=0)
+    return nx.to_pandas_edgelist(graph)
+
+
+def test_connected_components():
+    """
+    Test the connected_components function.
+    """
+    df = pd.DataFrame({"source": [1, 2, 4, 6], "target": [2, 3, 5, 6]})
+    result = connected_components(df)
+
+    assert list(result["node"]) == [1, 2, 4, 6, 3, 5], f"Got {list(result['node'])}"
+    assert list(result["community"]) == [
+        0,
+        0,
+        1,
+        2,
+        0,
+        1,
+    ], f"Got {list(result['community'])}"
+
+
+def test_louvain_communities(planted_partition):
+    """
+    Test the louvain_communities function on planted communities.
+    """
+    result = louvain_communities(planted_partition, seed=0)
+    planted = result["node"] // 20
+
+    assert set(result["community"]) == {0, 1, 2, 3}, "Expected 4 communities"
+    assert (
+        result.groupby("community")["node"].apply(lambda x: (x // 20).nunique()) == 1
+    ).all(), "Expected each community to be a planted one"
+    assert (
+        result.groupby(planted)["community"].nunique().eq(1).all()
+    ), "Expected each planted community to be found whole"
+
+
+@pytest.mark.parametrize(
+    "graph",
+    [nx.karate_club_graph(), nx.barabasi_albert_graph(500, 3, seed=0)],
+    ids=["karate_club", "barabasi_albert"],
+)
+def test_louvain_csr_modularity(graph):
+    """
+    Test that louvain_csr reaches the modularity of networkx.
+    """
+    adjacency = nx.to_scipy_sparse_array(graph, format="csr")
+    labels = louvain_csr(adjacency, seed=0)
+    expected = max(
+        nx.community.modularity(graph, nx.community.louvain_communities(graph, seed=s))
+        for s in range(3)
+    )
+
+    assert len(labels) == graph.number_of_nodes(), f"Got {len(labels)} labels"
+    assert modularity(adjacency, labels) > expected - 0.02, "Expected a good partition"
+
+
+def test_louvain_communities_weighted():
+    """
+    Test the louvain_communities function with edge weights.
+    """
+    df = pd.DataFrame(
+        {
+            "source": ["a", "a", "b", "b", "c"],
+            "target": ["b", "c", "c", "d", "d"],
+            "similarity": [10.0, 0.1, 0.1, 0.1, 10.0],
+        }
+    )
+    result = louvain_communities(df, weight_column="similarity", seed=0)
+    communities = dict(zip(result["node"], result["community"]))
+
+    assert communities["a"] == communities["b"], f"Got {communities}"
+    assert communities["c"] == communities["d"], f"Got {communities}"
+    assert communities["a"] != communities["c"], f"Got {communities}"
+
+
+def test_modularity():
+    """
+    Test the modularity function against networkx.
+    """
+    graph = nx.karate_club_graph()
+    adjacency = nx.to_scipy_sparse_array(graph, format="csr")
+    labels = np.array([graph.nodes[node]["club"] == "Mr. Hi" for node in graph])
+    expected = nx.community.modularity(
+        graph, [set(np.flatnonzero(labels)), set(np.flatnonzero(~labels))]
+    )
+
+    assert np.isclose(modularity(adjacency, labels), expected), "Expected same value"
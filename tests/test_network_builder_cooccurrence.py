@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_coordination.network_builder.cooccurrence import (
+    cooccurrence_similarity_network,
+)
+from benchmark_coordination.network_builder.similarity_net import (
+    build_similarity_network,
+)
+from benchmark_coordination.utils.id_registry import IdRegistry
+
+
+@pytest.fixture
+def co_retweets():
+    """
+    Users retweeting tweets, with repeated retweets.
+    """
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "author_id": rng.integers(0, 30, 200),
+            "trace": rng.zipf(1.5, 200) % 40,
+        }
+    )
+
+
+@pytest.mark.parametrize("score", ["cardinality", "jaccard"])
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_cooccurrence_similarity_network(co_retweets, score, symmetric):
+    """
+    Test that the inverted-index engine gives the nonzero edges of the pairwise one.
+    """
+    result = cooccurrence_similarity_network(co_retweets, score, symmetric=symmetric)
+    expected = build_similarity_network(co_retweets, score, symmetric=symmetric)
+    expected = expected[expected["similarity"] > 0].reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_cooccurrence_similarity_network_max_item_degree():
+    """
+    Test that items with too many users are skipped.
+    """
+    df = pd.DataFrame(
+        {
+            "author_id": [1, 2, 3, 1, 2],
+            "trace": ["viral", "viral", "viral", "niche", "niche"],
+        }
+    )
+    result = cooccurrence_similarity_network(df, max_item_degree=2)
+
+    assert result.values.tolist() == [[1, 2, 1]], f"Got {result.values.tolist()}"
+
+
+def test_build_similarity_network_inverted_index(co_retweets):
+    """
+    Test the inverted-index engine of build_similarity_network.
+    """
+    registry = IdRegistry(np.arange(30)[::-1])
+    result = build_similarity_network(
+        co_retweets, "cardinality", registry=registry, engine="inverted-index"
+    )
+
+    assert (result["similarity"] > 0).all(), "Expected nonzero edges only"
+    assert (
+        result["source_idx"] == registry.encode(result["source"])
+    ).all(), "Expected the registry indices"
+    with pytest.raises(ValueError):
+        build_similarity_network(co_retweets, "cosine", engine="inverted-index")
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_coordination.network_builder.exact_match import (
+    _sequence_groups,
+    exact_match_network,
+)
+from benchmark_coordination.network_builder.similarity_net import (
+    build_similarity_network,
+)
+
+
+@pytest.fixture
+def hashtag_sequences():
+    """
+    Users posting short sequences of hashtags over three days.
+    """
+    rng = np.random.default_rng(0)
+    n = 150
+    return pd.DataFrame(
+        {
+            "author_id": rng.integers(0, 25, n),
+            "trace": rng.choice(["#a", "#b", "#c"], n, p=[0.6, 0.3, 0.1]),
+            "timestamp": pd.Timestamp("2020-11-01")
+            + pd.to_timedelta(np.sort(rng.integers(0, 3 * 86_400, n)), unit="s"),
+        }
+    )
+
+
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_exact_match_network(hashtag_sequences, symmetric):
+    """
+    Test that the exact-match engine gives the edges of the pairwise boolean similarity,
+    window by window.
+    """
+    result = exact_match_network(
+        hashtag_sequences, window_size=1440, symmetric=symmetric
+    )
+    days = hashtag_sequences["timestamp"].dt.floor("1440min")
+    for day, window in hashtag_sequences.groupby(days):
+        expected = build_similarity_network(window, "boolean", symmetric=symmetric)
+        expected = expected[expected["similarity"] == 1]
+        edges = result[result["window"] == day]
+        assert sorted(zip(edges["source"], edges["target"])) == sorted(
+            zip(expected["source"], expected["target"])
+        ), f"Different edges in window {day}"
+
+
+def test_exact_match_network_groups():
+    """
+    Test the group-membership output of exact_match_network.
+    """
+    df = pd.DataFrame(
+        {
+            "author_id": [1, 1, 2, 2, 3, 3, 4, 5, 1],
+            "trace": ["#a", "#b", "#a", "#b", "#b", "#a", "#c", "#c", "#c"],
+            "window": [0, 0, 0, 0, 0, 0, 0, 0, 1],
+        }
+    )
+    result = exact_match_network(df, window_column="window", output="groups")
+
+    assert result.values.tolist() == [
+        [0, 1, 0],
+        [0, 2, 0],
+        [0, 4, 1],
+        [0, 5, 1],
+    ], f"Got {result.values.tolist()}"
+
+
+def test_build_similarity_network_exact_match():
+    """
+    Test the exact-match engine of build_similarity_network.
+    """
+    df = pd.DataFrame({"author_id": [1, 2, 3, 3], "trace": ["#a", "#a", "#a", "#a"]})
+    result = build_similarity_network(df, "boolean", engine="exact-match")
+
+    assert result.values.tolist() == [[1, 2, 1.0]], f"Got {result.values.tolist()}"
+    with pytest.raises(ValueError):
+        build_similarity_network(df, "jaccard", engine="exact-match")
+
+
+def test_build_similarity_network_exact_match_windows(hashtag_sequences):
+    """
+    Test that build_similarity_network passes the time windows to the exact-match engine,
+    the windows being aligned on the epoch.
+    """
+    result = build_similarity_network(
+        hashtag_sequences, "boolean", engine="exact-match", window_size=360
+    )
+    expected = exact_match_network(hashtag_sequences, window_size=360)
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert (
+        (result["window"] - pd.Timestamp("1970-01-01"))
+        .dt.total_seconds()
+        .mod(360 * 60)
+        .eq(0)
+        .all()
+    ), "Windows not aligned on the epoch"
+    with pytest.raises(ValueError):
+        build_similarity_network(hashtag_sequences, "boolean", window_size=360)
+
+
+def test_sequence_groups_integer_traces():
+    """
+    Test that the two hashes of the sequences are independent for integer traces.
+    """
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(
+        {"author_id": rng.integers(0, 50, 500), "trace": rng.integers(0, 10, 500)}
+    )
+    # authors 100 and 101 repeat the sequence of author 0
+    copy = df[df["author_id"] == 0]
+    df = pd.concat([df, copy.assign(author_id=100), copy.assign(author_id=101)])
+    sequences = _sequence_groups(df, ["author_id"], "trace")
+    assert len(sequences) == df["author_id"].nunique()
+    assert (sequences["hash_0"] != sequences["hash_1"]).all(), "Hashes not salted"
+    result = exact_match_network(df)
+    assert result[["source", "target"]].values.tolist() == [
+        [0, 100],
+        [0, 101],
+        [100, 101],
+    ]
+    assert exact_match_network(df[df["author_id"] < 100]).empty
@@ -0,0 +1,62 @@
+import pandas as pd
+from benchmark_coordination.network_builder.sparse_graph import (
+    build_incidence_matrix,
+    csr_to_edgelist,
+    edgelist_to_csr,
+)
+from benchmark_coordination.network_builder.similarity_net import (
+    build_similarity_network,
+)
+from benchmark_coordination.utils.id_registry import IdRegistry
+
+
+def test_edgelist_to_csr_roundtrip():
+    """
+    Test that an edge list converted to a matrix and back is unchanged.
+    """
+    registry = IdRegistry(["a", "b", "c", "d"])
+    df = pd.DataFrame(
+        {"source": ["a", "b", "a"], "target": ["b", "c", "c"], "weight": [1, 2, 3]}
+    )
+    matrix = edgelist_to_csr(df, registry, weight_column="weight")
+    assert matrix.shape == (4, 4), "The matrix should have one row per registered id"
+    assert (matrix.toarray() == matrix.toarray().T).all()
+
+    result = csr_to_edgelist(matrix, registry)
+    result = result.sort_values(["source", "target"]).reset_index(drop=True)
+    expected = df.sort_values(["source", "target"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_windows_share_registry():
+    """
+    Test that the networks of two windows encoded with the same registry can be stacked.
+    """
+    first = pd.DataFrame({"author_id": [1, 2, 1, 2], "trace": ["a", "a", "b", "c"]})
+    second = pd.DataFrame({"author_id": [3, 2, 3], "trace": ["x", "x", "y"]})
+    registry = IdRegistry.from_dataframe(pd.concat([first, second]), ["author_id"])
+
+    networks = [
+        build_similarity_network(window, "cardinality", registry=registry)
+        for window in [first, second]
+    ]
+    assert networks[1][["source_idx", "target_idx"]].values.tolist() == [[1, 2]]
+    matrices = [
+        edgelist_to_csr(
+            network, registry, "source", "target", weight_column="similarity"
+        )
+        for network in networks
+    ]
+    total = (matrices[0] + matrices[1]).toarray()
+    assert total[0, 1] == 1 and total[1, 2] == 1 and total[0, 2] == 0
+
+
+def test_build_incidence_matrix():
+    """
+    Test the build_incidence_matrix function.
+    """
+    df = pd.DataFrame({"user_id": [1, 1, 1, 2], "hashtag": ["#A", "#B", "#A", "#A"]})
+    users = IdRegistry([1, 2])
+    hashtags = IdRegistry(["#A", "#B"])
+    result = build_incidence_matrix(df, "user_id", "hashtag", users, hashtags)
+    assert result.toarray().tolist() == [[2, 1], [1, 0]]
@@ -1,10 +1,26 @@
+import networkx as nx
+import numpy as np
 import pytest
 import pandas as pd
 
+from benchmark_coordination.network_builder.sparse_graph import edgelist_to_csr
 from benchmark_coordination.network_builder.thresholding import (
+    compute_disparity,
+    compute_disparity_streaming,
+    compute_neighborhood_overlap,
+    disparity_csr,
+    disparity_filter,
+    estimate_percentile,
     filter_edgelist,
     filter_edgelist_by_percentile,
+    filter_edgelist_by_percentile_streaming,
+    neighborhood_overlap_filter,
+    select_top_fraction,
+    select_top_k_per_node,
+    sketch_edge_weights,
+    TopKAccumulator,
 )
+from benchmark_coordination.utils.id_registry import IdRegistry
 
 
 @pytest.mark.parametrize(
@@ -29,6 +45,19 @@ def test_filter_edgelist(threshold, comparison, expected_result):
     ), f"Expected {expected_result}, got {result}"
 
 
+def test_filter_edgelist_column_name_with_space():
+    """
+    Test the filter_edgelist function with a column name that is not an identifier.
+    """
+    df = pd.DataFrame({"edge weight": [1.0, 2.0, 3.0]}, index=[10, 20, 30])
+    result = filter_edgelist(df, "edge weight", 2.0, ">=")
+
+    assert list(result.index) == [
+        20,
+        30,
+    ], f"Expected [20, 30], got {list(result.index)}"
+
+
 # Test filter_edgelist_by_percentile function
 @pytest.mark.parametrize(
     "percentile, comparison, expected_result",
@@ -50,3 +79,279 @@ def test_filter_edgelist_by_percentile(percentile, comparison, expected_result):
     assert list(result["weight"]) == list(
         expected_result["weight"]
     ), f"Expected {expected_result}, got {result}"
+
+
+@pytest.fixture
+def edge_chunks(tmp_path):
+    """
+    Edges split in parquet files, with repeated weights.
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "source": rng.integers(0, 100, 20_000),
+            "target": rng.integers(0, 100, 20_000),
+            "weight": rng.integers(0, 1_000, 20_000) / 10,
+        }
+    )
+    paths = []
+    for i in range(4):
+        path = str(tmp_path / f"edges_{i}.parquet")
+        df.iloc[i * 5_000 : (i + 1) * 5_000].to_parquet(path, index=False)
+        paths.append(path)
+    return df, paths
+
+
+@pytest.mark.parametrize("percentile", [0, 10, 50, 99, 99.5, 100])
+def test_estimate_percentile(edge_chunks, percentile):
+    """
+    Test the estimate_percentile function.
+    """
+    df, paths = edge_chunks
+    expected = df["weight"].quantile(percentile / 100)
+    estimate = estimate_percentile(paths, "weight", percentile)
+    exact = estimate_percentile(
+        paths, "weight", percentile, exact=True, n_bins=8, max_values=100
+    )
+    rank = (df["weight"] <= estimate).mean()
+
+    assert exact == expected, f"Expected {expected}, got {exact}"
+    assert abs(rank - percentile / 100) < 0.02, f"Expected close ranks, got {rank}"
+
+
+def test_estimate_percentile_merged_sketch(edge_chunks):
+    """
+    Test the estimate_percentile function with a sketch merged from parts of the edges.
+    """
+    df, paths = edge_chunks
+    sketch = sketch_edge_weights(paths[:2], "weight")
+    sketch.merge(sketch_edge_weights(paths[2:], "weight"))
+    result = estimate_percentile(paths, "weight", 90, exact=True, sketch=sketch)
+
+    assert sketch.n == len(df), f"Expected {len(df)} values, got {sketch.n}"
+    assert result == df["weight"].quantile(0.9), f"Got {result}"
+
+
+@pytest.mark.parametrize("comparison", ["<", "<=", "==", ">=", ">"])
+def test_filter_edgelist_by_percentile_streaming(edge_chunks, comparison):
+    """
+    Test the filter_edgelist_by_percentile_streaming function.
+    """
+    df, paths = edge_chunks
+    expected = filter_edgelist_by_percentile(df, "weight", 75, comparison)
+    result = pd.concat(
+        filter_edgelist_by_percentile_streaming(
+            paths, "weight", 75, comparison, exact=True
+        ),
+        ignore_index=True,
+    )
+
+    assert list(result.columns) == list(df.columns), f"Got columns {result.columns}"
+    pd.testing.assert_frame_equal(result, expected.reset_index(drop=True))
+
+
+def test_filter_edgelist_by_percentile_streaming_callable():
+    """
+    Test the filter_edgelist_by_percentile_streaming function with a chunk factory.
+    """
+
+    def chunks():
+        return (pd.DataFrame({"weight": [i, i + 0.5]}) for i in range(10))
+
+    result = pd.concat(
+        filter_edgelist_by_percentile_streaming(chunks, "weight", 50, ">", exact=True)
+    )
+
+    assert list(result["weight"]) == [
+        5.0,
+        5.5,
+        6.0,
+        6.5,
+        7.0,
+        7.5,
+        8.0,
+        8.5,
+        9.0,
+        9.5,
+    ], f"Got {list(result['weight'])}"
+
+
+@pytest.mark.parametrize("largest", [True, False])
+def test_select_top_fraction(largest):
+    """
+    Test the select_top_fraction function.
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"source": range(1_000), "weight": rng.permutation(1_000)})
+    result = select_top_fraction(df, "weight", 0.005, largest=largest)
+    expected = (
+        df.nlargest(5, "weight") if largest else df.nsmallest(5, "weight")
+    ).sort_index()
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_select_top_fraction_ignores_missing_values():
+    """
+    Test the select_top_fraction function with missing values.
+    """
+    df = pd.DataFrame({"weight": [np.nan, 1.0, np.nan, 2.0]})
+    result = select_top_fraction(df, "weight", 0.75)
+
+    assert list(result["weight"]) == [1.0, 2.0], f"Got {list(result['weight'])}"
+
+
+def test_select_top_k_per_node():
+    """
+    Test the select_top_k_per_node function.
+    """
+    df = pd.DataFrame(
+        {
+            "source": ["a", "a", "a", "b", "c"],
+            "target": ["b", "c", "d", "c", "d"],
+            "weight": [5, 4, 1, 3, 2],
+        }
+    )
+    result = select_top_k_per_node(df, "weight", 1)
+
+    # a -> (a, b), b -> (a, b), c -> (a, c), d -> (c, d)
+    assert list(result.index) == [
+        0,
+        1,
+        4,
+    ], f"Expected [0, 1, 4], got {list(result.index)}"
+
+
+def test_top_k_accumulator():
+    """
+    Test the TopKAccumulator class.
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"source": range(10_000), "weight": rng.random(10_000)})
+    accumulator = TopKAccumulator("weight", k=50)
+    for start in range(0, len(df), 300):
+        accumulator.add(df.iloc[start : start + 300])
+        assert accumulator._n_buffered <= 100 + 300, "The buffer should stay bounded"
+    result = accumulator.result()
+    expected = df.nlargest(50, "weight").reset_index(drop=True)
+
+    assert accumulator.n_seen == len(
+        df
+    ), f"Expected {len(df)}, got {accumulator.n_seen}"
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_top_k_accumulator_empty():
+    """
+    Test that the TopKAccumulator class returns the columns of the edges without edges.
+    """
+    assert list(TopKAccumulator("weight", k=5).result().columns) == [
+        "source",
+        "target",
+        "weight",
+    ]
+    accumulator = TopKAccumulator("weight", k=5, columns=["window", "weight"])
+    assert list(accumulator.result().columns) == ["window", "weight"]
+    edges = pd.DataFrame({"source": [1], "target": [2], "weight": [0.5]})
+    accumulator = TopKAccumulator("weight", k=5)
+    accumulator.add(edges.iloc[:0])
+    pd.testing.assert_frame_equal(accumulator.result(), edges.iloc[:0])
+    assert pd.concat([accumulator.result(), edges])["weight"].tolist() == [0.5]
+
+
+@pytest.fixture
+def weighted_edges():
+    """
+    A random undirected weighted graph, with each edge listed once.
+    """
+    rng = np.random.default_rng(0)
+    pairs = {tuple(sorted(p)) for p in rng.integers(0, 50, (400, 2)) if p[0] != p[1]}
+    source, target = np.array(sorted(pairs)).T
+    return pd.DataFrame(
+        {"source": source, "target": target, "weight": rng.integers(1, 20, len(source))}
+    )
+
+
+def test_compute_disparity(weighted_edges):
+    """
+    Test the compute_disparity function against a loop over the edges.
+    """
+    df = weighted_edges
+    result = compute_disparity(df)
+    nodes = pd.concat([df["source"], df["target"]])
+    weights = pd.concat([df["weight"], df["weight"]])
+    strengths = weights.groupby(nodes.to_numpy()).sum()
+    degrees = nodes.value_counts()
+    for row in result.itertuples():
+        expected = min(
+            (1 - row.weight / strengths[node]) ** (degrees[node] - 1)
+            for node in (row.source, row.target)
+        )
+        assert np.isclose(row.disparity, expected), f"Expected {expected}, got {row}"
+
+
+def test_disparity_filter(weighted_edges):
+    """
+    Test the disparity_filter function.
+    """
+    result = disparity_filter(weighted_edges, alpha=0.2)
+
+    assert 0 < len(result) < len(weighted_edges), f"Got {len(result)} edges"
+    assert (result["disparity"] < 0.2).all(), "Expected significant edges only"
+
+
+def test_disparity_csr(weighted_edges):
+    """
+    Test the disparity_csr function.
+    """
+    registry = IdRegistry(np.arange(50))
+    matrix = edgelist_to_csr(weighted_edges, registry, weight_column="weight")
+    result = disparity_csr(matrix)
+    expected = compute_disparity(weighted_edges)["disparity"].to_numpy()
+    rows = registry.encode(weighted_edges["source"])
+    cols = registry.encode(weighted_edges["target"])
+
+    assert result.nnz == matrix.nnz, f"Expected {matrix.nnz} entries, got {result.nnz}"
+    np.testing.assert_allclose(np.asarray(result[rows, cols]).ravel(), expected)
+    np.testing.assert_allclose(np.asarray(result[cols, rows]).ravel(), expected)
+
+
+def test_compute_disparity_streaming(weighted_edges):
+    """
+    Test the compute_disparity_streaming function.
+    """
+    df = weighted_edges
+
+    def chunks():
+        return (df.iloc[start : start + 70] for start in range(0, len(df), 70))
+
+    result = pd.concat(compute_disparity_streaming(chunks))
+
+    pd.testing.assert_frame_equal(result, compute_disparity(df))
+
+
+@pytest.mark.parametrize("chunk_size", [7, 100_000])
+def test_compute_neighborhood_overlap(weighted_edges, chunk_size):
+    """
+    Test the compute_neighborhood_overlap function against networkx.
+    """
+    df = weighted_edges
+    result = compute_neighborhood_overlap(df, chunk_size=chunk_size)
+    graph = nx.from_pandas_edgelist(df)
+    for row in result.itertuples():
+        u, v = set(graph[row.source]), set(graph[row.target])
+        union = len((u | v) - {row.source, row.target})
+        expected = len(u & v) / union if union else 0.0
+        assert np.isclose(row.overlap, expected), f"Expected {expected}, got {row}"
+
+
+def test_neighborhood_overlap_filter():
+    """
+    Test the neighborhood_overlap_filter function.
+    """
+    df = pd.DataFrame(
+        {"source": ["a", "a", "b", "c", "c"], "target": ["b", "c", "c", "d", "c"]}
+    )
+    result = neighborhood_overlap_filter(df, threshold=0.5)
+
+    assert list(result.index) == [0, 1, 2], f"Got {list(result.index)}"
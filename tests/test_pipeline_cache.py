@@ -0,0 +1,216 @@
+import threading
+from functools import partial
+
+import numpy as np
+import pytest
+import pandas as pd
+from benchmark_coordination.pipeline.pipeline import Pipeline
+from benchmark_coordination.pipeline.cache import (
+    StepCache,
+    fingerprint_dataframe,
+    fingerprint_step,
+)
+from benchmark_coordination.network_builder.similarity_net import (
+    build_similarity_network,
+)
+from benchmark_coordination.network_builder.thresholding import filter_edgelist
+
+CALLS = {"build_similarity_network": 0}
+
+
+def counted_similarity_network(df, **kwargs):
+    CALLS["build_similarity_network"] += 1
+    return build_similarity_network(df, **kwargs)
+
+
+def _identity(df, **kwargs):
+    return df
+
+
+@pytest.fixture
+def sample_data():
+    return pd.DataFrame(
+        {
+            "author_id": [1, 2, 3, 4, 5, 1, 2, 3, 4, 5],
+            "trace": ["a", "b", "c", "b", "c", "d", "e", "f", "d", "e"],
+        }
+    )
+
+
+def make_pipeline(cache, threshold):
+    return Pipeline(
+        steps=[
+            (
+                "build_similarity_network",
+                counted_similarity_network,
+                {"score": "jaccard", "symmetric": True},
+            ),
+            (
+                "filter_edgelist",
+                filter_edgelist,
+                {
+                    "column_name": "similarity",
+                    "threshold": threshold,
+                    "comparison": ">=",
+                },
+            ),
+        ],
+        cache=cache,
+    )
+
+
+def test_fingerprint_dataframe(sample_data):
+    """
+    Test that the fingerprint of a dataframe depends on its content.
+    """
+    assert fingerprint_dataframe(sample_data) == fingerprint_dataframe(
+        sample_data.copy()
+    ), "Equal dataframes should have the same fingerprint"
+    changed = sample_data.copy()
+    changed.loc[0, "trace"] = "z"
+    assert fingerprint_dataframe(sample_data) != fingerprint_dataframe(
+        changed
+    ), "Different dataframes should have different fingerprints"
+    with_lists = pd.DataFrame({"tokens": [["a", "b"], ["c"]]})
+    assert isinstance(fingerprint_dataframe(with_lists), str)
+
+
+def test_fingerprint_step():
+    """
+    Test that the fingerprint of a step depends on the function and the params.
+    """
+    assert fingerprint_step(filter_edgelist, {"threshold": 1}) == fingerprint_step(
+        filter_edgelist, {"threshold": 1}
+    )
+    assert fingerprint_step(filter_edgelist, {"threshold": 1}) != fingerprint_step(
+        filter_edgelist, {"threshold": 2}
+    )
+    assert fingerprint_step(filter_edgelist, {}) != fingerprint_step(
+        build_similarity_network, {}
+    )
+
+
+def test_fingerprint_step_content():
+    """
+    Test that the params are fingerprinted by content: large arrays and series that
+    differ in one element, and functions with the same code, are told apart correctly.
+    """
+    values = np.arange(5_000, dtype=float)
+    changed = values.copy()
+    changed[2_500] = -1
+
+    assert fingerprint_step(filter_edgelist, {"v": values}) != fingerprint_step(
+        filter_edgelist, {"v": changed}
+    ), "Arrays differing in one element should have different fingerprints"
+    assert fingerprint_step(filter_edgelist, {"v": pd.Series(values)}) != (
+        fingerprint_step(filter_edgelist, {"v": pd.Series(changed)})
+    ), "Series differing in one element should have different fingerprints"
+    assert fingerprint_step(filter_edgelist, {"v": values}) == fingerprint_step(
+        filter_edgelist, {"v": values.copy()}
+    ), "Equal arrays should have the same fingerprint"
+    assert fingerprint_step(
+        partial(filter_edgelist, threshold=1), {"key": len}
+    ) == fingerprint_step(partial(filter_edgelist, threshold=1), {"key": len})
+    assert fingerprint_step(
+        partial(filter_edgelist, threshold=1), {}
+    ) != fingerprint_step(partial(filter_edgelist, threshold=2), {})
+
+
+def test_fingerprint_step_uncacheable(sample_data, tmp_path):
+    """
+    Test that a step with a param that cannot be hashed by content is not cached.
+    """
+    lock = threading.Lock()
+    assert fingerprint_step(filter_edgelist, {"lock": lock}) is None
+
+    cache = StepCache(str(tmp_path))
+    pipe = Pipeline(
+        steps=[
+            ("identity", _identity, {}),
+            ("uncacheable", _identity, {"lock": lock}),
+            ("identity_again", _identity, {}),
+        ],
+        cache=cache,
+    )
+    pd.testing.assert_frame_equal(pipe.fit(sample_data), sample_data)
+    assert len(cache) == 1, f"Expected only the first step cached, got {len(cache)}"
+
+
+def test_pipeline_resumes_from_cache(sample_data, tmp_path):
+    """
+    Test that a pipeline resumes from the deepest cached prefix.
+    """
+    cache = StepCache(str(tmp_path))
+    CALLS["build_similarity_network"] = 0
+
+    first = make_pipeline(cache, 0.3).fit(sample_data.copy())
+    assert CALLS["build_similarity_network"] == 1
+    assert len(cache) == 2, f"Expected 2 cached entries but got {len(cache)}"
+
+    # same pipeline: the full output is read from the cache
+    second = make_pipeline(cache, 0.3).fit(sample_data.copy())
+    assert CALLS["build_similarity_network"] == 1
+    pd.testing.assert_frame_equal(first, second)
+
+    # only the last step changed: the similarity network is read from the cache
+    third = make_pipeline(cache, 0.5).fit(sample_data.copy())
+    assert CALLS["build_similarity_network"] == 1
+    assert len(third) == 0, f"Expected 0 rows but got {len(third)}"
+
+    # different input data: everything is recomputed
+    make_pipeline(cache, 0.3).fit(sample_data.iloc[:6].copy())
+    assert CALLS["build_similarity_network"] == 2
+
+
+def test_step_cache_lru_eviction(tmp_path):
+    """
+    Test that the least recently used entries are evicted first.
+    """
+    df = pd.DataFrame({"a": range(1000)})
+    cache = StepCache(str(tmp_path))
+    cache.put("first", df)
+    entry_size = cache.size_bytes
+    cache.max_size_bytes = 2 * entry_size
+    cache.put("second", df)
+    assert cache.get("first") is not None  # "second" is now the least recently used
+    cache.put("third", df)
+    assert "first" in cache, "Recently used entry should not be evicted"
+    assert "second" not in cache, "Least recently used entry should be evicted"
+    assert "third" in cache, "New entry should not be evicted"
+    assert cache.size_bytes <= cache.max_size_bytes
+
+
+def test_step_cache_unserializable(tmp_path):
+    """
+    Test that dataframes that cannot be stored as parquet are not cached.
+    """
+    cache = StepCache(str(tmp_path))
+    df = pd.DataFrame({"a": [1, "b"]})
+    assert cache.put("mixed", df) is False
+    assert "mixed" not in cache
+    assert len(cache) == 0
+
+
+def _split_text(df, column):
+    return df.assign(**{column: df[column].str.split()})
+
+
+def test_pipeline_cache_lists(tmp_path):
+    """
+    Test that a cached run returns the same lists as an uncached run,
+    and that the lists of tuples (e.g. n-grams), which are not restored,
+    are not cached.
+    """
+    df = pd.DataFrame({"author_id": [1, 2, 3], "text": ["a b", "", None]})
+    steps = [("split", _split_text, {"column": "text"})]
+    expected = Pipeline(steps=steps).fit(df.copy())
+    cache = StepCache(str(tmp_path))
+    Pipeline(steps=steps, cache=cache).fit(df.copy())
+    assert len(cache) == 1
+    result = Pipeline(steps=steps, cache=cache).fit(df.copy())
+
+    assert result.equals(expected), "The cached lists should be restored"
+    assert result["text"].tolist() == [["a", "b"], [], None]
+    ngrams = pd.DataFrame({"trace": [[("a", "b")], []]})
+    assert cache.put("ngrams", ngrams) is False
+    assert cache.put("tuples", pd.DataFrame({"trace": [("a", "b")]})) is False
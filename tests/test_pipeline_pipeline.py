@@ -156,3 +156,36 @@ def test_pipeline_repr():
     assert repr(pipe).startswith(
         "Pipeline(steps=[('build_similarity_network', <function build_similarity_network at 0x"
     ), f"Unexpected repr: {repr(pipe)}"
+
+
+def test_pipeline_fit_chunks(sample_data):
+    """
+    Test that fit_chunks applies row-local steps per chunk and gives the same result as fit.
+    """
+    from benchmark_coordination.utils.step_markers import row_local
+
+    @row_local
+    def drop_trace(df, trace):
+        return df[df["trace"] != trace]
+
+    pipe = Pipeline(
+        steps=[
+            ("drop_trace", drop_trace, {"trace": "f"}),
+            (
+                "build_similarity_network",
+                build_similarity_network,
+                {"score": "jaccard", "symmetric": True},
+            ),
+        ]
+    )
+    chunks = [sample_data.iloc[:4], sample_data.iloc[4:]]
+    result = pipe.fit_chunks(chunks)
+    expected = pipe.fit(sample_data)
+    pd.testing.assert_frame_equal(result, expected)
+
+    with pytest.raises(ValueError):
+        list(pipe.transform_chunks(chunks))
+
+    row_local_pipe = Pipeline(steps=[("drop_trace", drop_trace, {"trace": "f"})])
+    transformed = list(row_local_pipe.transform_chunks(chunks))
+    assert [len(chunk) for chunk in transformed] == [4, 5]
@@ -0,0 +1,98 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from benchmark_coordination.pipeline.pipeline import Pipeline
+from benchmark_coordination.pipeline.prefix_tree import build_prefix_tree, fit_subtree
+
+CALLS = {"add_one": 0}
+
+
+def add_one(df, column):
+    CALLS["add_one"] += 1
+    df[column] = df[column] + 1
+    return df
+
+
+def multiply(df, column, factor):
+    df[column] = df[column] * factor
+    return df
+
+
+def make_pipelines():
+    return [
+        Pipeline(
+            steps=[
+                ("add", add_one, {"column": "a"}),
+                ("double", multiply, {"column": "a", "factor": 2}),
+            ],
+            pipeline_id="double",
+        ),
+        Pipeline(
+            steps=[
+                ("increment", add_one, {"column": "a"}),
+                ("triple", multiply, {"column": "a", "factor": 3}),
+            ],
+            pipeline_id="triple",
+        ),
+        Pipeline(steps=[("add", add_one, {"column": "a"})], pipeline_id="add"),
+    ]
+
+
+def test_build_prefix_tree():
+    """
+    Test that steps with the same function and params are merged, whatever their name.
+    """
+    root = build_prefix_tree(make_pipelines())
+    assert root.n_steps() == 3, f"Expected 3 unique steps but got {root.n_steps()}"
+    assert len(root.children) == 1
+    shared = next(iter(root.children.values()))
+    assert shared.shared_by == ["double", "triple", "add"]
+    assert shared.pipeline_ids == ["add"]
+    assert len(shared.children) == 2
+
+
+def test_fit_subtree():
+    """
+    Test that shared steps run once and that in-place steps do not leak across branches.
+    """
+    CALLS["add_one"] = 0
+    data = pd.DataFrame({"a": [1, 2]})
+    results, records = fit_subtree(build_prefix_tree(make_pipelines()), data)
+    results = dict(results)
+
+    assert CALLS["add_one"] == 1, f"Expected 1 call but got {CALLS['add_one']}"
+    assert records == []
+    assert results["add"]["a"].tolist() == [2, 3]
+    assert results["double"]["a"].tolist() == [4, 6]
+    assert results["triple"]["a"].tolist() == [6, 9]
+
+
+def test_fit_subtree_profile():
+    """
+    Test that the metrics of a shared step are recorded once.
+    """
+    data = pd.DataFrame({"a": [1, 2]})
+    _, records = fit_subtree(build_prefix_tree(make_pipelines()), data, profile=True)
+    assert [r["step"] for r in records] == ["add", "double", "triple"]
+    assert records[0]["pipeline_id"] == "double,triple,add"
+    assert [r["step_index"] for r in records] == [0, 1, 1]
+
+
+def test_build_prefix_tree_params():
+    """
+    Test that steps whose params differ, or cannot be compared, are not merged.
+    """
+    values = np.arange(5_000)
+    changed = values.copy()
+    changed[2_500] = -1
+    lock = threading.Lock()
+    pipelines = [
+        Pipeline(steps=[("multiply", multiply, {"column": "a", "factor": values})]),
+        Pipeline(steps=[("multiply", multiply, {"column": "a", "factor": changed})]),
+        Pipeline(steps=[("add", add_one, {"column": "a", "lock": lock})]),
+        Pipeline(steps=[("add", add_one, {"column": "a", "lock": lock})]),
+    ]
+    root = build_prefix_tree(pipelines)
+
+    assert root.n_steps() == 4, f"Expected 4 unique steps but got {root.n_steps()}"
@@ -0,0 +1,121 @@
+import json
+import pytest
+import pandas as pd
+from benchmark_coordination.pipeline.pipeline import Pipeline
+from benchmark_coordination.pipeline.multipipe import MultiPipeline
+from benchmark_coordination.pipeline.profiling import (
+    METRICS_COLUMNS,
+    StepProfiler,
+    export_metrics,
+    summarize_metrics,
+)
+from benchmark_coordination.network_builder.similarity_net import (
+    build_similarity_network,
+)
+from benchmark_coordination.network_builder.thresholding import filter_edgelist
+
+
+@pytest.fixture
+def sample_data():
+    return pd.DataFrame(
+        {
+            "author_id": [1, 2, 3, 4, 5, 1, 2, 3, 4, 5],
+            "trace": ["a", "b", "c", "b", "c", "d", "e", "f", "d", "e"],
+        }
+    )
+
+
+def make_pipeline(pipeline_id, profile=True):
+    return Pipeline(
+        steps=[
+            (
+                "build_similarity_network",
+                build_similarity_network,
+                {"score": "jaccard", "symmetric": True},
+            ),
+            (
+                "filter_edgelist",
+                filter_edgelist,
+                {"column_name": "similarity", "threshold": 0.3, "comparison": ">="},
+            ),
+        ],
+        pipeline_id=pipeline_id,
+        profile=profile,
+    )
+
+
+def test_step_profiler():
+    """
+    Test that the StepProfiler records the shape of the input and the output.
+    """
+    profiler = StepProfiler("pipe")
+    data = pd.DataFrame({"a": [1, 1, 2]})
+    result = profiler.run(3, "dedup", pd.DataFrame.drop_duplicates, data, {})
+    metrics = profiler.to_dataframe()
+
+    assert len(result) == 2
+    assert list(metrics.columns) == METRICS_COLUMNS
+    record = metrics.iloc[0]
+    assert record["step_index"] == 3
+    assert (record["rows_in"], record["rows_out"]) == (3, 2)
+    assert (record["columns_in"], record["columns_out"]) == (1, 1)
+    assert record["wall_time_s"] >= 0
+    assert record["cpu_time_s"] >= 0
+    assert record["peak_memory_bytes"] >= 0
+    assert record["memory_in_bytes"] > 0
+
+
+def test_pipeline_metrics(sample_data):
+    """
+    Test that a profiled Pipeline records one row of metrics per step.
+    """
+    pipe = make_pipeline("pipe")
+    result = pipe.fit(sample_data)
+    metrics = pipe.metrics
+
+    assert list(metrics["step"]) == ["build_similarity_network", "filter_edgelist"]
+    assert (metrics["pipeline_id"] == "pipe").all()
+    assert metrics.iloc[0]["rows_in"] == len(sample_data)
+    assert metrics.iloc[1]["rows_out"] == len(result)
+
+
+def test_pipeline_metrics_disabled(sample_data):
+    """
+    Test that a Pipeline without profiling has no metrics.
+    """
+    pipe = make_pipeline("pipe", profile=False)
+    pipe.fit(sample_data)
+    assert pipe.metrics.empty
+    assert list(pipe.metrics.columns) == METRICS_COLUMNS
+
+
+def test_multipipeline_metrics(sample_data, tmp_path):
+    """
+    Test that the metrics of the workers are aggregated by the MultiPipeline.
+    """
+    pipe = MultiPipeline(pipelines=[make_pipeline("a"), make_pipeline("b")])
+    pipe.fit(sample_data)
+
+    assert len(pipe.metrics) == 4, f"Expected 4 rows but got {len(pipe.metrics)}"
+    assert sorted(pipe.metrics["pipeline_id"].unique()) == ["a", "b"]
+
+    summary = summarize_metrics(pipe.metrics)
+    assert sorted(summary.index) == ["a", "b"]
+    assert (summary["n_steps"] == 2).all()
+
+    json_path = str(tmp_path / "metrics.json")
+    pipe.export_metrics(json_path)
+    with open(json_path) as f:
+        assert len(json.load(f)) == 4
+
+    parquet_path = str(tmp_path / "metrics.parquet")
+    pipe.export_metrics(parquet_path)
+    assert len(pd.read_parquet(parquet_path)) == 4
+
+
+def test_export_metrics_invalid_extension(tmp_path):
+    """
+    Test that export_metrics raises a ValueError for unsupported file types.
+    """
+    with pytest.raises(ValueError):
+        export_metrics(pd.DataFrame(columns=METRICS_COLUMNS), str(tmp_path / "m.csv"))
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+
+from benchmark_coordination.network_builder.similarity_net import (
+    build_similarity_network,
+)
+from benchmark_coordination.similarity_calculator.cosine import (
+    CosineEngine,
+    build_vector_matrix,
+)
+from benchmark_coordination.similarity_calculator.scores import cosine_similarity
+from benchmark_coordination.utils.id_registry import IdRegistry
+
+
+@pytest.fixture
+def ragged_vectors():
+    """
+    Activity vectors of different lengths.
+    """
+    rng = np.random.default_rng(0)
+    return [rng.poisson(1.0, rng.integers(5, 30)) + 0.5 for _ in range(25)]
+
+
+def test_build_vector_matrix():
+    """
+    Test the build_vector_matrix function.
+    """
+    vectors = [[1, 2], [3, 4, 5]]
+
+    assert build_vector_matrix(vectors, coalesce="cut").tolist() == [[1, 2], [3, 4]]
+    assert build_vector_matrix(vectors, dtype=np.float32).dtype == np.float32
+    with pytest.raises(ValueError):
+        build_vector_matrix(vectors, coalesce="raise")
+
+
+@pytest.mark.parametrize("dtype, tolerance", [(np.float64, 1e-12), (np.float32, 1e-5)])
+def test_cosine_engine(ragged_vectors, dtype, tolerance):
+    """
+    Test that CosineEngine matches cosine_similarity with padding.
+    """
+    engine = CosineEngine(ragged_vectors, dtype=dtype)
+    expected = np.array(
+        [
+            [cosine_similarity(v1, v2, coalesce="pad") for v2 in ragged_vectors]
+            for v1 in ragged_vectors
+        ]
+    )
+
+    assert engine.matrix.dtype == dtype, f"Expected {dtype}, got {engine.matrix.dtype}"
+    np.testing.assert_allclose(engine.block(), expected, atol=tolerance)
+    np.testing.assert_allclose(engine.one_vs_many(3), expected[3], atol=tolerance)
+    np.testing.assert_allclose(
+        engine.block([1, 2], slice(5, 10)), expected[[1, 2], 5:10], atol=tolerance
+    )
+    assert engine.similarity(0, 1) == pytest.approx(expected[0, 1], abs=tolerance)
+
+
+def test_cosine_engine_sparse(ragged_vectors):
+    """
+    Test that CosineEngine gives the same similarities for sparse vectors,
+    and 0 for all-zero vectors.
+    """
+    matrix = build_vector_matrix(ragged_vectors)
+    matrix[4] = 0
+    dense = CosineEngine(matrix)
+    sparse = CosineEngine(sp.csr_matrix(matrix))
+
+    np.testing.assert_allclose(sparse.block(), dense.block())
+    assert (dense.block()[4] == 0).all(), "All-zero vectors should have similarity 0"
+
+
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_cosine_engine_network(ragged_vectors, symmetric):
+    """
+    Test the network method of CosineEngine.
+    """
+    authors = [f"user_{i:02d}" for i in range(len(ragged_vectors))]
+    engine = CosineEngine(ragged_vectors, authors=authors)
+    similarities = (engine.block() + 1) / 2
+    result = engine.network(
+        threshold=0.9, symmetric=symmetric, return_normalized=True, block_size=7
+    )
+    rows, columns = np.nonzero(similarities >= 0.9)
+    keep = columns > rows if symmetric else columns != rows
+
+    assert sorted(zip(result["source"], result["target"])) == [
+        (authors[i], authors[j]) for i, j in zip(rows[keep], columns[keep])
+    ]
+    assert (result["similarity"] >= 0.9).all(), "Pairs below the threshold"
+
+
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_build_similarity_network_cosine(symmetric):
+    """
+    Test that build_similarity_network scores the pairs of users with the cosine
+    similarity of their traces, as comparing them pair by pair.
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {"author_id": np.repeat(["c", "a", "d", "b"], 6), "trace": rng.random(24)}
+    )
+    users = sorted(df["author_id"].unique())
+    expected = pd.DataFrame(
+        [
+            {
+                "source": u1,
+                "target": u2,
+                "similarity": cosine_similarity(
+                    df[df["author_id"] == u1]["trace"],
+                    df[df["author_id"] == u2]["trace"],
+                ),
+            }
+            for u1 in users
+            for u2 in users
+            if u1 != u2 and not (symmetric and u1 > u2)
+        ]
+    )
+    result = build_similarity_network(df, "cosine", symmetric=symmetric)
+
+    pd.testing.assert_frame_equal(result, expected)
+    with pytest.raises(ValueError):
+        build_similarity_network(df.iloc[:-1], "cosine")
+
+
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_build_similarity_network_cosine_registry(symmetric):
+    """
+    Test that build_similarity_network lists the cosine pairs in the order
+    of the registry, with source < target if symmetric.
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {"author_id": np.repeat(["c", "a", "d", "b"], 6), "trace": rng.random(24)}
+    )
+    registry = IdRegistry(["d", "b", "c", "a"])
+    users = list(registry.labels)
+    expected = [
+        (u1, u2)
+        for u1 in users
+        for u2 in users
+        if u1 != u2 and not (symmetric and u1 > u2)
+    ]
+    result = build_similarity_network(
+        df, "cosine", symmetric=symmetric, registry=registry
+    )
+
+    assert list(zip(result["source"], result["target"])) == expected
+    assert (result["source_idx"] == registry.encode(result["source"])).all()
+
+
+def test_build_similarity_network_cosine_single_user():
+    """
+    Test that a single user gives an empty network, even with an all-zero trace.
+    """
+    df = pd.DataFrame({"author_id": ["a", "a"], "trace": [0.0, 0.0]})
+    result = build_similarity_network(df, "cosine")
+
+    assert result.empty, f"Expected no edges, got {result}"
+    with pytest.raises(AssertionError):
+        build_similarity_network(
+            pd.concat([df, df.assign(author_id="b", trace=1.0)]), "cosine"
+        )
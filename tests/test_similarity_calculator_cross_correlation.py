@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp  # type: ignore
+
+from benchmark_coordination.similarity_calculator.calculator import (
+    SimilarityCalculator,
+)
+from benchmark_coordination.similarity_calculator.cross_correlation import (
+    cross_correlation_network,
+    max_cross_correlation,
+)
+
+
+def correlation_at(x, y, lag):
+    """
+    The normalized cross-correlation of x and y, with y shifted back by lag.
+    """
+    shifted = np.zeros_like(y)
+    if lag >= 0:
+        shifted[: len(y) - lag] = y[lag:]
+    else:
+        shifted[-lag:] = y[:lag]
+    return x @ shifted / (np.linalg.norm(x) * np.linalg.norm(y))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+def test_max_cross_correlation(chunk_size):
+    """
+    Test the max_cross_correlation function against shifting the vectors.
+    """
+    rng = np.random.default_rng(0)
+    matrix = rng.poisson(0.5, (12, 50)).astype(float)
+    pairs = np.column_stack(np.triu_indices(12, k=1))
+    values, lags = max_cross_correlation(
+        sp.csr_matrix(matrix), pairs, max_lag=5, chunk_size=chunk_size
+    )
+    for (i, j), value, lag in zip(pairs, values, lags):
+        expected = max(correlation_at(matrix[i], matrix[j], k) for k in range(-5, 6))
+        assert np.isclose(value, expected), f"Pair {(i, j)}: {value} != {expected}"
+        assert np.isclose(
+            correlation_at(matrix[i], matrix[j], lag), expected
+        ), f"Pair {(i, j)}: the maximum is not reached at lag {lag}"
+
+
+def test_max_cross_correlation_lagged_copy():
+    """
+    Test that a delayed copy of an activity vector is found with its lag.
+    """
+    rng = np.random.default_rng(1)
+    x = np.r_[rng.poisson(1.0, 90), np.zeros(10)]
+    matrix = np.vstack([x, np.roll(x, 4), rng.poisson(1.0, 100)])
+    values, lags = max_cross_correlation(matrix, np.array([[0, 1], [1, 0]]), 6)
+
+    assert np.allclose(values, 1.0), f"Expected 1.0, got {values}"
+    assert lags.tolist() == [4, -4], f"Expected lags [4, -4], got {lags.tolist()}"
+
+
+def test_cross_correlation_network():
+    """
+    Test the cross_correlation_network function and the similarity calculator.
+    """
+    matrix = np.array([[1, 0, 2, 0, 0], [0, 1, 0, 2, 0], [0, 0, 0, 0, 0]])
+    result = cross_correlation_network(matrix, pd.Index(["a", "b", "c"]), max_lag=2)
+    calculator = SimilarityCalculator("cross-correlation")
+
+    assert result[["source", "target"]].values.tolist() == [
+        ["a", "b"],
+        ["a", "c"],
+        ["b", "c"],
+    ], f"Got {result[['source', 'target']].values.tolist()}"
+    assert np.allclose(result["similarity"], [1.0, 0.0, 0.0]), "Unexpected scores"
+    assert np.isclose(
+        calculator.calculate_similarity(matrix[0], matrix[1], max_lag=2), 1.0
+    ), "Expected the same score from the calculator"
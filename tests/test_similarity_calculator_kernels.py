@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+
+from benchmark_coordination.network_builder.similarity_net import (
+    build_similarity_network,
+)
+from benchmark_coordination.similarity_calculator.calculator import SimilarityCalculator
+from benchmark_coordination.similarity_calculator.kernels import (
+    _popcount64,
+    bitmap_intersection_sizes,
+    encode_traces,
+    intersection_size,
+    intersection_sizes,
+    pack_binary,
+    pack_bitmaps,
+    packed_jaccard,
+    packed_jaccard_block,
+    packed_jaccard_one_vs_many,
+    popcount,
+)
+from benchmark_coordination.similarity_calculator.scores import (
+    cardinality_similarity,
+    jaccard_binary_similarity,
+    jaccard_similarity,
+)
+
+
+def _traces(n_users, n_items, n_rows, seed=0):
+    """
+    Random traces of users among n_items items.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "author_id": rng.integers(0, n_users, n_rows),
+            "trace": rng.integers(0, n_items, n_rows).astype(str),
+        }
+    )
+
+
+def test_encode_traces():
+    """
+    Test that encode_traces gives the sorted set of codes of each user.
+    """
+    df = _traces(20, 50, 300)
+    users, indptr, indices = encode_traces(df)
+    codes = pd.factorize(df["trace"])[0]
+
+    assert users.tolist() == sorted(df["author_id"].unique())
+    for i, user in enumerate(users):
+        expected = np.unique(codes[df["author_id"].to_numpy() == user])
+        result = indices[indptr[i] : indptr[i + 1]]
+        assert np.array_equal(result, expected), f"Wrong set for user {user}"
+
+
+def test_intersection_kernels():
+    """
+    Test that the sorted-array and bitmap kernels count the common elements of sets.
+    """
+    df = _traces(30, 200, 1_000)
+    users, indptr, indices = encode_traces(df)
+    sets = [set(indices[indptr[i] : indptr[i + 1]]) for i in range(len(users))]
+    bitmaps = pack_bitmaps(indptr, indices, int(indices.max()) + 1)
+
+    assert popcount(bitmaps).tolist() == [len(s) for s in sets]
+    for i in range(len(users)):
+        query = indices[indptr[i] : indptr[i + 1]]
+        expected = [len(sets[i] & other) for other in sets]
+        assert intersection_sizes(query, indptr, indices).tolist() == expected
+        assert bitmap_intersection_sizes(bitmaps[i], bitmaps).tolist() == expected
+        assert [
+            intersection_size(query, indices[indptr[j] : indptr[j + 1]])
+            for j in range(len(users))
+        ] == expected
+
+
+@pytest.mark.parametrize(
+    "score, function",
+    [("cardinality", cardinality_similarity), ("jaccard", jaccard_similarity)],
+)
+def test_similarity_calculator_encoded(score, function):
+    """
+    Test that the encoded SimilarityCalculator matches the set-based scores.
+    """
+    calculator = SimilarityCalculator(score, encoded=True)
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        v1 = np.unique(rng.integers(0, 30, rng.integers(1, 20)))
+        v2 = np.unique(rng.integers(0, 30, rng.integers(1, 20)))
+        assert calculator.calculate_similarity(v1, v2) == function(v1, v2)
+
+    with pytest.raises(ValueError):
+        SimilarityCalculator("cosine", encoded=True)
+
+
+@pytest.mark.parametrize("n_items", [20, 5_000])
+@pytest.mark.parametrize("score", ["cardinality", "jaccard"])
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_build_similarity_network_sets(n_items, score, symmetric):
+    """
+    Test that build_similarity_network scores the pairs of users as comparing
+    their traces pair by pair, with dense (bitmap) and sparse traces.
+    """
+    df = _traces(15, n_items, 200)
+    function = {"cardinality": cardinality_similarity, "jaccard": jaccard_similarity}[
+        score
+    ]
+    users = sorted(df["author_id"].unique())
+    expected = pd.DataFrame(
+        [
+            {
+                "source": u1,
+                "target": u2,
+                "similarity": function(
+                    df[df["author_id"] == u1]["trace"],
+                    df[df["author_id"] == u2]["trace"],
+                ),
+            }
+            for u1 in users
+            for u2 in users
+            if u1 != u2 and not (symmetric and u1 > u2)
+        ]
+    )
+    result = build_similarity_network(df, score, symmetric=symmetric)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.fixture
+def presence():
+    """
+    Binary presence vectors of users in 150 windows, with an all-zero vector.
+    """
+    rng = np.random.default_rng(0)
+    vectors = (rng.random((40, 150)) < rng.random((40, 1)) / 2).astype(int)
+    vectors[3] = 0
+    return vectors
+
+
+def test_pack_binary(presence):
+    """
+    Test that pack_binary packs dense and sparse vectors into the same words.
+    """
+    packed = pack_binary(presence)
+
+    assert packed.shape == (40, 3), f"Unexpected shape {packed.shape}"
+    assert popcount(packed).tolist() == presence.sum(axis=1).tolist()
+    assert np.array_equal(pack_binary(sp.csr_matrix(presence)), packed)
+    with pytest.raises(AssertionError):
+        pack_binary([[0, 2, 1]])
+
+
+def test_popcount64():
+    """
+    Test that the SWAR popcount of each word matches the table-based popcount.
+    """
+    rng = np.random.default_rng(0)
+    words = rng.integers(0, 2**63, (50, 4), dtype=np.uint64) << np.uint64(1)
+    words[0] = [0, 2**64 - 1, 1, 2**63]
+
+    assert _popcount64(words).dtype == np.uint64
+    assert np.array_equal(
+        _popcount64(words).sum(axis=1), popcount(words)
+    ), "Different popcounts"
+    assert _popcount64(words[0]).tolist() == [0, 64, 1, 1]
+
+
+def test_packed_jaccard(presence):
+    """
+    Test that the packed Jaccard kernels match jaccard_binary_similarity.
+    """
+    packed = pack_binary(presence)
+    expected = np.array(
+        [
+            [
+                jaccard_binary_similarity(v1, v2) if (v1 | v2).any() else 0.0
+                for v2 in presence
+            ]
+            for v1 in presence
+        ]
+    )
+
+    np.testing.assert_allclose(packed_jaccard_block(packed, block_size=7), expected)
+    np.testing.assert_allclose(packed_jaccard_block(packed[:5], packed), expected[:5])
+    for i in (0, 3, 17):
+        np.testing.assert_allclose(
+            packed_jaccard_one_vs_many(packed[i], packed), expected[i]
+        )
+        assert packed_jaccard(packed[i], packed[1]) == pytest.approx(expected[i, 1])
+
+    calculator = SimilarityCalculator("jaccard-binary", encoded=True)
+    assert calculator.calculate_similarity(packed[0], packed[1]) == pytest.approx(
+        expected[0, 1]
+    )
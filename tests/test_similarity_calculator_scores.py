@@ -1,6 +1,7 @@
 import numpy as np
 import pytest
 from benchmark_coordination.similarity_calculator.scores import (
+    boolean_similarity,
     cardinality_similarity,
     cosine_similarity,
     jaccard_similarity,
@@ -11,6 +12,24 @@ from benchmark_coordination.similarity_calculator.scores import (
 )
 
 
+@pytest.mark.parametrize(
+    "vector1, vector2, expected_result",
+    [
+        (np.array(["#a", "#b"]), np.array(["#a", "#b"]), 1.0),
+        (np.array(["#a", "#b"]), np.array(["#b", "#a"]), 0.0),
+        (np.array(["#a", "#b"]), np.array(["#a", "#b", "#a"]), 0.0),
+    ],
+)
+def test_boolean_similarity(vector1, vector2, expected_result):
+    """
+    Test the boolean_similarity function.
+    """
+    result = boolean_similarity(vector1, vector2)
+    assert (
+        result == expected_result
+    ), f"Expected boolean_similarity {expected_result}, got {result}"
+
+
 @pytest.mark.parametrize(
     "vector1, vector2, expected_result",
     [
@@ -48,6 +67,15 @@ def test_cosine_similarity(vector1, vector2, expected_result):
     ), f"Expected cosine_similarity {expected_result}, got {result}"
 
 
+def test_cosine_similarity_pad_is_silent(capsys):
+    """
+    Test that the cosine_similarity function pads vectors without printing.
+    """
+    result = cosine_similarity(np.array([1, 2]), np.array([1, 2, 0]), coalesce="pad")
+    assert np.isclose(result, 1.0), f"Expected cosine_similarity 1.0, got {result}"
+    assert capsys.readouterr().out == "", "Expected no output"
+
+
 @pytest.mark.parametrize(
     "vector1, vector2, expected_result",
     [
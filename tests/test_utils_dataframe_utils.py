@@ -3,6 +3,8 @@ import pandas as pd
 from datetime import datetime
 
 from benchmark_coordination.utils.dataframe_utils import (
+    build_global_dictionary,
+    cast_columns_to_category,
     contains_columns,
     cast_columns_to_datetime,
     cast_columns_to_str,
@@ -87,3 +89,41 @@ def test_cast_columns_to_str_raise():
     columns = ["B"]
     with pytest.raises(ValueError):
         cast_columns_to_str(df, columns)
+
+
+def test_cast_columns_to_str_pyarrow():
+    """
+    Test that cast_columns_to_str can store strings in pyarrow buffers.
+    """
+    df = pd.DataFrame({"A": [1, 2, None], "B": ["x", "y", "z"]})
+    result = cast_columns_to_str(df, ["A", "B"], dtype_backend="pyarrow")
+    for column in ["A", "B"]:
+        assert result[column].dtype == pd.StringDtype(
+            "pyarrow"
+        ), f"Expected string[pyarrow] but got {result[column].dtype}"
+    assert result["A"].isna().sum() == 1, "Missing values should stay missing"
+
+
+def test_cast_columns_to_category():
+    """
+    Test that cast_columns_to_category encodes columns with a shared dictionary.
+    """
+    df = pd.DataFrame(
+        {"author_id": ["b", "a", "c"], "original_author": ["c", None, "b"]}
+    )
+    categories = build_global_dictionary(df, ["author_id", "original_author"])
+    assert categories.tolist() == ["a", "b", "c"]
+
+    result = cast_columns_to_category(df.copy(), ["author_id", "original_author"])
+    assert result["author_id"].cat.codes.tolist() == [1, 0, 2]
+    assert result["original_author"].cat.codes.tolist() == [2, -1, 1]
+
+    # another window encoded with the same dictionary has comparable codes
+    other = pd.DataFrame({"author_id": ["c"]})
+    other = cast_columns_to_category(other, ["author_id"], categories=categories)
+    assert other["author_id"].cat.codes.tolist() == [2]
+
+    with pytest.raises(ValueError):
+        cast_columns_to_category(
+            pd.DataFrame({"author_id": ["d"]}), ["author_id"], categories=categories
+        )
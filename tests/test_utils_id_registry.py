@@ -0,0 +1,52 @@
+import pytest
+import numpy as np
+import pandas as pd
+from benchmark_coordination.utils.id_registry import IdRegistry
+
+
+def test_id_registry_encode_decode():
+    """
+    Test that identifiers keep their index as new identifiers are registered.
+    """
+    registry = IdRegistry(["b", "a", "b"])
+    assert len(registry) == 2, f"Expected 2 ids but got {len(registry)}"
+    registry.add(pd.Series(["c", "a"]))
+    assert registry.encode(["a", "b", "c"]).tolist() == [1, 0, 2]
+    assert registry.encode(["a"]).dtype == np.int32
+    assert registry.decode([2, 0]).tolist() == ["c", "b"]
+    assert "c" in registry and "d" not in registry
+
+    with pytest.raises(KeyError):
+        registry.encode(["d"])
+    assert registry.encode(["d", "a"], strict=False).tolist() == [-1, 1]
+
+
+def test_id_registry_from_dataframe():
+    """
+    Test that a registry built from a dataframe encodes columns consistently.
+    """
+    df = pd.DataFrame({"author_id": [10, 20], "original_author": [30, None]})
+    registry = IdRegistry.from_dataframe(df, ["author_id", "original_author"])
+    assert registry.labels.tolist() == [10, 20, 30]
+
+    window = pd.DataFrame({"author_id": [30, 10]})
+    window = registry.encode_columns(window, ["author_id"])
+    assert window["author_id_idx"].tolist() == [2, 0]
+
+
+@pytest.mark.parametrize("memory_map", [True, False])
+def test_id_registry_save_load(tmp_path, memory_map):
+    """
+    Test that a saved registry is loaded with the same indices.
+    """
+    registry = IdRegistry(["x", "y", "z"])
+    file_path = str(tmp_path / "registry.arrow")
+    registry.save(file_path)
+    loaded = IdRegistry.load(file_path, memory_map=memory_map)
+    assert len(loaded) == 3, f"Expected 3 ids but got {len(loaded)}"
+    assert loaded.decode([[2, 0], [1, 1]]).tolist() == [["z", "x"], ["y", "y"]]
+    assert loaded._arrow_labels is not None, "Decoding should not build the index"
+    assert loaded.encode(["z"]).tolist() == [2]
+    assert loaded.labels.tolist() == ["x", "y", "z"]
+    loaded.add(["w", "x"])
+    assert loaded.decode([3, 0]).tolist() == ["w", "x"]
@@ -3,7 +3,15 @@ import pandas as pd
 from datetime import datetime
 from unittest.mock import patch, MagicMock
 
-from benchmark_coordination.utils.io_utils import read_from_parquet, save_to_parquet
+from benchmark_coordination.utils.io_utils import (
+    infer_columns,
+    iter_parquet_batches,
+    read_from_parquet,
+    open_time_partitions,
+    read_time_partitions,
+    save_to_partitioned_parquet,
+    save_to_parquet,
+)
 
 
 @patch("benchmark_coordination.utils.io_utils.pd.read_parquet")
@@ -99,3 +107,142 @@ def test_save_to_parquet(mock_pd):
     data.to_parquet.assert_called_with(
         file_path, index=False
     ), "to_parquet was not called with the expected arguments"
+
+
+@patch("benchmark_coordination.utils.io_utils.pd.read_parquet")
+def test_read_from_parquet_filters(mock_read_parquet):
+    """
+    Test that read_from_parquet pushes the columns and the filters down to pd.read_parquet.
+    """
+    mock_read_parquet.return_value = pd.DataFrame()
+    read_from_parquet(
+        "dummy_path",
+        columns=["author_id", "original_author"],
+        start_time=datetime(2022, 1, 1),
+        author_ids={1},
+        is_retweet=True,
+    )
+    mock_read_parquet.assert_called_with(
+        "dummy_path",
+        columns=["author_id", "original_author"],
+        filters=[
+            ("timestamp", ">=", pd.Timestamp(2022, 1, 1)),
+            ("author_id", "in", [1]),
+            ("is_retweet", "==", True),
+        ],
+    ), "pd.read_parquet was not called with the expected arguments"
+
+
+def test_read_from_parquet_pushdown(tmp_path):
+    """
+    Test that the filters select the expected rows of a parquet file.
+    """
+    file_path = str(tmp_path / "data.parquet")
+    pd.DataFrame(
+        {
+            "author_id": [1, 2, 3, 1],
+            "timestamp": pd.to_datetime(
+                ["2022-01-01", "2022-01-02", "2022-01-03", "2022-01-08"]
+            ),
+            "is_retweet": [True, False, True, True],
+            "original_author": [2, 3, 1, 3],
+        }
+    ).to_parquet(file_path, index=False, row_group_size=2)
+
+    result = read_from_parquet(
+        file_path,
+        columns=["author_id", "original_author"],
+        start_time=datetime(2022, 1, 1),
+        end_time="2022-01-07",
+        is_retweet=True,
+    )
+    assert list(result.columns) == ["author_id", "original_author"]
+    assert result["author_id"].tolist() == [1, 3]
+
+    result = read_from_parquet(file_path, columns=["author_id"], author_ids=[1])
+    assert result["author_id"].tolist() == [1, 1]
+
+
+def test_infer_columns(tmp_path):
+    """
+    Test that infer_columns returns the columns of the file used by the pipeline steps.
+    """
+    from benchmark_coordination.network_builder.similarity_net import (
+        build_similarity_network,
+    )
+    from benchmark_coordination.network_builder.thresholding import filter_edgelist
+
+    file_path = str(tmp_path / "data.parquet")
+    pd.DataFrame(
+        {"author_id": [1], "author": ["a"], "trace": ["x"], "timestamp": [None]}
+    ).to_parquet(file_path, index=False)
+    steps = [
+        ("lower", lambda df, column: df, {"column": "trace"}),
+        ("similarity", build_similarity_network, {"score": "jaccard"}),
+        ("filter", filter_edgelist, {"column_name": "similarity", "threshold": 1}),
+    ]
+    assert infer_columns(file_path, steps) == ["author_id", "trace"]
+
+
+def test_iter_parquet_batches(tmp_path):
+    """
+    Test that iter_parquet_batches streams the rows of many files in bounded chunks.
+    """
+    paths = []
+    for i in range(2):
+        path = str(tmp_path / f"part-{i}.parquet")
+        pd.DataFrame(
+            {"author_id": range(10 * i, 10 * i + 10), "is_retweet": [True, False] * 5}
+        ).to_parquet(path, index=False)
+        paths.append(path)
+
+    chunks = list(iter_parquet_batches(paths, columns=["author_id"], batch_size=4))
+    assert all(len(chunk) <= 4 for chunk in chunks), "Chunks should not exceed 4 rows"
+    assert sorted(pd.concat(chunks)["author_id"]) == list(range(20))
+    assert all(list(chunk.columns) == ["author_id"] for chunk in chunks)
+
+    chunks = list(
+        iter_parquet_batches(str(tmp_path), columns=["author_id"], is_retweet=True)
+    )
+    assert sorted(pd.concat(chunks)["author_id"]) == list(range(0, 20, 2))
+
+
+def test_partitioned_parquet(tmp_path):
+    """
+    Test that a date-partitioned dataset is written in hive style and read by time range.
+    """
+    data = pd.DataFrame(
+        {
+            "author_id": [3, 1, 2, 4],
+            "timestamp": pd.to_datetime(
+                [
+                    "2022-01-02 10:00:00",
+                    "2022-01-01 12:00:00",
+                    "2022-01-01 08:00:00",
+                    "2022-01-03 00:00:00",
+                ]
+            ),
+        }
+    )
+    save_to_partitioned_parquet(data, str(tmp_path))
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "date=2022-01-01",
+        "date=2022-01-02",
+        "date=2022-01-03",
+    ]
+    day = pd.read_parquet(next((tmp_path / "date=2022-01-01").iterdir()))
+    assert day["author_id"].tolist() == [2, 1], "Rows should be sorted by timestamp"
+
+    result = read_time_partitions(
+        str(tmp_path), datetime(2022, 1, 1, 10), datetime(2022, 1, 2, 10)
+    )
+    assert list(result.columns) == ["author_id", "timestamp"]
+    assert result["author_id"].tolist() == [1, 3]
+
+    result = read_time_partitions(
+        str(tmp_path), "2022-01-02 12:00:00", "2022-01-03", whole_days=True
+    )
+    assert result["author_id"].tolist() == [3, 4]
+    dataset = open_time_partitions(str(tmp_path))
+    result = read_time_partitions(dataset, "2022-01-02", "2022-01-03", whole_days=True)
+    assert result["author_id"].tolist() == [3, 4]
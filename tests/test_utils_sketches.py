@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_coordination.utils.sketches import (
+    CountMinSketch,
+    HyperLogLog,
+    KLLSketch,
+)
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(0).exponential(size=100_000)
+
+
+@pytest.mark.parametrize("q", [0.01, 0.25, 0.5, 0.9, 0.99])
+def test_kll_sketch_quantile(values, q):
+    """
+    Test the quantile method of the KLLSketch class.
+    """
+    sketch = KLLSketch(seed=0)
+    for chunk in np.array_split(values, 10):
+        sketch.update(chunk)
+    estimate = sketch.quantile(q)
+    rank = (values <= estimate).mean()
+
+    assert abs(rank - q) < 0.01, f"Expected rank close to {q}, got {rank}"
+    assert len(sketch) < 2_000, f"Expected a small sketch, got {len(sketch)} items"
+
+
+def test_kll_sketch_merge(values):
+    """
+    Test the merge method of the KLLSketch class.
+    """
+    sketches = []
+    for i, chunk in enumerate(np.array_split(values, 4)):
+        sketch = KLLSketch(seed=i)
+        sketch.update(chunk)
+        sketches.append(sketch)
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+    rank = (values <= merged.quantile(0.5)).mean()
+
+    assert merged.n == len(values), f"Expected {len(values)} values, got {merged.n}"
+    assert merged.min == values.min(), f"Expected {values.min()}, got {merged.min}"
+    assert merged.max == values.max(), f"Expected {values.max()}, got {merged.max}"
+    assert abs(rank - 0.5) < 0.01, f"Expected rank close to 0.5, got {rank}"
+
+
+def test_kll_sketch_rank(values):
+    """
+    Test the rank method of the KLLSketch class.
+    """
+    sketch = KLLSketch(seed=0)
+    sketch.update(values)
+    expected = (values <= 1.0).sum()
+
+    assert abs(sketch.rank(1.0) - expected) < 0.01 * len(
+        values
+    ), f"Expected {expected}, got {sketch.rank(1.0)}"
+    assert sketch.rank(-1.0) == 0, f"Expected 0, got {sketch.rank(-1.0)}"
+
+
+def test_kll_sketch_empty():
+    """
+    Test the KLLSketch class without values.
+    """
+    sketch = KLLSketch()
+    sketch.update([np.nan])
+
+    assert sketch.n == 0, f"Expected 0 values, got {sketch.n}"
+    with pytest.raises(ValueError):
+        sketch.quantile(0.5)
+
+
+def test_count_min_sketch():
+    """
+    Test the update, query and merge methods of the CountMinSketch class.
+    """
+    stream = np.random.default_rng(0).zipf(1.5, size=200_000) % 50_000
+    values, counts = np.unique(stream, return_counts=True)
+    sketch = CountMinSketch(width=2**14)
+    other = CountMinSketch(width=2**14)
+    sketch.update(stream[:100_000])
+    other.update(stream[100_000:])
+    sketch.merge(other)
+    estimates = sketch.query(values)
+
+    assert sketch.n == len(stream), f"Expected {len(stream)} values, got {sketch.n}"
+    assert (estimates >= counts).all(), "Count-min estimates should not underestimate"
+    error = np.e / sketch.width * len(stream)
+    assert (
+        np.mean(estimates - counts <= error) > 0.99
+    ), "Estimates should be within the error bound"
+
+    with pytest.raises(ValueError):
+        sketch.merge(CountMinSketch(width=2**10))
+
+
+def test_count_min_sketch_weighted():
+    """
+    Test the update method of the CountMinSketch class with counts.
+    """
+    sketch = CountMinSketch()
+    sketch.update(["a", "b"], counts=[3, 5])
+    sketch.update(["a"])
+
+    assert sketch.query(["a", "b", "c"]).tolist() == [4, 5, 0]
+    assert sketch.n == 9, f"Expected 9 values, got {sketch.n}"
+
+
+@pytest.mark.parametrize("n_distinct", [10, 1_000, 100_000])
+def test_hyperloglog_estimate(n_distinct):
+    """
+    Test the estimate method of the HyperLogLog class.
+    """
+    rng = np.random.default_rng(0)
+    stream = rng.integers(0, 2**40, n_distinct)[rng.integers(0, n_distinct, 300_000)]
+    sketch = HyperLogLog(p=12)
+    for chunk in np.array_split(stream, 3):
+        sketch.update(chunk)
+    expected = len(np.unique(stream))
+
+    assert (
+        abs(sketch.estimate() - expected) < 0.05 * expected + 1
+    ), f"Expected about {expected}, got {sketch.estimate()}"
+
+
+def test_hyperloglog_keys():
+    """
+    Test the estimate_keys and merge methods of the HyperLogLog class.
+    """
+    rng = np.random.default_rng(0)
+    keys = rng.integers(0, 200, 50_000)
+    values = keys * 1_000 + rng.integers(0, keys + 1)
+    sketch = HyperLogLog(p=8)
+    other = HyperLogLog(p=8)
+    sketch.update(values[:25_000], keys=keys[:25_000])
+    other.update(values[25_000:], keys=keys[25_000:])
+    sketch.merge(other)
+    expected = pd.Series(values).groupby(keys).nunique()
+    estimates = sketch.estimate_keys(expected.index.to_numpy())
+
+    relative_error = np.abs(estimates - expected.to_numpy()) / expected.to_numpy()
+    assert np.median(relative_error) < 0.05, "Estimates per key should be close"
+    assert abs(sketch.estimate() - len(np.unique(values))) < 0.15 * len(
+        np.unique(values)
+    ), "The estimate for all the keys should be close"
+
+    small = expected.index[expected <= sketch.exact_limit].to_numpy()
+    assert (
+        sketch.estimate_keys(small) == expected[small].to_numpy()
+    ).all(), "Small counts should be exact"
+    with pytest.raises(ValueError):
+        sketch.merge(HyperLogLog(p=6))
+
+
+def test_hyperloglog_many_keys():
+    """
+    Test that the keys do not share registers, with many more keys than registers.
+    """
+    keys = np.repeat(np.arange(100_000), 2)
+    values = np.tile([1, 2], 100_000)
+    sketch = HyperLogLog(p=8)
+    sketch.update(values, keys=keys)
+
+    assert (sketch.estimate_keys(np.arange(100_000)) == 2).all(), "Expected 2 per key"
+    assert sketch.estimate_keys([-1]).tolist() == [0.0], "Expected 0 for unseen keys"
+
+
+def test_hyperloglog_keys_chunks():
+    """
+    Test that updating the counts per key chunk by chunk gives the counts of a
+    single update, keeping each distinct (key, value) pair once.
+    """
+    rng = np.random.default_rng(0)
+    keys = rng.integers(0, 1_000, 20_000)
+    values = rng.integers(0, 40, 20_000)
+    sketch = HyperLogLog(p=8, exact_limit=64)
+    for chunk in np.array_split(np.arange(20_000), 20):
+        sketch.update(values[chunk], keys=keys[chunk])
+    expected = pd.Series(values).groupby(keys).nunique()
+
+    assert (
+        sketch.estimate_keys(expected.index) == expected.to_numpy()
+    ).all(), "Expected exact counts"
+    assert len(sketch._exact_pairs) == len(np.unique(keys * 40 + values))
+    # with promotions, chunks give the registers of a single update
+    sketch, single = HyperLogLog(p=8), HyperLogLog(p=8)
+    for chunk in np.array_split(np.arange(20_000), 20):
+        sketch.update(values[chunk], keys=keys[chunk])
+    single.update(values, keys=keys)
+    assert (
+        sketch.estimate_keys(expected.index) == single.estimate_keys(expected.index)
+    ).all(), "Chunks should give the estimates of a single update"
@@ -0,0 +1,53 @@
+import subprocess
+import sys
+
+from benchmark_coordination.utils.step_markers import (
+    is_row_local,
+    required_columns,
+    requires_columns,
+    row_local,
+)
+
+
+def test_row_local():
+    """
+    Test the row_local marker.
+    """
+
+    @row_local
+    def drop_retweets(df):
+        return df[~df["is_retweet"]]
+
+    def count_retweets(df):
+        return df["is_retweet"].sum()
+
+    assert is_row_local(drop_retweets)
+    assert not is_row_local(count_retweets)
+
+
+def test_requires_columns():
+    """
+    Test the requires_columns marker.
+    """
+
+    @requires_columns("author_id", "trace")
+    def count_traces(df):
+        return df.groupby("author_id")["trace"].count()
+
+    assert required_columns(count_traces) == ["author_id", "trace"]
+    assert required_columns(lambda df: df) == []
+
+
+def test_steps_do_not_import_pipeline():
+    """
+    Test that the modules defining the steps do not depend on the pipeline package.
+    """
+    code = (
+        "import sys\n"
+        "import benchmark_coordination.windowing.time_window\n"
+        "import benchmark_coordination.features_builder.filters\n"
+        "import benchmark_coordination.features_builder.text_processing\n"
+        "assert not any(name.startswith('benchmark_coordination.pipeline')"
+        " for name in sys.modules), 'The pipeline package was imported'\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -1,8 +1,14 @@
+import numpy as np
 import pytest
 import pandas as pd
 from benchmark_coordination.windowing.activity_window import (
+    author_windows,
     filter_dataframe,
+    gather_windows,
     slide_dataframe,
+    window_bounds,
+    window_count_matrix,
+    window_features,
 )
 
 
@@ -94,3 +100,93 @@ def test_slide_dataframe(sample_dataframe):
         2,
         3,
     ], f"Expected [2, 3] but got {windows[0]['value'].tolist()}"
+
+
+@pytest.mark.parametrize(
+    "window_size, step_size, start_idx, end_idx",
+    [(2, 1, 0, -1), (3, 2, 0, -1), (2, 1, 1, 3), (10, 3, 0, -1)],
+)
+def test_window_bounds(sample_dataframe, window_size, step_size, start_idx, end_idx):
+    """
+    Test that window_bounds gives the windows of slide_dataframe.
+    """
+    windows = list(
+        slide_dataframe(sample_dataframe, window_size, step_size, start_idx, end_idx)
+    )
+    starts, ends = window_bounds(
+        len(sample_dataframe), window_size, step_size, start_idx, end_idx
+    )
+
+    assert [(window.index[0], window.index[-1] + 1) for window in windows] == list(
+        zip(starts, ends)
+    ), f"Got {list(zip(starts, ends))}"
+
+
+def test_window_features(sample_dataframe):
+    """
+    Test the window_features function.
+    """
+    values = sample_dataframe["value"].to_numpy()
+    result = window_features(values, 2, 1)
+    expected = [
+        window["value"].tolist()
+        for window in slide_dataframe(sample_dataframe, 2, 1)
+        if len(window) == 2
+    ]
+
+    assert result.tolist() == expected, f"Expected {expected}, got {result.tolist()}"
+    assert window_features(values, 6, 1).shape == (0, 6), "Expected no full window"
+
+
+def test_window_count_matrix():
+    """
+    Test the window_count_matrix function.
+    """
+    codes, uniques = pd.factorize(pd.Series(["#a", "#b", "#a", "#a", "#c"]))
+    result = window_count_matrix(window_features(codes, 3, 2), len(uniques))
+
+    assert result.toarray().tolist() == [
+        [2, 1, 0],
+        [2, 0, 1],
+    ], f"Got {result.toarray().tolist()}"
+
+
+@pytest.mark.parametrize("full_only", [True, False])
+def test_author_windows(full_only):
+    """
+    Test that author_windows gives the windows of slide_dataframe for each author.
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "author_id": rng.integers(0, 5, 60),
+            "timestamp": rng.permutation(60),
+            "value": np.arange(60),
+        }
+    )
+    activities, windows = author_windows(df, 4, 3, full_only=full_only)
+    for author, author_data in df.groupby("author_id"):
+        author_data = author_data.sort_values("timestamp", ignore_index=True)
+        expected = [
+            window["value"].tolist()
+            for window in slide_dataframe(author_data, 4, 3)
+            if len(window) == 4 or not full_only
+        ]
+        result = [
+            activities["value"].iloc[start:end].tolist()
+            for start, end in windows.loc[
+                windows["author_id"] == author, ["start", "end"]
+            ].itertuples(index=False)
+        ]
+        assert result == expected, f"Different windows for author {author}"
+
+
+def test_gather_windows():
+    """
+    Test the gather_windows function.
+    """
+    df = pd.DataFrame({"author_id": [1, 1, 1, 2, 2], "timestamp": range(5)})
+    activities, windows = author_windows(df, 2, 1)
+    result = gather_windows(activities["timestamp"].to_numpy(), windows["start"], 2)
+
+    assert result.tolist() == [[0, 1], [1, 2], [3, 4]], f"Got {result.tolist()}"
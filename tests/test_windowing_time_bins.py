@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_coordination.windowing.time_bins import TimeBinCube
+
+
+@pytest.fixture
+def retweets():
+    """
+    Authors retweeting tweets over two days.
+    """
+    rng = np.random.default_rng(0)
+    n = 2_000
+    return pd.DataFrame(
+        {
+            "author_id": rng.integers(0, 20, n),
+            "trace": rng.integers(0, 10, n),
+            "timestamp": pd.Timestamp("2022-09-01")
+            + pd.to_timedelta(rng.integers(0, 2 * 86_400, n), unit="s"),
+        }
+    )
+
+
+def brute_force_counts(df, start_time, end_time):
+    """
+    Count the events of each pair in [start_time, end_time) from the raw events.
+    """
+    window = df[(df["timestamp"] >= start_time) & (df["timestamp"] < end_time)]
+    return window.groupby(["author_id", "trace"]).size()
+
+
+@pytest.mark.parametrize(
+    "start_time, end_time",
+    [
+        ("2022-09-01 00:00", "2022-09-03 00:00"),
+        ("2022-09-01 06:05", "2022-09-01 07:00"),
+        ("2022-09-02 23:55", "2022-09-03 00:00"),
+        ("2022-08-31 00:00", "2022-09-01 00:00"),
+        ("2022-09-02 12:00", "2022-09-05 00:00"),
+    ],
+)
+def test_time_bin_cube_counts(retweets, start_time, end_time):
+    """
+    Test the counts method of the TimeBinCube class.
+    """
+    cube = TimeBinCube(retweets, bin_size=5)
+    result = cube.counts(start_time, end_time).set_index(["author_id", "trace"])
+    expected = brute_force_counts(
+        retweets, pd.Timestamp(start_time), pd.Timestamp(end_time)
+    )
+
+    assert result["count"].sort_index().to_dict() == expected.to_dict()
+
+
+def test_time_bin_cube_slide(retweets):
+    """
+    Test the slide method of the TimeBinCube class.
+    """
+    cube = TimeBinCube(retweets, bin_size=10)
+    windows = list(cube.slide(60, 30, "2022-09-01 00:00", "2022-09-02 23:30"))
+
+    assert len(windows) == 96, f"Expected 96 windows, got {len(windows)}"
+    for start, counts in windows[::10]:
+        expected = brute_force_counts(retweets, start, start + pd.Timedelta(minutes=60))
+        result = counts.set_index(["author_id", "trace"])["count"]
+        assert result.sort_index().to_dict() == expected.to_dict(), f"Window {start}"
+    with pytest.raises(AssertionError):
+        next(cube.slide(15, 10, "2022-09-01", "2022-09-02"))
+
+
+def test_time_bin_cube_keeps_zeros(retweets):
+    """
+    Test the counts method of the TimeBinCube class without dropping zeros.
+    """
+    cube = TimeBinCube(retweets)
+    result = cube.counts("2022-09-01 00:00", "2022-09-01 00:05", drop_zeros=False)
+
+    expected = (retweets["timestamp"] < pd.Timestamp("2022-09-01 00:05")).sum()
+
+    assert len(result) == len(cube.pairs), "Expected one row per pair"
+    assert (
+        result["count"].sum() == expected
+    ), f"Expected {expected} events, got {result['count'].sum()}"
@@ -7,7 +7,10 @@ from benchmark_coordination.windowing.time_window import (
     slide_dataframe,
     filter_graph,
     slide_graph,
+    slide_partitioned_dataset,
 )
+import benchmark_coordination.utils.io_utils as io_utils
+from benchmark_coordination.utils.io_utils import save_to_partitioned_parquet
 
 
 @pytest.fixture
@@ -106,3 +109,36 @@ def test_slide_graph(sample_graph):
     assert all(
         isinstance(window, nx.Graph) for window in windows
     ), "All windows should be of type nx.Graph"
+
+
+def test_slide_partitioned_dataset(tmp_path, monkeypatch):
+    """
+    Test that sliding over a date-partitioned dataset gives the same windows
+    as sliding over the whole dataframe, listing the partitions once.
+    """
+    data = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2022-09-01 18:00:00", periods=12, freq="3h"),
+            "value": range(12),
+        }
+    )
+    save_to_partitioned_parquet(data, str(tmp_path))
+    start_time = datetime(2022, 9, 1, 20, 0, 0)
+    end_time = datetime(2022, 9, 3, 6, 0, 0)
+
+    opened = []
+    open_time_partitions = io_utils.open_time_partitions
+
+    def recorded(root_path):
+        opened.append(root_path)
+        return open_time_partitions(root_path)
+
+    monkeypatch.setattr(io_utils, "open_time_partitions", recorded)
+    expected = list(slide_dataframe(data, 12 * 60, 6 * 60, start_time, end_time))
+    windows = list(
+        slide_partitioned_dataset(str(tmp_path), 12 * 60, 6 * 60, start_time, end_time)
+    )
+    assert len(windows) == len(expected), f"Expected {len(expected)} windows"
+    for window, exp in zip(windows, expected):
+        assert window["value"].tolist() == exp["value"].tolist()
+    assert opened == [str(tmp_path)], "The partitions should be listed once"